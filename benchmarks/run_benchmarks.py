@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+# Ensure we can find the src folder
+sys.path.append(os.getcwd())
+
+from src.data_loader.synthetic import SyntheticMarket
+from src.math.kalman import KalmanFilter
+from src.math.statistics import WindowStatistics
+from src.shared.state import Blackboard
+from src.signals.generator import SignalGenerator
+from src.signals.zscore import ZScoreGenerator
+from src.backtester.engine import BacktestEngine
+from src.processors.math_engine import run_math_engine
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Slower than baseline by more than this fraction -> flagged as a regression
+DEFAULT_TOLERANCE = 0.15
+
+# --- HARNESS ---
+
+def measure(fn, n_ops, repeat=5):
+    """
+    Best-of-'repeat' wall time of fn() (which performs n_ops operations).
+    The minimum is the least noisy estimate of what the code itself costs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {'n_ops': n_ops, 'seconds': best, 'us_per_op': best / n_ops * 1e6, 'ops_per_sec': n_ops / best}
+
+# --- BENCHMARKS ---
+# Each one builds its inputs up-front (not timed) and returns a measure() result.
+
+def bench_kalman_update(market, n):
+    ticks = market.pair(n)
+    price_a, price_b = ticks['price_a'].tolist(), ticks['price_b'].tolist()
+
+    def run():
+        kalman = KalmanFilter(delta=1e-4, R=1e-3)
+        for a, b in zip(price_a, price_b):
+            kalman.update(a, b)
+    return measure(run, n)
+
+def bench_window_stats_update(market, n):
+    spread = market.pair(n)['spread'].tolist()
+
+    def run():
+        stats = WindowStatistics(window_size=300)
+        for value in spread:
+            stats.update(value)
+    return measure(run, n)
+
+def bench_blackboard_get_state(market, n):
+    blackboard = Blackboard()
+
+    async def read_all():
+        for _ in range(n):
+            await blackboard.get_state()
+    return measure(lambda: asyncio.run(read_all()), n)
+
+def bench_signal_generator(market, n):
+    spread = market.pair(n)['spread']
+    z_scores = ZScoreGenerator(window=30).compute(spread)
+    generator = SignalGenerator(entry_threshold=2.0, exit_threshold=0.0)
+    return measure(lambda: generator.generate_signals(z_scores), n)
+
+def bench_backtest_engine(market, n):
+    df = market.pair(n)
+    df['z_score'] = ZScoreGenerator(window=30).compute(df['spread'])
+    df['signal'] = SignalGenerator().generate_signals(df['z_score'])
+    engine = BacktestEngine(initial_cash=10_000, verbose=False)
+    return measure(lambda: engine.run_backtest(df), n)
+
+def bench_trading_env_step(market, n):
+    # Imported here so the core benchmarks don't need gymnasium / SB3
+    from src.rl.gym_env import TradingEnv, load_features
+    with tempfile.TemporaryDirectory() as tmp:
+        features = load_features(market.to_csv(os.path.join(tmp, "session.csv"), n + 2), skip_rows=0, cache_dir=None)
+    env = TradingEnv(features=features)
+    actions = np.random.default_rng(0).integers(0, 3, n).tolist()
+
+    def run():
+        env.reset()
+        for action in actions:
+            env.step(action)
+    return measure(run, n)
+
+def bench_batched_env_step(market, n, num_envs=64):
+    from src.rl.gym_env import load_features
+    from src.rl.vec_env import BatchedTradingEnv
+    with tempfile.TemporaryDirectory() as tmp:
+        features = load_features(market.to_csv(os.path.join(tmp, "session.csv"), n + 2), skip_rows=0, cache_dir=None)
+    env = BatchedTradingEnv(features=features, num_envs=num_envs)
+    steps = n // num_envs
+    actions = np.random.default_rng(0).integers(0, 3, (steps, num_envs))
+
+    def run():
+        env.reset()
+        for batch in actions:
+            env.step(batch)
+    # Reported per env-step (one observation), comparable to trading_env_step
+    return measure(run, steps * num_envs)
+
+class _CountingBlackboard(Blackboard):
+    # Counts math results so the end-to-end rate only credits PROCESSED ticks
+    processed = 0
+
+    async def update_math(self, *args, **kwargs):
+        self.processed += 1
+        await super().update_math(*args, **kwargs)
+
+def bench_end_to_end(market, n):
+    """
+    Ticks/sec through the live chain: stream write -> Blackboard -> event ->
+    math engine (Kalman + OU stats + z-score) -> Blackboard.
+    """
+    ticks = market.pair(n)
+    rows = list(zip(ticks['price_a'].tolist(), ticks['price_b'].tolist(), ticks['timestamp'].tolist()))
+    processed = []
+
+    async def pipeline():
+        blackboard = _CountingBlackboard()
+        event = asyncio.Event()
+        math_task = asyncio.create_task(run_math_engine(blackboard, event))
+        await asyncio.sleep(0)
+        for price_a, price_b, timestamp in rows:
+            await blackboard.update_prices(price_a, price_b, timestamp)
+            event.set()
+            await asyncio.sleep(0)  # Let the math engine consume the tick
+        math_task.cancel()
+        processed.append(blackboard.processed)
+
+    result = measure(lambda: asyncio.run(pipeline()), n, repeat=3)
+    result['processed_ratio'] = processed[-1] / n
+    return result
+
+# name -> (function, default problem size)
+BENCHMARKS = {
+    'kalman_update': (bench_kalman_update, 20_000),
+    'window_stats_update': (bench_window_stats_update, 5_000),
+    'blackboard_get_state': (bench_blackboard_get_state, 20_000),
+    'signal_generator': (bench_signal_generator, 1_000_000),
+    'backtest_engine': (bench_backtest_engine, 1_000_000),
+    'trading_env_step': (bench_trading_env_step, 20_000),
+    'batched_env_step': (bench_batched_env_step, 640_000),
+    'end_to_end': (bench_end_to_end, 5_000),
+}
+
+# --- BASELINES ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def save_baseline(results, name):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    payload = {
+        'meta': {
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"[BENCH] Baseline saved to {path}")
+    return path
+
+def compare(results, name, tolerance=DEFAULT_TOLERANCE) -> list:
+    """
+    Prints current vs baseline per benchmark and returns the names that got
+    slower than the baseline by more than 'tolerance'.
+    """
+    with open(os.path.join(BASELINE_DIR, f"{name}.json")) as f:
+        baseline = json.load(f)
+
+    print(f"\n[BENCH] vs baseline '{name}' (commit {baseline['meta'].get('commit') or '?'}):")
+    print(f"{'benchmark':<24}{'baseline us/op':>16}{'current us/op':>16}{'change':>10}  status")
+    regressions = []
+    for bench, current in results.items():
+        old = baseline['results'].get(bench)
+        if old is None:
+            print(f"{bench:<24}{'-':>16}{current['us_per_op']:>16.3f}{'':>10}  new")
+            continue
+        change = current['us_per_op'] / old['us_per_op'] - 1.0
+        if change > tolerance:
+            status = "REGRESSION"
+            regressions.append(bench)
+        elif change < -tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        print(f"{bench:<24}{old['us_per_op']:>16.3f}{current['us_per_op']:>16.3f}{change:>+10.1%}  {status}")
+    return regressions
+
+def run(names=None, scale=1.0, market=None) -> dict:
+    market = market or SyntheticMarket(ticks_per_second=1.0, regime_length=50_000, seed=42)
+    results = {}
+    for name in names or BENCHMARKS:
+        fn, size = BENCHMARKS[name]
+        results[name] = fn(market, max(int(size * scale), 100))
+        r = results[name]
+        print(f"[BENCH] {name:<24} {r['us_per_op']:>10.3f} us/op  {r['ops_per_sec']:>14,.0f} ops/s")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot-path throughput benchmarks on synthetic data.")
+    parser.add_argument("names", nargs="*", help=f"Subset to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every problem size (e.g. 0.1 for a quick run)")
+    parser.add_argument("--save", metavar="NAME", help="Store the results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against baselines/NAME.json (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(args.names, args.scale)
+
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+
+# Ensure python can find your src modules
+sys.path.append(os.getcwd())
+
+import config  # Plain constants: free to import
+
+# The single entry point. Only the standard library is imported up here: every
+# subcommand imports its own stack (torch, matplotlib, statsmodels, yfinance...)
+# when it runs, so 'live' or a batch backtest never pays for what it doesn't use.
+
+# Modules each subcommand loads (what --import-report measures)
+COMMAND_MODULES = {
+    'record': ['record_session'],
+    'live': ['src.processors.sharded_engine', 'src.data_loader.stream'],
+    'replay': ['replay_session'],
+    'backtest': ['main', 'src.backtester.walk_forward'],
+    'bars': ['src.processors.bars'],
+    'train': ['src.rl.train'],
+    'tune': ['src.rl.tune'],
+    'evaluate': ['src.rl.evaluate'],
+    'scan': ['src.data_loader.connector', 'src.backtester.walk_forward', 'src.signals.cointegration',
+             'statsmodels.tsa.stattools'],
+}
+
+# --- SUBCOMMANDS ---
+
+def cmd_record(args):
+    import record_session
+    try:
+        bars = (args.bars, args.bar_size) if args.bars else None
+        asyncio.run(record_session.main(args.metrics_port, args.checkpoint, warm_start=not args.cold_start, bars=bars,
+                                        book=args.book, book_price=args.book_price))
+    except KeyboardInterrupt:
+        print("\n[SYSTEM] Recording Stopped.")
+
+def cmd_live(args):
+    try:
+        if args.single:
+            import test_feed
+            asyncio.run(test_feed.main(args.metrics_port))
+        else:
+            from src.processors.sharded_engine import run_live, pairs_from_config
+            asyncio.run(run_live(pairs_from_config(config.PAIRS), n_workers=args.workers))
+    except KeyboardInterrupt:
+        print("\n[SYSTEM] Shutting down...")
+
+def cmd_replay(args):
+    import replay_session
+    asyncio.run(replay_session.main(args.source, args.output, args.speed))
+    print(f"[SYSTEM] Replay output written to {args.output}")
+
+def cmd_backtest(args):
+    if not args.walk_forward:
+        import main
+        main.run_system(plot=not args.no_plot)
+        return
+
+    from src.data_loader.connector import YahooConnector
+    from src.backtester.walk_forward import build_price_matrix, run_walk_forward, summarize_walk_forward
+
+    connector = YahooConnector()
+    tickers = sorted({t for pair in config.PAIRS for t in (pair['asset_a'], pair['asset_b'])})
+    prices = build_price_matrix({
+        t: connector.fetch_ticker(t, config.START_DATE, config.END_DATE, config.INTERVAL) for t in tickers
+    })
+    results = run_walk_forward(
+        prices, config.PAIRS,
+        train_size=config.WF_TRAIN_BARS,
+        test_size=config.WF_TEST_BARS,
+        anchored=config.WF_ANCHORED,
+        z_window=config.Z_SCORE_WINDOW,
+        entry=config.ENTRY_THRESHOLD,
+        exit=config.EXIT_THRESHOLD,
+        fee_bps=config.FEE_BPS,
+        slippage_bps=config.SLIPPAGE_BPS,
+    )
+    print(results[['pair_id', 'fold', 'test_start', 'test_end', 'beta', 'total_pnl', 'sharpe', 'n_trades']])
+    print("\n--- WALK-FORWARD SUMMARY ---")
+    print(summarize_walk_forward(results))
+
+def cmd_bars(args):
+    from src.processors.bars import session_bars
+
+    bars = session_bars(args.source, args.kind, args.size, args.price)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    bars.to_csv(args.output, index=False)
+    print(f"[BARS] {len(bars)} {args.kind} bars written to {args.output}")
+
+def cmd_train(args):
+    from src.rl.train import train_agent
+    train_agent()
+
+def cmd_tune(args):
+    from src.rl.tune import SEARCH_SPACE, sample_trials, successive_halving
+
+    trials = sample_trials(SEARCH_SPACE, args.trials, args.seed)
+    successive_halving(trials, args.train, args.sessions, args.out, args.min_steps, args.max_steps,
+                       args.eta, args.workers, seed=args.seed)
+
+def cmd_evaluate(args):
+    from src.rl.evaluate import evaluate_agent, evaluate_checkpoints, discover_checkpoints
+
+    if not args.compare:
+        evaluate_agent()
+        return
+    runs, comparison = evaluate_checkpoints(args.models or discover_checkpoints(), args.sessions, args.workers)
+    print("\n" + comparison.to_string(float_format=lambda x: f"{x:,.4f}"))
+    if args.out:
+        runs.to_csv(args.out, index=False)
+        print(f"[EVAL] Per-run results saved to {args.out}")
+
+def cmd_scan(args):
+    from src.data_loader.connector import YahooConnector
+    from src.backtester.walk_forward import build_price_matrix
+    from src.signals.cointegration import CointegrationTests
+
+    tickers = args.tickers or sorted({t for pair in config.PAIRS for t in (pair['asset_a'], pair['asset_b'])})
+    if len(tickers) < 2:
+        raise SystemExit("[SCAN] Need at least two tickers (--tickers A B ...).")
+
+    connector = YahooConnector()
+    prices = build_price_matrix({t: connector.fetch_ticker(t, args.start, args.end, args.interval) for t in tickers})
+    results = CointegrationTests().scan(prices)
+
+    print("\n--- COINTEGRATION SCAN (Engle-Granger) ---")
+    print(results.head(args.top).to_string(index=False, float_format=lambda x: f"{x:,.4f}"))
+
+# --- IMPORT-TIME REPORT ---
+
+def import_report(command: str, top: int = 15):
+    """
+    Measures what 'command' costs to import, in a fresh interpreter
+    (python -X importtime), and lists the slowest top-level imports.
+    """
+    modules = COMMAND_MODULES[command]
+    code = f"import sys; sys.path.append({os.getcwd()!r}); " + "; ".join(f"import {m}" for m in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    entries = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match and len(match.group(3)) == 1:
+            entries.append((int(match.group(2)) / 1e6, match.group(4)))  # Top level only
+
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+    total = sum(seconds for seconds, _ in entries)
+    print(f"\n--- IMPORT TIME: {command} ({', '.join(modules)}) ---")
+    print(f"Total: {total:.3f}s across {len(entries)} top-level imports")
+    for seconds, name in sorted(entries, reverse=True)[:top]:
+        print(f"  {seconds:8.3f}s  {name}")
+
+# --- PARSER ---
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Statistical arbitrage toolkit.")
+    parser.add_argument("--import-report", action="store_true",
+                        help="Don't run the command: report how long its imports take")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Record the live ETH/BTC session to CSV")
+    record.add_argument("--metrics-port", type=int, default=None, help="Serve metrics on localhost:PORT/metrics")
+    record.add_argument("--checkpoint", default=config.MATH_CHECKPOINT,
+                        help="Math state file (restored on start, saved periodically). '' disables it.")
+    record.add_argument("--cold-start", action="store_true",
+                        help="Don't warm up from the recorded CSV when no checkpoint exists")
+    bars_or_book = record.add_mutually_exclusive_group()
+    bars_or_book.add_argument("--bars", choices=("time", "volume", "dollar"), default=None,
+                              help="Aggregate trades into bars before the math")
+    bars_or_book.add_argument("--book", choices=("depth", "ticker"), default=None,
+                              help="Price the pair from the order book (depth diffs or book ticker) instead of trades")
+    record.add_argument("--bar-size", type=float, default=60.0, help="Seconds, units or notional per bar")
+    record.add_argument("--book-price", choices=("microprice", "mid"), default=config.BOOK_PRICE)
+    record.set_defaults(func=cmd_record)
+
+    live = commands.add_parser("live", help="Run the live math engine")
+    live.add_argument("--workers", type=int, default=config.LIVE_WORKERS, help="Math processes (sharded engine)")
+    live.add_argument("--single", action="store_true", help="Single-pair dashboard instead of the sharded engine")
+    live.add_argument("--metrics-port", type=int, default=None, help="Serve metrics on localhost:PORT/metrics (--single)")
+    live.set_defaults(func=cmd_live)
+
+    replay = commands.add_parser("replay", help="Replay a recorded session through the live pipeline")
+    replay.add_argument("--source", default="data/raw/live_session.csv")
+    replay.add_argument("--output", default="data/processed/replay_session.csv")
+    replay.add_argument("--speed", type=float, default=None,
+                        help="1 = real time, N = N times faster. Omit for unthrottled.")
+    replay.set_defaults(func=cmd_replay)
+
+    backtest = commands.add_parser("backtest", help="Out-of-sample backtest of config.PAIRS")
+    backtest.add_argument("--walk-forward", action="store_true", help="Rolling walk-forward evaluation instead")
+    backtest.add_argument("--no-plot", action="store_true", help="Skip the matplotlib report")
+    backtest.set_defaults(func=cmd_backtest)
+
+    bars = commands.add_parser("bars", help="Aggregate a recorded session into time / volume / dollar bars")
+    bars.add_argument("--source", default="data/raw/live_session.csv")
+    bars.add_argument("--output", default="data/processed/session_bars.csv")
+    bars.add_argument("--kind", choices=("time", "volume", "dollar"), default="time")
+    bars.add_argument("--size", type=float, default=60.0, help="Seconds, units or notional per bar")
+    bars.add_argument("--price", choices=("vwap", "close"), default="vwap")
+    bars.set_defaults(func=cmd_bars)
+
+    train = commands.add_parser("train", help="Train the PPO agent")
+    train.set_defaults(func=cmd_train)
+
+    tune = commands.add_parser("tune", help="Parallel PPO hyperparameter search (successive halving)")
+    tune.add_argument("--train", default="data/raw/live_session.csv")
+    tune.add_argument("--sessions", nargs="+", required=True, help="Held-out session CSVs (not the --train file)")
+    tune.add_argument("--trials", type=int, default=9)
+    tune.add_argument("--min-steps", type=int, default=10_000, help="Budget of the first rung")
+    tune.add_argument("--max-steps", type=int, default=100_000, help="Budget of the last rung")
+    tune.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the trials per rung")
+    tune.add_argument("--workers", type=int, default=None)
+    tune.add_argument("--out", default="logs/tune")
+    tune.add_argument("--seed", type=int, default=0)
+    tune.set_defaults(func=cmd_tune)
+
+    evaluate = commands.add_parser("evaluate", help="Evaluate PPO agents")
+    evaluate.add_argument("--compare", action="store_true", help="Compare many checkpoints instead of the single report")
+    evaluate.add_argument("--models", nargs="*", help="Checkpoints (.zip or exported .npz); default: every .zip in models/")
+    evaluate.add_argument("--sessions", nargs="*", default=["data/raw/live_session.csv"], help="Held-out session CSVs")
+    evaluate.add_argument("--workers", type=int, default=None)
+    evaluate.add_argument("--out", default=None, help="Optional CSV path for the per-run table")
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    scan = commands.add_parser("scan", help="Rank ticker pairs by cointegration")
+    scan.add_argument("--tickers", nargs="*", help="Yahoo tickers; default: every asset in config.PAIRS")
+    scan.add_argument("--start", default=config.START_DATE)
+    scan.add_argument("--end", default=config.END_DATE)
+    scan.add_argument("--interval", default=config.INTERVAL)
+    scan.add_argument("--top", type=int, default=20)
+    scan.set_defaults(func=cmd_scan)
+
+    return parser
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    if args.import_report:
+        import_report(args.command)
+    else:
+        args.func(args)
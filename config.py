@@ -18,4 +18,41 @@ INTERVAL = "1d"  # "1d" for daily, "1h" for hourly
 # 3. Strategy Parameters
 Z_SCORE_WINDOW = 30   # Lookback period for moving average
 ENTRY_THRESHOLD = 2.0 # Enter trade when Z-score > 2
-EXIT_THRESHOLD = 0.0  # Exit trade when Z-score returns to 0
\ No newline at end of file
+EXIT_THRESHOLD = 0.0  # Exit trade when Z-score returns to 0
+
+# 4. Execution Costs
+FEE_BPS = 10.0        # Taker fee on notional (0.1%)
+SLIPPAGE_BPS = 2.0    # Assumed bid-ask spread paid when crossing the book
+
+# 5. Walk-Forward Evaluation
+WF_TRAIN_BARS = 120   # Calibration window (bars)
+WF_TEST_BARS = 60     # Out-of-sample trading window (z-score window seeded from the training tail)
+WF_ANCHORED = False   # True = calibration window grows from the start
+
+
+# 6. Portfolio Risk Limits (multiples of equity)
+MAX_GROSS_EXPOSURE = 2.0  # Sum of |leg values|
+MAX_NET_EXPOSURE = 0.5    # |Sum of leg values|
+
+# 7. Live Engine
+LIVE_WORKERS = 2          # Math processes for the sharded multi-pair engine
+
+# 8. Warm Restart (live math state)
+MATH_CHECKPOINT = "data/state/math_engine.npz"  # Kalman + statistics window, restored on startup
+CHECKPOINT_INTERVAL = 30.0  # Seconds between checkpoint writes
+CHECKPOINT_MAX_AGE = 3600.0 # Older checkpoints are ignored (warm start from the recording instead)
+WARM_START_TICKS = 600      # Recorded rows replayed when no checkpoint exists
+
+# 9. Live Cointegration Monitor
+COINT_WINDOW = 3600        # Samples kept (1 per second -> the last hour)
+COINT_INTERVAL = 60.0      # Seconds between Engle-Granger tests
+COINT_P_THRESHOLD = 0.05   # Tradeable only below this p-value...
+COINT_MAX_HALF_LIFE = 1800 # ...and if the spread reverts within this many seconds
+
+# 10. Feature Pipeline (registered names in src/processors/features.py)
+RECORD_FEATURES = []  # Extra columns streamed into the recording, e.g. [('z_delta', {'lag': 30})]
+
+# 11. Order Book Ingestion (record --book depth|ticker)
+BOOK_PRICE = "microprice"   # Price fed to the math engine: "microprice" or "mid"
+BOOK_SNAPSHOT_DEPTH = 1000  # Levels per REST snapshot
+BOOK_CAPACITY = 5000        # Levels kept per side (the deep end is dropped)
@@ -1,5 +1,4 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Import our custom modules
 from src.data_loader.connector import YahooConnector
@@ -8,9 +7,12 @@ from src.signals.cointegration import CointegrationTests
 from src.signals.zscore import ZScoreGenerator
 from src.signals.generator import SignalGenerator
 from src.backtester.engine import BacktestEngine
+from src.backtester.performance import compute_metrics
+from src.execution.fees import BpsFee
+from src.execution.slippage import SpreadSlippage
 import config
 
-def run_system():
+def run_system(plot=True):
     print("--- 1. INITIALIZATION ---")
     connector = YahooConnector()
     aligner = DataAligner()
@@ -62,21 +64,32 @@ def run_system():
     df_test['signal'] = sig_gen.generate_signals(df_test['z_score'])
     
     # D. Actuator (Backtest Engine)
-    engine = BacktestEngine(initial_cash=10_000)
-    df_results = engine.run_backtest(df_test)
+    engine = BacktestEngine(
+        initial_cash=10_000,
+        fee_model=BpsFee(config.FEE_BPS),
+        slippage_model=SpreadSlippage(config.SLIPPAGE_BPS)
+    )
+    df_results = engine.run_backtest(df_test, beta)
     
     # --- 5. REPORTING ---
-    final_equity = df_results['portfolio_value'].iloc[-1]
-    pnl = final_equity - 10000
-    return_pct = (pnl / 10000) * 100
+    metrics = compute_metrics(df_results['portfolio_value'], df_results['position'])
     
     print("\n--- 5. PERFORMANCE REPORT ---")
     print(f"Trading Period: {test_start} to {test_end}")
-    print(f"Final Equity:   ${final_equity:,.2f}")
-    print(f"Net Profit:     ${pnl:,.2f}")
-    print(f"Return:         {return_pct:.2f}%")
+    print(f"Final Equity:   ${metrics['end_equity']:,.2f}")
+    print(f"Net Profit:     ${metrics['total_pnl']:,.2f}")
+    print(f"Return:         {metrics['total_return'] * 100:.2f}%")
+    print(f"Sharpe:         {metrics['sharpe']:.2f}")
+    print(f"Max Drawdown:   ${metrics['max_drawdown']:,.2f}")
+    print(f"Trades:         {metrics['n_trades']} ({metrics['win_rate'] * 100:.1f}% win rate)")
+
+    if plot:
+        plot_results(df_results, beta)
+
+def plot_results(df_results, beta):
+    # Imported here: headless runs (CLI, batch jobs) never pay for matplotlib
+    import matplotlib.pyplot as plt
 
-    # Plotting
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
     
     # Plot 1: The Spread and Z-Score Thresholds
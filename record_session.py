@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import os
 import sys
@@ -5,22 +6,29 @@ import sys
 # Ensure python can find your src modules
 sys.path.append(os.getcwd())
 
-from src.shared.state import Blackboard
-from src.data_loader.stream import BinanceStream
+import config
+from src.shared.state import Blackboard, TOPIC_MATH
+from src.data_loader.stream import BinanceStream, BinanceBookStream
+from src.data_loader.order_book import BOOK_MODES, BOOK_PRICES
 from src.processors.math_engine import run_math_engine
+from src.processors.coint_monitor import CointegrationMonitor
+from src.processors.checkpoint import MathCheckpoint, input_mode, recording_applies, mark_recording
+from src.processors.bars import BarAggregator, BAR_KINDS
+from src.processors.features import FeaturePipeline
 from src.data_loader.recorder import DataRecorder
+from src.shared.metrics import serve_metrics
 
 async def monitor_loop(blackboard: Blackboard):
     """
     Optional: Keeps the visual dashboard running so you know it's alive.
     """
-    while True:
-        await asyncio.sleep(1)
-        state = await blackboard.get_state()
+    # Pushed at most once per second, only when the math engine produced something new
+    async for state in blackboard.subscribe(mode='throttle', interval=1.0, topics=(TOPIC_MATH,)):
         if state.price_a != 0:
             print(f"[SYSTEM] Z-Score: {state.z_score:.4f} | Recording to CSV...")
 
-async def main():
+async def main(metrics_port=None, checkpoint_path=None, warm_start=True, bars=None, book=None,
+               book_price=config.BOOK_PRICE):
     print("--- STARTING DATA RECORDING SESSION ---")
     
     # 1. Init Shared Memory
@@ -29,22 +37,68 @@ async def main():
     
     # 2. Init Components
     # Stream: Connects to Binance (ETH/BTC)
-    stream = BinanceStream(bb, update_event, "ethusdt", "btcusdt")
+    # bars=(kind, size): the math runs on completed bars (VWAP) instead of every trade
+    # book='depth' / 'ticker': the math runs on the order book's microprice (or mid) instead
+    if book:
+        stream = BinanceBookStream(bb, update_event, "ethusdt", "btcusdt", mode=book, price=book_price,
+                                   snapshot_depth=config.BOOK_SNAPSHOT_DEPTH, capacity=config.BOOK_CAPACITY)
+    else:
+        aggregator = BarAggregator(*bars) if bars else None
+        stream = BinanceStream(bb, update_event, "ethusdt", "btcusdt", bars=aggregator)
     
-    # Recorder: Saves to 'data/raw/live_session.csv'
-    recorder = DataRecorder(bb, filename="data/raw/live_session.csv")
+    # Recorder: Saves to 'data/raw/live_session.csv' (+ any configured extra feature columns)
+    features = FeaturePipeline(config.RECORD_FEATURES) if config.RECORD_FEATURES else None
+    recorder = DataRecorder(bb, filename="data/raw/live_session.csv", features=features)
+    
+    # Cointegration Monitor: re-tests the pair in the background, publishes 'tradeable'
+    coint_monitor = CointegrationMonitor(bb, window=config.COINT_WINDOW, interval=config.COINT_INTERVAL,
+                                         p_threshold=config.COINT_P_THRESHOLD,
+                                         max_half_life=config.COINT_MAX_HALF_LIFE)
+    
+    # Math state: resume from the last checkpoint, else from the tail of the recording
+    # (either only if it was made in the same input mode)
+    mode = input_mode(bars, book, book_price)
+    checkpoint = (MathCheckpoint(checkpoint_path, interval=config.CHECKPOINT_INTERVAL, symbols=("ethusdt", "btcusdt"),
+                                 max_age=config.CHECKPOINT_MAX_AGE, mode=mode) if checkpoint_path else None)
+    warm_start_csv = recorder.filename if warm_start and recording_applies(recorder.filename, mode) else None
+    mark_recording(recorder.filename, mode)
     
     # 3. Create Tasks
     task_stream = asyncio.create_task(stream.connect())
-    task_math = asyncio.create_task(run_math_engine(bb, update_event))
+    task_math = asyncio.create_task(run_math_engine(bb, update_event, checkpoint=checkpoint,
+                                                    warm_start_csv=warm_start_csv,
+                                                    warm_ticks=config.WARM_START_TICKS))
     task_recorder = asyncio.create_task(recorder.run())
     task_monitor = asyncio.create_task(monitor_loop(bb))
+    task_coint = asyncio.create_task(coint_monitor.run())
+    tasks = [task_stream, task_math, task_recorder, task_monitor, task_coint]
+    
+    # Optional: Prometheus endpoint (loop lag, tick rates, lock waits, flush latency)
+    if metrics_port is not None:
+        tasks.append(asyncio.create_task(serve_metrics(metrics_port)))
     
     # 4. Run Forever
-    await asyncio.gather(task_stream, task_math, task_recorder, task_monitor)
+    await asyncio.gather(*tasks)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a live session to CSV.")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve metrics on localhost:PORT/metrics")
+    parser.add_argument("--checkpoint", default=config.MATH_CHECKPOINT,
+                        help="Math state file (restored on start, saved periodically). '' disables it.")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Don't warm up from the recorded CSV when no checkpoint exists")
+    parser.add_argument("--bars", choices=BAR_KINDS, default=None, help="Aggregate trades into bars before the math")
+    parser.add_argument("--bar-size", type=float, default=60.0, help="Seconds, units or notional per bar")
+    parser.add_argument("--book", choices=BOOK_MODES, default=None,
+                        help="Price the pair from the order book (depth diffs or book ticker) instead of trades")
+    parser.add_argument("--book-price", choices=BOOK_PRICES, default=config.BOOK_PRICE)
+    args = parser.parse_args()
+    if args.book and args.bars:
+        parser.error("--book and --bars are mutually exclusive")
+
+    bars = (args.bars, args.bar_size) if args.bars else None
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.metrics_port, args.checkpoint, warm_start=not args.cold_start, bars=bars,
+                         book=args.book, book_price=args.book_price))
     except KeyboardInterrupt:
         print("\n[SYSTEM] Recording Stopped. Check data/raw/live_session.csv")
\ No newline at end of file
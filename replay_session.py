@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure python can find your src modules
+sys.path.append(os.getcwd())
+
+from src.shared.state import Blackboard
+from src.shared.clock import VirtualClock
+from src.data_loader.replay import ReplayStream
+from src.processors.math_engine import run_math_engine
+from src.data_loader.recorder import DataRecorder
+
+async def main(source: str, output: str, speed):
+    print("--- STARTING REPLAY SESSION ---")
+
+    # 1. Init Shared Memory + Market-Time Clock
+    bb = Blackboard()
+    update_event = asyncio.Event()
+    clock = VirtualClock()
+
+    # 2. Init Components
+    # Replay: Stands in for BinanceStream, same Blackboard + Bell
+    stream = ReplayStream(bb, update_event, source, speed=speed, clock=clock)
+
+    # Recorder: Samples every 1s of MARKET time, so the output lines up with the source
+    recorder = DataRecorder(bb, filename=output, clock=clock)
+
+    # 3. Create Tasks (The production pipeline, unchanged)
+    task_math = asyncio.create_task(run_math_engine(bb, update_event, ack=stream.ack))
+    task_recorder = asyncio.create_task(recorder.run())
+
+    # 4. Run until the tape ends
+    await stream.connect()
+    await asyncio.sleep(0)  # Let the subscribers pick up the last tick
+    task_math.cancel()
+    task_recorder.cancel()
+    await asyncio.gather(task_math, task_recorder, return_exceptions=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the live pipeline.")
+    parser.add_argument("--source", default="data/raw/live_session.csv")
+    parser.add_argument("--output", default="data/processed/replay_session.csv")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="1 = real time, N = N times faster. Omit for unthrottled.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args.source, args.output, args.speed))
+    except KeyboardInterrupt:
+        print("\n[SYSTEM] Replay Stopped.")
+    print(f"[SYSTEM] Replay output written to {args.output}")
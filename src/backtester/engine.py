@@ -1,68 +1,98 @@
 import pandas as pd
 import numpy as np
+from src.execution.fees import FeeModel, NoFee
+from src.execution.slippage import SlippageModel, NoSlippage
 
 class BacktestEngine:
     """
-    Responsibility: The 'Plant Model'. 
+    Responsibility: The 'Plant Model'.
     Simulates the evolution of Cash and Inventory based on signals.
     """
-    
-    def __init__(self, initial_cash=10000.0):
+
+    def __init__(self, initial_cash=10000.0, fee_model: FeeModel = None, slippage_model: SlippageModel = None,
+                 verbose=True):
         self.initial_cash = initial_cash
+        self.verbose = verbose
         self.cash = initial_cash
         self.position = 0  # +1 (Long Spread), -1 (Short Spread), 0 (Flat)
-        
+
+        # Friction Models (default: frictionless, matching V1)
+        self.fee_model = fee_model or NoFee()
+        self.slippage_model = slippage_model or NoSlippage()
+
         # We track the "Equity Curve" (Portfolio Value over time)
-        self.portfolio_history = [] 
+        self.portfolio_history = np.empty(0)
 
-    def run_backtest(self, df: pd.DataFrame):
+    def run_backtest(self, df: pd.DataFrame, beta=None):
         """
-        Iterates through the DataFrame (Time) and executes trades.
+        Vectorized simulation over the whole DataFrame (Time) at once.
         Assumptions:
         - We trade '1 Unit' of the Spread.
-        - No transaction costs (yet).
+        - The 'signal' column is the TARGET position (-1, 0, 1).
         - Execution happens at the CLOSE price (Simplified for V1).
+        - Costs come from the fee and slippage models, charged on the NOTIONAL
+          of both legs (|A| + |beta * B| per unit) when 'beta' is given and df has
+          'asset_a' / 'asset_b' columns, else on |spread|.
+
+        Returns a copy of df with 'position', 'trade', 'cost' and
+        'portfolio_value' columns. The input DataFrame is not modified.
         """
-        print("[SIMULATION] Starting Backtest...")
-        
-        for i in range(len(df)):
-            row = df.iloc[i]
-            signal = row['signal']  # We need to generate this column first
-            spread_price = row['spread']
-            
-            # --- EXECUTION LOGIC (The Actuator) ---
-            
-            # Signal says BUY and we are not Long
-            if signal == 1 and self.position != 1:
-                # If we were Short (-1), we Buy to Close (0) then Buy to Open (+1)
-                # Net effect: Buy 2 units if Short, Buy 1 unit if Flat
-                trades_needed = 1 - self.position
-                self.cash -= (trades_needed * spread_price)
-                self.position = 1
-                # print(f"[{row.name.date()}] BUY SPREAD @ {spread_price:.2f}")
+        if self.verbose:
+            print("[SIMULATION] Starting Backtest...")
+
+        n = len(df)
+        prices = df['spread'].to_numpy(dtype=float)
+        signals = np.nan_to_num(df['signal'].to_numpy(dtype=float))
+        volatility = df['volatility'].to_numpy(dtype=float) if 'volatility' in df.columns else None
+        notional = None
+        if beta is not None and 'asset_a' in df.columns and 'asset_b' in df.columns:
+            notional = (np.abs(df['asset_a'].to_numpy(dtype=float))
+                        + np.abs(beta * df['asset_b'].to_numpy(dtype=float)))
+
+        # --- PREALLOCATED OUTPUTS ---
+        position = np.empty(n)
+        trades = np.empty(n)
+        costs = np.empty(n)
+        cash = np.empty(n)
+        equity = np.empty(n)
+
+        # --- 1. POSITIONS (The Actuator) ---
+        # The position simply follows the target signal
+        np.clip(signals, -1, 1, out=position)
+
+        # --- 2. TRADES ---
+        # A trade is any change in position (Short -> Long = Buy 2 units)
+        if n > 0:
+            trades[0] = position[0] - self.position
+        np.subtract(position[1:], position[:-1], out=trades[1:])
+
+        # --- 3. FRICTION ---
+        np.add(self.fee_model.compute(trades, prices, notional),
+               self.slippage_model.compute(trades, prices, volatility, notional),
+               out=costs)
+
+        # --- 4. CASH ---
+        # Buying spends cash, selling receives it, costs always reduce it
+        np.multiply(trades, prices, out=cash)
+        np.add(cash, costs, out=cash)
+        np.cumsum(cash, out=cash)
+        np.subtract(self.cash, cash, out=cash)
 
-            # Signal says SELL and we are not Short
-            elif signal == -1 and self.position != -1:
-                trades_needed = self.position - (-1) # e.g. 1 - (-1) = 2
-                self.cash += (trades_needed * spread_price)
-                self.position = -1
-                # print(f"[{row.name.date()}] SELL SPREAD @ {spread_price:.2f}")
+        # --- 5. MARK TO MARKET (Portfolio Value) ---
+        # Value = Cash + (Inventory * Current Price)
+        np.multiply(position, prices, out=equity)
+        np.add(equity, cash, out=equity)
 
-            # Signal says EXIT (0)
-            elif signal == 0 and self.position != 0:
-                # Close whatever position we have
-                if self.position == 1: # Sell to close
-                    self.cash += spread_price
-                elif self.position == -1: # Buy to close
-                    self.cash -= spread_price
-                self.position = 0
-                # print(f"[{row.name.date()}] CLOSE POSITION @ {spread_price:.2f}")
+        # Final State
+        if n > 0:
+            self.cash = float(cash[-1])
+            self.position = int(position[-1])
+        self.portfolio_history = equity
 
-            # --- MARK TO MARKET (Portfolio Value) ---
-            # Value = Cash + (Inventory * Current Price)
-            current_equity = self.cash + (self.position * spread_price)
-            self.portfolio_history.append(current_equity)
-            
-        # Attach history to DF for plotting
-        df['portfolio_value'] = self.portfolio_history
-        return df
\ No newline at end of file
+        # Attach history to a COPY for plotting (never mutate the caller's data)
+        results = df.copy()
+        results['position'] = position
+        results['trade'] = trades
+        results['cost'] = costs
+        results['portfolio_value'] = equity
+        return results
\ No newline at end of file
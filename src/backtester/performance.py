@@ -0,0 +1,231 @@
+import math
+import numpy as np
+
+# Sampling frequencies for annualizing Sharpe / Sortino
+PERIODS_DAILY = 252
+PERIODS_HOURLY = 252 * 24
+PERIODS_SECONDLY = 365 * 24 * 60 * 60  # Crypto never closes
+
+class OnlineMetrics:
+    """
+    Responsibility: The 'Scoreboard'.
+    Updates performance statistics one step at a time in CONSTANT memory,
+    so it can sit inside a live session that runs for weeks.
+
+    Feed it the equity (portfolio value) and the position held after each step.
+    A 'trade' is a holding period: it opens when the position leaves flat
+    (or flips) and closes when the position changes again.
+    """
+    def __init__(self, periods_per_year=PERIODS_DAILY):
+        self.periods_per_year = periods_per_year
+
+        self.n_steps = 0
+        self.start_equity = None
+        self.last_equity = None
+        self.last_position = 0
+
+        # Returns (Welford running mean / variance)
+        self.n_returns = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+
+        # Drawdown
+        self.peak = -math.inf
+        self.max_drawdown = 0.0       # In $ (<= 0)
+        self.max_drawdown_pct = 0.0   # As a fraction of the peak (<= 0)
+
+        # Activity
+        self.turnover = 0.0       # Sum of |position change|
+        self.exposed_steps = 0    # Steps spent holding a position
+
+        # Trades
+        self._entry_equity = None
+        self._entry_step = 0
+        self.n_trades = 0
+        self.n_wins = 0
+        self.gross_win = 0.0
+        self.gross_loss = 0.0
+        self.total_duration = 0
+
+    def update(self, equity: float, position: float = 0):
+        # 1. Returns
+        if self.last_equity is None:
+            self.start_equity = equity
+        elif self.last_equity != 0:
+            r = equity / self.last_equity - 1.0
+            self.n_returns += 1
+            delta = r - self._mean
+            self._mean += delta / self.n_returns
+            self._m2 += delta * (r - self._mean)
+            if r < 0:
+                self._downside_sq += r * r
+
+        # 2. Drawdown
+        if equity > self.peak:
+            self.peak = equity
+        drawdown = equity - self.peak
+        if drawdown < self.max_drawdown:
+            self.max_drawdown = drawdown
+        if self.peak > 0 and drawdown / self.peak < self.max_drawdown_pct:
+            self.max_drawdown_pct = drawdown / self.peak
+
+        # 3. Position changes (Turnover + Trades)
+        if position != self.last_position:
+            self.turnover += abs(position - self.last_position)
+
+            # Close the open trade at the current equity
+            if self._entry_equity is not None:
+                self._close_trade(equity)
+
+            # Open a new one if we are not flat
+            if position != 0:
+                self._entry_equity = equity
+                self._entry_step = self.n_steps
+
+        if position != 0:
+            self.exposed_steps += 1
+
+        self.last_equity = equity
+        self.last_position = position
+        self.n_steps += 1
+
+    def _close_trade(self, equity):
+        pnl = equity - self._entry_equity
+        self.n_trades += 1
+        self.total_duration += self.n_steps - self._entry_step
+        if pnl > 0:
+            self.n_wins += 1
+            self.gross_win += pnl
+        else:
+            self.gross_loss += pnl
+        self._entry_equity = None
+
+    def summary(self) -> dict:
+        """
+        Snapshot of every metric. Cheap enough to call on every tick.
+        """
+        return _build_summary(
+            n_steps=self.n_steps,
+            start_equity=self.start_equity,
+            end_equity=self.last_equity,
+            n_returns=self.n_returns,
+            mean_return=self._mean,
+            var_return=self._m2 / (self.n_returns - 1) if self.n_returns > 1 else 0.0,
+            downside_sq=self._downside_sq,
+            max_drawdown=self.max_drawdown,
+            max_drawdown_pct=self.max_drawdown_pct,
+            turnover=self.turnover,
+            exposed_steps=self.exposed_steps,
+            n_trades=self.n_trades,
+            n_wins=self.n_wins,
+            gross_win=self.gross_win,
+            gross_loss=self.gross_loss,
+            total_duration=self.total_duration,
+            periods_per_year=self.periods_per_year,
+        )
+
+def find_trades(positions, initial=0.0):
+    """
+    Vectorized trade detection from a position series.
+    Every position change closes the previous holding period (if any)
+    and opens a new one (if the new position is not flat).
+    Trades still open at the end are ignored.
+    initial: the position held BEFORE the first element (a position already
+    held then is not a trade: it opens nothing and its later change closes nothing).
+
+    Returns:
+        (entry_idx, exit_idx): integer arrays, one element per closed trade
+    """
+    positions = np.asarray(positions, dtype=float)
+    change_idx = np.flatnonzero(np.diff(positions, prepend=initial))
+    opens = change_idx[positions[change_idx] != 0]
+    closes_at = np.searchsorted(change_idx, opens, side='right')
+    closed = closes_at < len(change_idx)
+    return opens[closed], change_idx[closes_at[closed]]
+
+def compute_metrics(equity, positions=None, periods_per_year=PERIODS_DAILY) -> dict:
+    """
+    Vectorized batch equivalent of OnlineMetrics for a finished equity curve.
+    Returns the same dictionary as OnlineMetrics.summary().
+    """
+    equity = np.asarray(equity, dtype=float)
+    n = len(equity)
+    if n == 0:
+        return OnlineMetrics(periods_per_year).summary()
+
+    positions = np.zeros(n) if positions is None else np.asarray(positions, dtype=float)
+
+    # 1. Returns
+    prev = equity[:-1]
+    valid = prev != 0
+    returns = equity[1:][valid] / prev[valid] - 1.0
+    n_returns = len(returns)
+    downside = returns[returns < 0]
+
+    # 2. Drawdown
+    running_max = np.maximum.accumulate(equity)
+    drawdown = equity - running_max
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown_pct = np.where(running_max > 0, drawdown / running_max, 0.0)
+
+    # 3. Position changes
+    changes = np.diff(positions, prepend=0.0)
+
+    # 4. Trades
+    entry_idx, exit_idx = find_trades(positions)
+    trade_pnl = equity[exit_idx] - equity[entry_idx]
+    wins = trade_pnl > 0
+
+    return _build_summary(
+        n_steps=n,
+        start_equity=equity[0],
+        end_equity=equity[-1],
+        n_returns=n_returns,
+        mean_return=returns.mean() if n_returns else 0.0,
+        var_return=returns.var(ddof=1) if n_returns > 1 else 0.0,
+        downside_sq=float(np.sum(downside ** 2)),
+        max_drawdown=float(drawdown.min()),
+        max_drawdown_pct=float(drawdown_pct.min()),
+        turnover=float(np.abs(changes).sum()),
+        exposed_steps=int(np.count_nonzero(positions)),
+        n_trades=len(trade_pnl),
+        n_wins=int(wins.sum()),
+        gross_win=float(trade_pnl[wins].sum()),
+        gross_loss=float(trade_pnl[~wins].sum()),
+        total_duration=int((exit_idx - entry_idx).sum()),
+        periods_per_year=periods_per_year,
+    )
+
+def _build_summary(n_steps, start_equity, end_equity, n_returns, mean_return, var_return,
+                   downside_sq, max_drawdown, max_drawdown_pct, turnover, exposed_steps,
+                   n_trades, n_wins, gross_win, gross_loss, total_duration, periods_per_year):
+    """
+    Turns the raw accumulators into the final report (shared by online and batch paths).
+    """
+    annualizer = math.sqrt(periods_per_year)
+    std = math.sqrt(var_return)
+    downside_dev = math.sqrt(downside_sq / n_returns) if n_returns else 0.0
+    n_losses = n_trades - n_wins
+
+    total_pnl = (end_equity - start_equity) if start_equity is not None else 0.0
+
+    return {
+        'n_steps': n_steps,
+        'start_equity': start_equity,
+        'end_equity': end_equity,
+        'total_pnl': total_pnl,
+        'total_return': total_pnl / start_equity if start_equity else 0.0,
+        'sharpe': mean_return / std * annualizer if std > 0 else 0.0,
+        'sortino': mean_return / downside_dev * annualizer if downside_dev > 0 else 0.0,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_pct': max_drawdown_pct,
+        'turnover': turnover,
+        'exposure': exposed_steps / n_steps if n_steps else 0.0,
+        'n_trades': n_trades,
+        'win_rate': n_wins / n_trades if n_trades else 0.0,
+        'avg_win': gross_win / n_wins if n_wins else 0.0,
+        'avg_loss': gross_loss / n_losses if n_losses else 0.0,
+        'profit_factor': gross_win / -gross_loss if gross_loss < 0 else (math.inf if gross_win > 0 else 0.0),
+        'avg_duration': total_duration / n_trades if n_trades else 0.0,
+    }
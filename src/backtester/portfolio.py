@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+from src.execution.fees import FeeModel, NoFee
+from src.execution.slippage import SlippageModel, NoSlippage
+from src.signals.generator import SignalGenerator
+
+class PortfolioBacktester:
+    """
+    Responsibility: The 'Plant Model' for a BASKET of pairs.
+    All pairs draw on one shared pool of capital. Every time step is processed
+    as a handful of vector ops over all pairs/assets at once.
+
+    Sizing:
+        When a pair's signal changes, it is sized to 'allocation' x current equity
+        of GROSS notional (|A leg| + |B leg|). Held positions keep their size.
+    Limits:
+        New entries are scaled down so the whole book stays within
+        max_gross x equity (sum of |leg values|) and max_net x equity (sum of leg values).
+        Exits are always allowed.
+    Netting:
+        Legs are netted per ASSET, so pairs that share a leg (e.g. BTC) only
+        trade the difference, and costs are charged on the net asset trades.
+    """
+
+    def __init__(self, initial_cash=10000.0, allocation=None, max_gross=2.0, max_net=0.5,
+                 fee_model: FeeModel = None, slippage_model: SlippageModel = None, vol_window=30):
+        self.initial_cash = initial_cash
+        self.allocation = allocation  # None -> equal weight (1 / n_pairs)
+        self.max_gross = max_gross
+        self.max_net = max_net
+        self.fee_model = fee_model or NoFee()
+        self.slippage_model = slippage_model or NoSlippage()
+        self.vol_window = vol_window
+
+        # Filled by run_backtest
+        self.pair_units = None
+        self.asset_holdings = None
+
+    def run_backtest(self, prices: pd.DataFrame, pairs, signals: pd.DataFrame):
+        """
+        Args:
+            prices:  Aligned price matrix, one column per ticker
+            pairs:   List of dicts like config.PAIRS ('id', 'asset_a', 'asset_b', 'hedge_ratio')
+            signals: Target positions (-1, 0, 1), one column per pair id, same index as prices
+
+        Returns:
+            pd.DataFrame with 'portfolio_value', 'cash', 'gross_exposure',
+            'net_exposure' and 'cost' per time step.
+        """
+        print(f"[SIMULATION] Starting Portfolio Backtest ({len(pairs)} pairs)...")
+
+        T = len(prices)
+        P = len(pairs)
+        assets = list(prices.columns)
+        price_matrix = prices.to_numpy(dtype=float)
+        signal_matrix = np.nan_to_num(signals[[pair['id'] for pair in pairs]].to_numpy(dtype=float))
+        vol_matrix = prices.diff().rolling(self.vol_window, min_periods=1).std().fillna(0.0).to_numpy()
+
+        # Leg map: units of each ASSET held per unit of each PAIR (P x A)
+        # 1 unit of spread = +1 A, -beta B
+        legs = np.zeros((P, len(assets)))
+        for p, pair in enumerate(pairs):
+            legs[p, assets.index(pair['asset_a'])] += 1.0
+            legs[p, assets.index(pair['asset_b'])] -= pair['hedge_ratio']
+        abs_legs = np.abs(legs)
+
+        allocation = self.allocation if self.allocation is not None else 1.0 / max(P, 1)
+
+        # --- PREALLOCATED OUTPUTS ---
+        units_hist = np.zeros((T, P))
+        holdings_hist = np.zeros((T, len(assets)))
+        equity = np.empty(T)
+        cash_hist = np.empty(T)
+        gross_hist = np.empty(T)
+        net_hist = np.empty(T)
+        cost_hist = np.empty(T)
+
+        cash = self.initial_cash
+        units = np.zeros(P)
+        holdings = np.zeros(len(assets))
+        prev_signal = np.zeros(P)
+
+        for t in range(T):
+            px = price_matrix[t]
+            signal = signal_matrix[t]
+
+            # 1. MARK TO MARKET (before trading)
+            current_equity = cash + holdings @ px
+
+            # 2. TARGETS: only pairs whose signal changed are re-sized
+            changed = signal != prev_signal
+            if changed.any():
+                unit_gross = abs_legs @ px           # $ gross per unit of each pair
+                unit_net = legs @ px                 # $ net per unit of each pair
+                target = units.copy()
+                target[changed] = 0.0
+
+                entering = changed & (signal != 0)
+                new_units = np.zeros(P)
+                new_units[entering] = (signal[entering] * allocation * current_equity
+                                       / unit_gross[entering])
+
+                # 3. RISK LIMITS (scale new entries into the remaining headroom)
+                scale = 1.0
+                new_gross = np.abs(new_units) @ unit_gross
+                if new_gross > 0:
+                    old_gross = np.abs(target) @ unit_gross
+                    gross_limit = self.max_gross * current_equity
+                    scale = min(scale, max(0.0, (gross_limit - old_gross) / new_gross))
+
+                    old_net = target @ unit_net
+                    new_net = new_units @ unit_net
+                    net_limit = self.max_net * current_equity
+                    if abs(old_net + scale * new_net) > net_limit and new_net != 0:
+                        bound = np.sign(new_net) * net_limit
+                        scale = min(scale, max(0.0, (bound - old_net) / new_net))
+
+                target += scale * new_units
+
+                # 4. EXECUTION: net the legs per asset, trade the difference
+                new_holdings = target @ legs
+                trades = new_holdings - holdings
+                cost = (self.fee_model.compute(trades, px).sum()
+                        + self.slippage_model.compute(trades, px, vol_matrix[t]).sum())
+                cash -= trades @ px + cost
+
+                units = target
+                holdings = new_holdings
+            else:
+                cost = 0.0
+
+            prev_signal = signal
+
+            # 5. RECORD
+            leg_values = holdings * px
+            units_hist[t] = units
+            holdings_hist[t] = holdings
+            cash_hist[t] = cash
+            equity[t] = cash + leg_values.sum()
+            gross_hist[t] = np.abs(leg_values).sum()
+            net_hist[t] = leg_values.sum()
+            cost_hist[t] = cost
+
+        self.pair_units = pd.DataFrame(units_hist, index=prices.index, columns=[pair['id'] for pair in pairs])
+        self.asset_holdings = pd.DataFrame(holdings_hist, index=prices.index, columns=assets)
+
+        return pd.DataFrame({
+            'portfolio_value': equity,
+            'cash': cash_hist,
+            'gross_exposure': gross_hist,
+            'net_exposure': net_hist,
+            'cost': cost_hist,
+        }, index=prices.index)
+
+def generate_signal_matrix(prices: pd.DataFrame, pairs, z_window=30, entry=2.0, exit=0.0) -> pd.DataFrame:
+    """
+    Spreads and Z-Scores for every pair in one shot (rolling stats run column-wise in C),
+    then the entry/exit state machine per pair.
+    """
+    spreads = pd.DataFrame({
+        pair['id']: prices[pair['asset_a']] - pair['hedge_ratio'] * prices[pair['asset_b']]
+        for pair in pairs
+    })
+    rolling = spreads.rolling(window=z_window)
+    z_scores = (spreads - rolling.mean()) / rolling.std()
+
+    generator = SignalGenerator(entry_threshold=entry, exit_threshold=exit)
+    return pd.DataFrame({pid: generator.generate_signals(z_scores[pid]) for pid in z_scores.columns})
+
+if __name__ == "__main__":
+    import config
+    from src.data_loader.connector import YahooConnector
+    from src.signals.cointegration import CointegrationTests
+    from src.backtester.walk_forward import build_price_matrix
+    from src.backtester.performance import compute_metrics
+    from src.execution.fees import BpsFee
+    from src.execution.slippage import SpreadSlippage
+
+    connector = YahooConnector()
+    tickers = sorted({t for pair in config.PAIRS for t in (pair['asset_a'], pair['asset_b'])})
+    prices = build_price_matrix({
+        t: connector.fetch_ticker(t, config.START_DATE, config.END_DATE, config.INTERVAL) for t in tickers
+    })
+
+    # Calibrate each pair's beta on the first half only, trade the second half (as main.py does)
+    train_end, test_start = "2023-06-01", "2023-06-02"
+    train, prices = prices.loc[:train_end], prices.loc[test_start:]
+    coint_engine = CointegrationTests()
+    pairs = [{**pair, 'hedge_ratio': coint_engine.calculate_hedge_ratio(train[pair['asset_a']], train[pair['asset_b']])}
+             for pair in config.PAIRS]
+    for pair in pairs:
+        print(f"[MATH] {pair['id']}: Calibrated Hedge Ratio (Beta) {pair['hedge_ratio']:.4f} (using data up to {train_end})")
+
+    signals = generate_signal_matrix(prices, pairs, config.Z_SCORE_WINDOW,
+                                     config.ENTRY_THRESHOLD, config.EXIT_THRESHOLD)
+    backtester = PortfolioBacktester(
+        initial_cash=10_000,
+        max_gross=config.MAX_GROSS_EXPOSURE,
+        max_net=config.MAX_NET_EXPOSURE,
+        fee_model=BpsFee(config.FEE_BPS),
+        slippage_model=SpreadSlippage(config.SLIPPAGE_BPS)
+    )
+    results = backtester.run_backtest(prices, pairs, signals)
+
+    metrics = compute_metrics(results['portfolio_value'])
+    print("\n--- PORTFOLIO REPORT ---")
+    print(f"Final Equity:   ${metrics['end_equity']:,.2f}")
+    print(f"Return:         {metrics['total_return'] * 100:.2f}%")
+    print(f"Sharpe:         {metrics['sharpe']:.2f}")
+    print(f"Max Drawdown:   ${metrics['max_drawdown']:,.2f}")
+    print(f"Peak Gross:     ${results['gross_exposure'].max():,.2f}")
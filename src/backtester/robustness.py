@@ -0,0 +1,190 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from src.backtester.performance import find_trades, PERIODS_DAILY
+from src.backtester.walk_forward import fit_hedge_ratio, backtest_pair
+from src.data_loader.synthetic import ou_filter
+
+class RobustnessEngine:
+    """
+    Responsibility: Stress-testing a backtest.
+    One equity curve is one draw from a distribution. This engine generates
+    thousands of alternative histories and reports confidence intervals for
+    PnL, Sharpe and Max Drawdown.
+
+    Three resampling schemes:
+        1. Block bootstrap of step returns (keeps short-range autocorrelation)
+        2. Trade-order permutations (same trades, different luck in sequencing)
+        3. Synthetic cointegrated pairs with an OU spread (re-runs the full strategy)
+
+    Work is split into fixed-size chunks, each with its own child seed, and
+    spread across a process pool. Results are identical for any worker count.
+    """
+    def __init__(self, n_samples=1000, seed=42, workers=None, chunk_size=250,
+                 periods_per_year=PERIODS_DAILY):
+        self.n_samples = n_samples
+        self.seed = seed
+        self.workers = workers  # None = all cores, 1 = run in this process
+        self.chunk_size = chunk_size
+        self.periods_per_year = periods_per_year
+
+    # --- PUBLIC API ---
+
+    def bootstrap_returns(self, equity, block_size=20) -> pd.DataFrame:
+        """
+        Resamples the step returns of an equity curve in contiguous blocks.
+        """
+        equity = np.asarray(equity, dtype=float)
+        if len(equity) < 2:
+            raise ValueError("bootstrap_returns needs an equity curve with at least 2 points")
+        if block_size < 1:
+            raise ValueError(f"block_size must be at least 1, got {block_size}")
+        returns = equity[1:] / equity[:-1] - 1.0
+        payload = {'returns': returns, 'block_size': min(block_size, len(returns)),
+                   'initial': equity[0], 'periods_per_year': self.periods_per_year}
+        return self._run('bootstrap', payload)
+
+    def permute_trades(self, trade_pnls, initial_equity=10_000.0) -> pd.DataFrame:
+        """
+        Shuffles the ORDER of closed trades. Total PnL is unchanged, but
+        drawdown tells you how much of the path was luck.
+        One step is one trade, not one bar, so 'sharpe' is PER TRADE (not annualized).
+
+        trade_pnls: array of net trade PnL, e.g. [t['net_pnl'] for t in trades]
+        from evaluate.analyze_performance, or trade_pnls_from_backtest().
+        """
+        pnls = np.asarray(trade_pnls, dtype=float)
+        if len(pnls) == 0:
+            raise ValueError("permute_trades needs at least one closed trade")
+        payload = {'pnls': pnls, 'initial': initial_equity, 'periods_per_year': 1}
+        return self._run('permute', payload)
+
+    def synthetic_paths(self, n_bars=500, beta=1.0, theta=0.1, spread_vol=1.0, price_b=100.0,
+                        vol_b=0.01, train_fraction=0.5, z_window=30, entry=2.0, exit=0.0,
+                        fee_bps=0.0, slippage_bps=0.0, initial_cash=10_000.0) -> pd.DataFrame:
+        """
+        Simulates cointegrated pairs (B = geometric random walk, A = beta*B + OU spread),
+        calibrates the hedge ratio on the first 'train_fraction' of each path and trades the rest.
+        The OU spread is the one SyntheticMarket uses (ou_filter, one bar = one time unit).
+        """
+        if not theta > 0:
+            raise ValueError(f"theta (mean reversion speed) must be positive, got {theta}")
+        split = int(n_bars * train_fraction)
+        if split < 2 or n_bars - split < 2:
+            raise ValueError(f"n_bars={n_bars} with train_fraction={train_fraction} leaves "
+                             f"fewer than 2 bars to calibrate or to trade")
+        payload = {'n_bars': n_bars, 'beta': beta, 'theta': theta, 'spread_vol': spread_vol,
+                   'price_b': price_b, 'vol_b': vol_b, 'train_fraction': train_fraction,
+                   'strategy': {'z_window': z_window, 'entry': entry, 'exit': exit, 'fee_bps': fee_bps,
+                                'slippage_bps': slippage_bps, 'initial_cash': initial_cash},
+                   'periods_per_year': self.periods_per_year}
+        return self._run('synthetic', payload)
+
+    @staticmethod
+    def confidence_intervals(samples: pd.DataFrame, levels=(0.05, 0.5, 0.95)) -> pd.DataFrame:
+        """
+        Percentiles of every metric column (rows = levels).
+        """
+        return samples.quantile(list(levels))
+
+    # --- INTERNALS ---
+
+    def _run(self, kind, payload) -> pd.DataFrame:
+        n_chunks = -(-self.n_samples // self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        sizes = [min(self.chunk_size, self.n_samples - i * self.chunk_size) for i in range(n_chunks)]
+        tasks = [(kind, payload, seed, size) for seed, size in zip(seeds, sizes)]
+
+        print(f"[ROBUSTNESS] {kind}: {self.n_samples} samples in {n_chunks} chunks...")
+
+        if self.workers == 1:
+            chunks = [_run_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                chunks = list(pool.map(_run_chunk, tasks))
+
+        return pd.DataFrame(np.concatenate(chunks), columns=['pnl', 'sharpe', 'max_drawdown'])
+
+def trade_pnls_from_backtest(results: pd.DataFrame) -> np.ndarray:
+    """
+    Closed-trade PnL from a BacktestEngine results frame (equity at exit - equity at entry).
+    """
+    equity = results['portfolio_value'].to_numpy(dtype=float)
+    entry_idx, exit_idx = find_trades(results['position'].to_numpy())
+    return equity[exit_idx] - equity[entry_idx]
+
+def path_stats(equity: np.ndarray, periods_per_year=PERIODS_DAILY) -> np.ndarray:
+    """
+    PnL, Sharpe and Max Drawdown for MANY equity curves at once.
+    equity: (n_paths, n_steps) -> returns (n_paths, 3)
+    """
+    pnl = equity[:, -1] - equity[:, 0]
+
+    returns = equity[:, 1:] / equity[:, :-1] - 1.0
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(equity))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+
+    drawdown = (equity - np.maximum.accumulate(equity, axis=1)).min(axis=1)
+    return np.column_stack([pnl, sharpe, drawdown])
+
+def _run_chunk(task) -> np.ndarray:
+    kind, payload, seed, size = task
+    rng = np.random.default_rng(seed)
+    ppy = payload['periods_per_year']
+
+    if kind == 'bootstrap':
+        returns = payload['returns']
+        block = payload['block_size']
+        n_blocks = -(-len(returns) // block)
+
+        # Random block starts -> (size, n_blocks * block) index matrix, trimmed to length
+        starts = rng.integers(0, len(returns) - block + 1, size=(size, n_blocks))
+        idx = (starts[:, :, None] + np.arange(block)).reshape(size, -1)[:, :len(returns)]
+        growth = np.cumprod(1.0 + returns[idx], axis=1)
+        equity = payload['initial'] * np.hstack([np.ones((size, 1)), growth])
+        return path_stats(equity, ppy)
+
+    if kind == 'permute':
+        pnls = payload['pnls']
+        shuffled = rng.permuted(np.tile(pnls, (size, 1)), axis=1)
+        equity = payload['initial'] + np.hstack([np.zeros((size, 1)), np.cumsum(shuffled, axis=1)])
+        return path_stats(equity, ppy)
+
+    if kind == 'synthetic':
+        n = payload['n_bars']
+
+        # 1. Asset B: geometric random walk (all paths at once)
+        log_b = np.cumsum(rng.normal(0.0, payload['vol_b'], size=(size, n)), axis=1)
+        price_b = payload['price_b'] * np.exp(log_b)
+
+        # 2. Spread: discrete OU, x_t = phi * x_{t-1} + eps (same generator as SyntheticMarket)
+        spread = ou_filter(rng.normal(size=(size, n)), payload['theta'], payload['spread_vol'])
+
+        # 3. Asset A: cointegrated with B
+        price_a = payload['beta'] * price_b + spread
+
+        # 4. Calibrate + trade each path with the production strategy chain
+        split = int(n * payload['train_fraction'])
+        stats = np.empty((size, 3))
+        for i in range(size):
+            beta = fit_hedge_ratio(price_a[i, :split], price_b[i, :split])
+            results = backtest_pair(price_a[i, split:], price_b[i, split:], beta, **payload['strategy'])
+            stats[i] = path_stats(results['portfolio_value'].to_numpy()[None, :], ppy)[0]
+        return stats
+
+    raise ValueError(f"Unknown resampling scheme: {kind}")
+
+if __name__ == "__main__":
+    import config
+
+    engine = RobustnessEngine(n_samples=2000, seed=7)
+    samples = engine.synthetic_paths(
+        n_bars=500, beta=1.5, theta=0.2, spread_vol=2.0,
+        z_window=config.Z_SCORE_WINDOW, entry=config.ENTRY_THRESHOLD, exit=config.EXIT_THRESHOLD,
+        fee_bps=config.FEE_BPS, slippage_bps=config.SLIPPAGE_BPS
+    )
+    print("\n--- SYNTHETIC PATH CONFIDENCE INTERVALS ---")
+    print(RobustnessEngine.confidence_intervals(samples))
@@ -0,0 +1,203 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from src.shared.shared_arrays import SharedArray
+from src.signals.zscore import ZScoreGenerator
+from src.signals.generator import SignalGenerator
+from src.backtester.engine import BacktestEngine
+from src.backtester.performance import compute_metrics, PERIODS_DAILY
+from src.execution.fees import BpsFee
+from src.execution.slippage import SpreadSlippage
+
+# Worker-side globals (set once per process by the pool initializer)
+_PRICES = None
+_SHARED = None
+_PARAMS = None
+
+def generate_windows(n_bars, train_size, test_size, step=None, anchored=False):
+    """
+    Splits [0, n_bars) into (train_start, train_end, test_start, test_end) index windows.
+
+    Rolling:  the calibration window slides forward with a fixed length.
+    Anchored: the calibration window always starts at bar 0 and grows.
+    Trading windows never overlap when step == test_size (the default).
+    """
+    step = step or test_size
+    windows = []
+    start = 0
+    while start + train_size + test_size <= n_bars:
+        train_start = 0 if anchored else start
+        train_end = start + train_size
+        windows.append((train_start, train_end, train_end, train_end + test_size))
+        start += step
+    return windows
+
+def build_price_matrix(series_by_ticker: dict) -> pd.DataFrame:
+    """
+    Aligns any number of price series onto one time index (the multi-asset DataAligner).
+    """
+    df = pd.DataFrame(series_by_ticker).sort_index().ffill().dropna()
+    return df
+
+def _init_worker(spec, params):
+    global _PRICES, _SHARED, _PARAMS
+    _SHARED = SharedArray.attach(spec)
+    _PRICES = _SHARED.array
+    _PARAMS = params
+
+def fit_hedge_ratio(price_a: np.ndarray, price_b: np.ndarray) -> float:
+    """
+    OLS slope of A on B with an intercept (same estimate as CointegrationTests,
+    closed form so workers don't pay for statsmodels on every fold).
+    """
+    b_centered = price_b - price_b.mean()
+    return float(np.dot(b_centered, price_a - price_a.mean()) / np.dot(b_centered, b_centered))
+
+def backtest_pair(price_a: np.ndarray, price_b: np.ndarray, beta: float, z_window=30, entry=2.0, exit=0.0,
+                  fee_bps=0.0, slippage_bps=0.0, initial_cash=10_000.0, warmup=0) -> pd.DataFrame:
+    """
+    The main.py simulation chain (Spread -> Z-Score -> Signals -> Engine) on raw arrays.
+    warmup: leading bars that only seed the rolling z-score window (e.g. the tail
+    of the training slice); they are neither traded nor returned.
+    """
+    df = pd.DataFrame({'asset_a': price_a, 'asset_b': price_b})
+    df['spread'] = df['asset_a'] - beta * df['asset_b']
+    df['z_score'] = ZScoreGenerator(window=z_window).compute(df['spread'])
+    df = df.iloc[warmup:].reset_index(drop=True)
+    df['signal'] = SignalGenerator(entry, exit).generate_signals(df['z_score'])
+
+    engine = BacktestEngine(
+        initial_cash=initial_cash,
+        fee_model=BpsFee(fee_bps),
+        slippage_model=SpreadSlippage(slippage_bps),
+        verbose=False
+    )
+    return engine.run_backtest(df, beta)
+
+def _run_fold(task):
+    """
+    Calibrate on the training slice, trade the following out-of-sample slice.
+    """
+    pair_id, col_a, col_b, fold, train_start, train_end, test_start, test_end = task
+    params = _PARAMS
+
+    # 1. CALIBRATION (In-Sample)
+    beta = fit_hedge_ratio(_PRICES[train_start:train_end, col_a], _PRICES[train_start:train_end, col_b])
+
+    # 2. SIMULATION (Out-of-Sample) using the TRAINING Beta (No cheating!)
+    # The z-score window is seeded with the end of the training slice (past data only),
+    # so the first test bar can already trade; only test bars are scored.
+    warmup = min(params['z_window'] - 1, test_start - train_start)
+    results = backtest_pair(
+        _PRICES[test_start - warmup:test_end, col_a], _PRICES[test_start - warmup:test_end, col_b], beta,
+        z_window=params['z_window'], entry=params['entry'], exit=params['exit'],
+        fee_bps=params['fee_bps'], slippage_bps=params['slippage_bps'],
+        initial_cash=params['initial_cash'], warmup=warmup
+    )
+
+    # 3. SCORE
+    metrics = compute_metrics(results['portfolio_value'].to_numpy(), results['position'].to_numpy(),
+                              periods_per_year=params['periods_per_year'])
+    metrics.update({'pair_id': pair_id, 'fold': fold, 'beta': beta,
+                    'train_start': train_start, 'train_end': train_end,
+                    'test_start': test_start, 'test_end': test_end})
+    return metrics
+
+def run_walk_forward(prices: pd.DataFrame, pairs, train_size, test_size, step=None, anchored=False,
+                     z_window=30, entry=2.0, exit=0.0, fee_bps=0.0, slippage_bps=0.0,
+                     initial_cash=10_000.0, periods_per_year=PERIODS_DAILY, workers=None) -> pd.DataFrame:
+    """
+    Runs every (pair, fold) combination across a process pool.
+
+    Args:
+        prices: Aligned price matrix, one column per ticker (see build_price_matrix)
+        pairs:  List of dicts like config.PAIRS ('id', 'asset_a', 'asset_b')
+        workers: Number of processes (None = all cores, 1 = run in this process)
+
+    Returns:
+        pd.DataFrame: One row per fold with its metrics and calendar dates.
+    """
+    global _PRICES, _PARAMS
+
+    windows = generate_windows(len(prices), train_size, test_size, step, anchored)
+    columns = {ticker: i for i, ticker in enumerate(prices.columns)}
+    tasks = [
+        (pair['id'], columns[pair['asset_a']], columns[pair['asset_b']], fold, *window)
+        for pair in pairs
+        for fold, window in enumerate(windows)
+    ]
+    params = {'z_window': z_window, 'entry': entry, 'exit': exit, 'fee_bps': fee_bps,
+              'slippage_bps': slippage_bps, 'initial_cash': initial_cash,
+              'periods_per_year': periods_per_year}
+
+    print(f"[WALK-FORWARD] {len(pairs)} pairs x {len(windows)} folds = {len(tasks)} backtests")
+
+    matrix = prices.to_numpy(dtype=float)
+    if workers == 1:
+        # Debug path: no pool, no shared memory
+        _PRICES, _PARAMS = matrix, params
+        rows = [_run_fold(task) for task in tasks]
+    else:
+        # Prices go into shared memory ONCE; workers attach read-only
+        shared = SharedArray.create(matrix)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.spec, params)) as pool:
+                chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+                rows = list(pool.map(_run_fold, tasks, chunksize=chunksize))
+        finally:
+            shared.close()
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+
+    # Translate bar indices back to calendar dates
+    index = prices.index
+    for col in ['train_start', 'test_start']:
+        results[col] = index[results[col].to_numpy()]
+    for col in ['train_end', 'test_end']:
+        results[col] = index[results[col].to_numpy() - 1]
+    return results
+
+def summarize_walk_forward(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the folds into one line per pair.
+    """
+    grouped = results.groupby('pair_id')
+    return pd.DataFrame({
+        'folds': grouped.size(),
+        'total_pnl': grouped['total_pnl'].sum(),
+        'mean_sharpe': grouped['sharpe'].mean(),
+        'profitable_folds': grouped['total_pnl'].apply(lambda pnl: (pnl > 0).mean()),
+        'worst_drawdown': grouped['max_drawdown'].min(),
+        'trades': grouped['n_trades'].sum(),
+        'beta_std': grouped['beta'].std(),
+    })
+
+if __name__ == "__main__":
+    import config
+    from src.data_loader.connector import YahooConnector
+
+    connector = YahooConnector()
+    tickers = sorted({t for pair in config.PAIRS for t in (pair['asset_a'], pair['asset_b'])})
+    prices = build_price_matrix({
+        t: connector.fetch_ticker(t, config.START_DATE, config.END_DATE, config.INTERVAL) for t in tickers
+    })
+
+    results = run_walk_forward(
+        prices, config.PAIRS,
+        train_size=config.WF_TRAIN_BARS,
+        test_size=config.WF_TEST_BARS,
+        anchored=config.WF_ANCHORED,
+        z_window=config.Z_SCORE_WINDOW,
+        entry=config.ENTRY_THRESHOLD,
+        exit=config.EXIT_THRESHOLD,
+        fee_bps=config.FEE_BPS,
+        slippage_bps=config.SLIPPAGE_BPS,
+    )
+    print(results[['pair_id', 'fold', 'test_start', 'test_end', 'beta', 'total_pnl', 'sharpe', 'n_trades']])
+    print("\n--- WALK-FORWARD SUMMARY ---")
+    print(summarize_walk_forward(results))
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+class FeatureStore:
+    """
+    Responsibility: Disk cache for cleaned + engineered feature arrays.
+    Each entry is a folder of .npy files (one per feature) that is opened
+    memory-mapped, so a multi-GB session 'loads' in milliseconds and the OS
+    page cache is shared between every process reading it.
+
+    Entries are keyed by the SOURCE FINGERPRINT (path, size, mtime) and the
+    preprocessing PARAMETERS. Re-recording the CSV or changing a parameter
+    produces a new key, and stale entries for the same source are pruned.
+    A source can also be a LIST of files (e.g. a concatenated session catalog).
+    """
+    def __init__(self, cache_dir="data/processed/feature_cache"):
+        self.cache_dir = cache_dir
+
+    def get(self, source_path, params: dict, builder) -> dict:
+        """
+        Returns the cached arrays for (source, params), building them with
+        builder() -> dict of np.ndarray on a miss.
+        """
+        prefix = self._prefix(source_path)
+        source_key = self._source_key(source_path)
+        entry = os.path.join(self.cache_dir, f"{prefix}{source_key}-{self._hash(params)}")
+
+        if os.path.exists(os.path.join(entry, "meta.json")):
+            return self._load(entry)
+
+        features = builder()
+        self._save(entry, features, source_path, params)
+        self._prune(prefix, current=prefix + source_key)
+        return features
+
+    def _prefix(self, source_path) -> str:
+        # "<file stem>-<path hash>-": groups every entry built from the same file(s)
+        if isinstance(source_path, (list, tuple)):
+            return f"catalog-{self._hash([os.path.abspath(p) for p in source_path])[:8]}-"
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return f"{stem}-{self._hash(os.path.abspath(source_path))[:8]}-"
+
+    def _source_key(self, source_path) -> str:
+        # Changes whenever a file is rewritten or appended to
+        paths = source_path if isinstance(source_path, (list, tuple)) else [source_path]
+        stats = [os.stat(p) for p in paths]
+        return self._hash([{'size': st.st_size, 'mtime_ns': st.st_mtime_ns} for st in stats])
+
+    @staticmethod
+    def _hash(value) -> str:
+        blob = json.dumps(value, sort_keys=True, default=str).encode()
+        return hashlib.sha1(blob).hexdigest()[:16]
+
+    def _load(self, entry) -> dict:
+        with open(os.path.join(entry, "meta.json")) as f:
+            meta = json.load(f)
+        return {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r') for name in meta['features']}
+
+    def _save(self, entry, features, source_path, params):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Write into a temp folder, then rename: readers never see a half-written entry
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            for name, values in features.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(values))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({'source': source_path, 'params': params,
+                           'features': list(features)}, f, default=str)
+            os.replace(tmp, entry)
+        except OSError as e:
+            # Another process won the race (entry exists) or the disk is full: just skip caching
+            print(f"[CACHE] Could not write {entry}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _prune(self, prefix, current):
+        # Entries built from an OLDER version of the same file (any params)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and not name.startswith(current):
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
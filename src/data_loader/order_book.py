@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+import numpy as np
+
+BOOK_MODES = ('depth', 'ticker')
+BOOK_PRICES = ('microprice', 'mid')
+
+@dataclass
+class TopOfBook:
+    """
+    Best bid / ask of one symbol and the prices derived from them.
+    """
+    bid: float
+    bid_size: float
+    ask: float
+    ask_size: float
+
+    @property
+    def mid(self) -> float:
+        return 0.5 * (self.bid + self.ask)
+
+    @property
+    def microprice(self) -> float:
+        # Size-weighted mid: leans towards the side with LESS size (the one about to be taken)
+        depth = self.bid_size + self.ask_size
+        if depth <= 0:
+            return self.mid
+        return (self.bid * self.ask_size + self.ask * self.bid_size) / depth
+
+    def fields(self, leg: str) -> dict:
+        """
+        Blackboard fields of this leg ('a' or 'b').
+        """
+        return {f'bid_{leg}': self.bid, f'ask_{leg}': self.ask,
+                f'bid_size_{leg}': self.bid_size, f'ask_size_{leg}': self.ask_size,
+                f'mid_{leg}': self.mid, f'microprice_{leg}': self.microprice}
+
+def parse_levels(levels):
+    """
+    Binance [["price", "qty"], ...] (strings) -> (prices, sizes) float arrays.
+    """
+    flat = np.fromiter((float(x) for level in levels for x in level), dtype=float, count=2 * len(levels))
+    return flat[0::2], flat[1::2]
+
+class BookSide:
+    """
+    Responsibility: One side of a book as two preallocated, sorted arrays
+    (keys, sizes), best level first.
+
+    Keys are prices for asks and NEGATED prices for bids, so both sides sort
+    ascending and the best level is always index 0. A diff message is merged
+    in one vectorized pass (binary search, insert, compact) instead of a
+    Python loop per level. Levels beyond 'capacity' (the deep end) are dropped.
+    """
+    def __init__(self, side: str, capacity=5000):
+        if side not in ('bid', 'ask'):
+            raise ValueError(f"Unknown book side: {side}")
+        self.sign = -1.0 if side == 'bid' else 1.0
+        self.capacity = capacity
+        self.keys = np.empty(capacity)
+        self.sizes = np.empty(capacity)
+        self.count = 0
+
+    def load(self, prices, sizes):
+        """
+        Replaces the whole side (snapshot).
+        """
+        keys = self.sign * np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        live = sizes > 0
+        order = np.argsort(keys[live], kind='stable')[:self.capacity]
+        self.count = len(order)
+        self.keys[:self.count] = keys[live][order]
+        self.sizes[:self.count] = sizes[live][order]
+
+    def apply(self, prices, sizes):
+        """
+        Merges absolute level updates (size 0 removes the level).
+        """
+        if len(prices) == 0:
+            return
+        keys = self.sign * prices
+        n = self.count
+        book = self.keys[:n]
+
+        # 1. Levels already in the book: overwrite their size
+        idx = np.searchsorted(book, keys)
+        found = idx < n
+        found[found] = book[idx[found]] == keys[found]
+        self.sizes[idx[found]] = sizes[found]
+
+        # 2. New levels: one sorted insert for all of them
+        new = ~found & (sizes > 0)
+        if new.any():
+            order = np.argsort(keys[new], kind='stable')
+            at, new_keys, new_sizes = idx[new][order], keys[new][order], sizes[new][order]
+            merged_keys = np.insert(book, at, new_keys)[:self.capacity]
+            merged_sizes = np.insert(self.sizes[:n], at, new_sizes)[:self.capacity]
+            n = len(merged_keys)
+            self.keys[:n] = merged_keys
+            self.sizes[:n] = merged_sizes
+
+        # 3. Removed levels: compact in place
+        if found.any() and not sizes[found].all():
+            keep = self.sizes[:n] > 0
+            m = int(keep.sum())
+            self.keys[:m] = self.keys[:n][keep]
+            self.sizes[:m] = self.sizes[:n][keep]
+            n = m
+        self.count = n
+
+    def best(self):
+        """
+        (price, size) of the best level, or None if the side is empty.
+        """
+        if self.count == 0:
+            return None
+        return self.sign * self.keys[0], self.sizes[0]
+
+    def levels(self, depth=10) -> np.ndarray:
+        """
+        The best 'depth' levels as a (depth, 2) [price, size] array.
+        """
+        k = min(depth, self.count)
+        return np.column_stack((self.sign * self.keys[:k], self.sizes[:k]))
+
+class OrderBook:
+    """
+    Responsibility: A local L2 book of ONE symbol kept in sync with Binance's
+    snapshot + diff protocol:
+
+        1. Buffer the depth stream, fetch a REST snapshot (lastUpdateId).
+        2. Drop diffs already contained in the snapshot (u <= lastUpdateId).
+        3. The first applied diff must straddle it (U <= lastUpdateId + 1 <= u),
+           each next one must continue it (U == previous u + 1).
+        4. Anything else is a GAP: apply_diff() returns False and the caller
+           must resync from a fresh snapshot.
+    """
+    def __init__(self, symbol="", capacity=5000):
+        self.symbol = symbol
+        self.bids = BookSide('bid', capacity)
+        self.asks = BookSide('ask', capacity)
+        self.last_update_id = None  # None until a snapshot is loaded
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def load_snapshot(self, last_update_id, bids, asks):
+        """
+        bids / asks: Binance [["price", "qty"], ...] lists.
+        """
+        self.bids.load(*parse_levels(bids))
+        self.asks.load(*parse_levels(asks))
+        self.last_update_id = int(last_update_id)
+
+    def apply_diff(self, first_id, final_id, bids, asks) -> bool:
+        """
+        Applies one depth diff event (U = first_id, u = final_id).
+        Returns: False on a sequence gap (the book is then unsynced), else True.
+        """
+        if self.last_update_id is None:
+            return False
+        if final_id <= self.last_update_id:
+            return True  # Already in the snapshot
+        if first_id > self.last_update_id + 1:
+            self.last_update_id = None
+            return False
+
+        self.bids.apply(*parse_levels(bids))
+        self.asks.apply(*parse_levels(asks))
+        self.last_update_id = int(final_id)
+        return True
+
+    def top(self):
+        """
+        TopOfBook, or None while either side is empty or the book is unsynced.
+        """
+        if not self.synced:
+            return None
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return TopOfBook(float(bid[0]), float(bid[1]), float(ask[0]), float(ask[1]))
@@ -1,16 +1,27 @@
-import asyncio
 import csv
 import os
-from src.shared.state import Blackboard
+import time
+from src.shared.state import Blackboard, TOPIC_MATH
+from src.shared.clock import RealClock
+from src.shared.metrics import RECORDER_FLUSH
 
 class DataRecorder:
     """
-    Responsibility: Sample the Blackboard every 1 second and dump the 
-    current 'Truth' to a CSV file.
+    Responsibility: Dump the current 'Truth' to a CSV file, once every
+    'interval' seconds of its clock (the newest math result pushed by the
+    Blackboard, no polling).
+
+    features: optional FeaturePipeline (src/processors/features.py) whose
+    columns are streamed row by row and appended after the math columns.
     """
-    def __init__(self, blackboard: Blackboard, filename="data/raw/live_session.csv"):
+    def __init__(self, blackboard: Blackboard, filename="data/raw/live_session.csv", clock=None, interval=1.0,
+                 features=None):
         self.blackboard = blackboard
         self.filename = filename
+
+        # The Clock: wall time when live, market time when replaying
+        self.clock = clock or RealClock()
+        self.interval = interval
         
         # Ensure the folder exists (e.g., data/raw/)
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
@@ -27,35 +38,56 @@ class DataRecorder:
             "z_score"     # The Signal
         ]
         
+        # Extra engineered columns, computed incrementally as rows are written
+        self.features = features.stream() if features is not None else None
+        if self.features is not None:
+            self.headers += self.features.columns
+        
         # Create file with headers if it doesn't exist
         if not os.path.exists(self.filename):
             with open(self.filename, mode='w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow(self.headers)
             print(f"[RECORDER] Created new file: {self.filename}")
+        else:
+            with open(self.filename, newline='') as f:
+                existing = next(csv.reader(f), [])
+            # Rows of another width would make the whole file unreadable (load_features)
+            if existing != self.headers:
+                raise ValueError(f"[RECORDER] {self.filename} has columns {existing}, this recorder writes "
+                                 f"{self.headers}. Record to a new file or match RECORD_FEATURES.")
 
     async def run(self):
-        print(f"[RECORDER] Started. Dumping state every 1.0s to {self.filename}...")
+        print(f"[RECORDER] Started. Dumping state every {self.interval}s to {self.filename}...")
         
-        while True:
-            # 1. The Clock: Wait exactly 1 second
-            await asyncio.sleep(1.0)
-            
-            # 2. The Read: Get atomic snapshot from Blackboard
-            state = await self.blackboard.get_state()
-            
-            # 3. The Filter: Don't record empty zeros (waiting for first tick)
-            if state.price_a == 0 or state.timestamp == 0:
-                continue
-                
-            # 4. The Write: Append to CSV
-            self._write_row(state)
+        # The Feed: newest math result (pushed, never polled). Rows stay on a FIXED grid of
+        # one per interval (consumers assume it), repeating the last result in quiet markets.
+        subscription = self.blackboard.subscribe(mode='latest', topics=(TOPIC_MATH,))
+        state = None
+        try:
+            while True:
+                # 1. The Clock: Wait exactly 1 interval (of this clock)
+                await self.clock.sleep(self.interval)
+
+                # 2. The Read: the newest snapshot, if any arrived (each one is an atomic copy)
+                if subscription.pending():
+                    state = await subscription.get()
+
+                # 3. The Filter: Don't record empty zeros (waiting for first tick)
+                if state is None or state.price_a == 0 or state.timestamp == 0:
+                    continue
+                    
+                # 4. The Write: Append to CSV
+                self._write_row(state)
+        finally:
+            subscription.close()
 
     def _write_row(self, state):
+        started = time.perf_counter()
         try:
             with open(self.filename, mode='a', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow([
+                row = [
                     state.timestamp,
                     state.price_a,
                     state.price_b,
@@ -64,6 +96,10 @@ class DataRecorder:
                     state.volatility,
                     state.spread,
                     state.z_score
-                ])
+                ]
+                if self.features is not None:
+                    row += self.features.update(dict(zip(self.headers, row))).tolist()
+                writer.writerow(row)
         except Exception as e:
-            print(f"[RECORDER] Error writing to CSV: {e}")
\ No newline at end of file
+            print(f"[RECORDER] Error writing to CSV: {e}")
+        RECORDER_FLUSH.observe(time.perf_counter() - started)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pandas as pd
+from src.shared.state import Blackboard
+from src.shared.clock import VirtualClock
+from src.shared.metrics import TICKS_INGESTED
+
+class ReplayStream:
+    """
+    Responsibility: Stand-in for BinanceStream.
+    Reads a recorded session (e.g. live_session.csv) and pushes each tick into
+    the Blackboard, ringing the same bell the live stream does.
+
+    Speed:
+        1.0   -> Real time (same cadence as the recording)
+        N     -> N times faster than market time
+        None  -> Unthrottled (as fast as the CPU allows)
+
+    Lockstep needs the consumer to set 'ack' when it picks up a tick
+    (run_math_engine(..., ack=stream.ack)). If no ack arrives within
+    'lockstep_timeout' seconds, the replay carries on without lockstep.
+    """
+    def __init__(self, blackboard: Blackboard, event: asyncio.Event, filename: str,
+                 speed=None, clock: VirtualClock = None, lockstep=True, ack: asyncio.Event = None,
+                 lockstep_timeout=5.0):
+        self.update_event = event  # The Bell
+        self.blackboard = blackboard
+        self.filename = filename
+        self.speed = speed
+
+        # Consumers that sleep on this clock see market time, not wall time
+        self.clock = clock or VirtualClock()
+
+        # Lockstep: wait for the consumer to pick up each tick before sending the next.
+        # Without it, unthrottled replay coalesces ticks exactly like a slow live consumer.
+        self.lockstep = lockstep
+        self.ack = ack or asyncio.Event()
+        self.lockstep_timeout = lockstep_timeout
+
+        self.ticks_sent = 0
+
+    def _load(self):
+        df = pd.read_csv(self.filename, usecols=["timestamp", "price_a", "price_b"])
+        df = df.dropna().sort_values("timestamp")
+        return (df["timestamp"].to_numpy(dtype=float),
+                df["price_a"].to_numpy(dtype=float),
+                df["price_b"].to_numpy(dtype=float))
+
+    async def connect(self):
+        timestamps, prices_a, prices_b = self._load()
+        if len(timestamps) == 0:
+            print(f"[REPLAY] No ticks found in {self.filename}.")
+            return
+
+        speed_label = "unthrottled" if not self.speed else f"{self.speed:g}x"
+        print(f"[REPLAY] Replaying {len(timestamps)} ticks from {self.filename} ({speed_label})...")
+
+        self.clock.advance_to(timestamps[0])
+        wall_start = time.perf_counter()
+        market_start = timestamps[0]
+
+        for i in range(len(timestamps)):
+            ts = timestamps[i]
+
+            # 1. Throttle: Hold the tick until its (scaled) wall time arrives
+            if self.speed:
+                due = wall_start + (ts - market_start) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            # 2. Write to memory first, THEN move the clock and wake the consumers
+            await self.blackboard.update_prices(
+                price_a=prices_a[i],
+                price_b=prices_b[i],
+                timestamp=ts
+            )
+            self.clock.advance_to(ts)
+            self.ack.clear()
+            self.update_event.set()
+            self.ticks_sent += 1
+            TICKS_INGESTED.inc()
+
+            # 3. Yield so the consumers can run
+            await asyncio.sleep(0)
+            if self.lockstep:
+                try:
+                    await asyncio.wait_for(self.ack.wait(), self.lockstep_timeout)
+                except asyncio.TimeoutError:
+                    print(f"[REPLAY] No consumer acknowledged tick {i} within {self.lockstep_timeout:g}s; "
+                          f"continuing without lockstep.")
+                    self.lockstep = False
+
+        # End of tape: release every consumer still sleeping on market time
+        self.clock.advance_to(float("inf"))
+
+        elapsed = time.perf_counter() - wall_start
+        rate = self.ticks_sent / elapsed if elapsed > 0 else float("inf")
+        print(f"[REPLAY] Done. {self.ticks_sent} ticks in {elapsed:.2f}s ({rate:,.0f} ticks/s).")
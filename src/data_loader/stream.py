@@ -1,10 +1,16 @@
 import asyncio
 import json
+import time
+import urllib.request
 import websockets
 from src.shared.state import Blackboard
+from src.shared.metrics import TICKS_INGESTED, BOOK_RESYNCS
+from src.processors.bars import BarAggregator, PairBarFeed
+from src.data_loader.order_book import OrderBook, TopOfBook, BOOK_MODES, BOOK_PRICES
 
 class BinanceStream:
-    def __init__(self, blackboard: Blackboard, event: asyncio.Event, symbol_a: str, symbol_b: str):
+    def __init__(self, blackboard: Blackboard, event: asyncio.Event, symbol_a: str, symbol_b: str,
+                 bars: BarAggregator = None, bar_price='vwap'):
         self.update_event = event  # The Bell
         self.url = "wss://stream.binance.com:9443/ws"
         self.blackboard = blackboard
@@ -14,6 +20,9 @@ class BinanceStream:
         
         self.prices = {self.symbol_a: None, self.symbol_b: None}
 
+        # Optional aggregation stage: write one update per completed bar instead of per trade
+        self.bar_feed = PairBarFeed(bars, self.symbol_a, self.symbol_b, bar_price) if bars is not None else None
+
     async def connect(self):
         print(f"[SENSOR] Connecting to Binance Stream for {self.symbol_a} & {self.symbol_b}...")
         
@@ -45,6 +54,12 @@ class BinanceStream:
         symbol = data['s'].lower()
         price = float(data['p'])
         event_time = data['E'] / 1000.0 
+
+        if self.bar_feed is not None:
+            update = self.bar_feed.on_trade(symbol, price, float(data['q']), event_time)
+            if update is not None:
+                asyncio.create_task(self._update_and_signal(*update))
+            return
         
         self.prices[symbol] = price
         
@@ -70,7 +85,203 @@ class BinanceStream:
             price_b=price_b,
             timestamp=timestamp
         )
+        TICKS_INGESTED.inc()
         
         # 2. Ring the bell (Wake up Math Engine)
         # We do this AFTER the await ensures the write is complete.
-        self.update_event.set()
\ No newline at end of file
+        self.update_event.set()
+
+class BinanceMultiStream:
+    """
+    Responsibility: ONE websocket for a whole universe of symbols.
+    Every symbol is subscribed once, however many pairs use it, and each
+    trade is handed to 'on_trade(symbol, price, timestamp)' synchronously
+    (the callback decides who needs it, e.g. the sharded engine's router).
+    """
+    def __init__(self, symbols, on_trade):
+        self.url = "wss://stream.binance.com:9443/ws"
+        self.symbols = sorted({symbol.lower() for symbol in symbols})
+        self.on_trade = on_trade
+
+    async def connect(self):
+        print(f"[SENSOR] Connecting to Binance Stream for {len(self.symbols)} symbols...")
+
+        async with websockets.connect(self.url) as websocket:
+            subscribe_msg = {
+                "method": "SUBSCRIBE",
+                "params": [f"{symbol}@trade" for symbol in self.symbols],
+                "id": 1
+            }
+            await websocket.send(json.dumps(subscribe_msg))
+            print(f"[SENSOR] Subscribed to {', '.join(self.symbols)}.")
+
+            while True:
+                try:
+                    message = await websocket.recv()
+                    data = json.loads(message)
+
+                    if 'e' in data and data['e'] == 'trade':
+                        self.on_trade(data['s'].lower(), float(data['p']), data['E'] / 1000.0)
+                        TICKS_INGESTED.inc()
+
+                except Exception as e:
+                    print(f"[SENSOR] Error in stream: {e}")
+                    await asyncio.sleep(5)
+
+class BinanceBookStream:
+    """
+    Responsibility: Pair prices from the ORDER BOOK instead of trade prints.
+    Last trades bounce between bid and ask; the mid or the microprice of the
+    book does not, so the spread (and the z-score built on it) is cleaner.
+
+    Modes:
+        'depth'  -> <symbol>@depth@100ms diffs applied to a local array-backed
+                    OrderBook per symbol, synced from a REST snapshot (and
+                    resynced on any sequence gap)
+        'ticker' -> <symbol>@bookTicker: best bid / ask only, no local book
+
+    Each change of either leg's top of book writes price_a / price_b (the
+    'price' of the book: 'microprice' or 'mid') plus both legs' bid, ask,
+    sizes, mid and microprice to the Blackboard, then rings the bell.
+    """
+    def __init__(self, blackboard: Blackboard, event: asyncio.Event, symbol_a: str, symbol_b: str,
+                 mode='depth', price='microprice', snapshot_depth=1000, capacity=5000):
+        if mode not in BOOK_MODES:
+            raise ValueError(f"Unknown book mode: {mode}")
+        if price not in BOOK_PRICES:
+            raise ValueError(f"Unknown book price: {price}")
+        self.update_event = event  # The Bell
+        self.url = "wss://stream.binance.com:9443/ws"
+        self.rest_url = "https://api.binance.com/api/v3/depth"
+        self.blackboard = blackboard
+
+        self.symbol_a = symbol_a.lower()
+        self.symbol_b = symbol_b.lower()
+        self.mode = mode
+        self.price = price
+        self.snapshot_depth = snapshot_depth
+
+        self.books = {symbol: OrderBook(symbol, capacity) for symbol in (self.symbol_a, self.symbol_b)}
+        self.tops = {self.symbol_a: None, self.symbol_b: None}
+        self._ticker_ids = {self.symbol_a: 0, self.symbol_b: 0}
+        self._buffers = {}  # symbol -> diffs received while its snapshot is in flight
+
+    async def connect(self):
+        print(f"[SENSOR] Connecting to Binance {self.mode} stream for {self.symbol_a} & {self.symbol_b}...")
+
+        async with websockets.connect(self.url) as websocket:
+            channel = "depth@100ms" if self.mode == 'depth' else "bookTicker"
+            subscribe_msg = {
+                "method": "SUBSCRIBE",
+                "params": [f"{self.symbol_a}@{channel}", f"{self.symbol_b}@{channel}"],
+                "id": 1
+            }
+            await websocket.send(json.dumps(subscribe_msg))
+            print(f"[SENSOR] Subscribed to {channel}. Streaming {self.price} to Blackboard...")
+
+            # Depth: the diffs are already buffering, now fetch the snapshots they continue
+            if self.mode == 'depth':
+                for symbol in self.books:
+                    self._resync(symbol)
+
+            while True:
+                try:
+                    message = await websocket.recv()
+                    data = json.loads(message)
+
+                    if data.get('e') == 'depthUpdate':
+                        self._on_depth(data)
+                    elif 'u' in data and 'b' in data and 'e' not in data:
+                        self._on_ticker(data)
+
+                except Exception as e:
+                    print(f"[SENSOR] Error in stream: {e}")
+                    await asyncio.sleep(5)
+
+    # --- DEPTH (snapshot + diffs) ---
+
+    def _on_depth(self, data: dict):
+        symbol = data['s'].lower()
+        if symbol in self._buffers:
+            self._buffers[symbol].append(data)
+            return
+
+        if not self.books[symbol].apply_diff(data['U'], data['u'], data['b'], data['a']):
+            print(f"[SENSOR] {symbol} depth gap (U={data['U']}), resyncing...")
+            self._resync(symbol)
+            return
+        self._on_top(symbol, self.books[symbol].top(), data['E'] / 1000.0)
+
+    def _resync(self, symbol: str):
+        # Start buffering now; the snapshot is fetched off the loop. Until it lands the
+        # leg has no price, so the other leg is never paired with a stale quote.
+        self.tops[symbol] = None
+        if symbol not in self._buffers:
+            self._buffers[symbol] = []
+            asyncio.create_task(self._load_snapshot(symbol))
+
+    async def _load_snapshot(self, symbol: str):
+        BOOK_RESYNCS.inc()
+        try:
+            snapshot = await asyncio.to_thread(self._fetch_snapshot, symbol)
+        except Exception as e:
+            print(f"[SENSOR] {symbol} snapshot failed: {e}")
+            await asyncio.sleep(5)
+            asyncio.create_task(self._load_snapshot(symbol))
+            return
+
+        # 1. Load the snapshot, then replay what arrived meanwhile (stale diffs are skipped)
+        book = self.books[symbol]
+        book.load_snapshot(snapshot['lastUpdateId'], snapshot['bids'], snapshot['asks'])
+        buffered = self._buffers.pop(symbol)
+        for data in buffered:
+            if not book.apply_diff(data['U'], data['u'], data['b'], data['a']):
+                # 2. The snapshot is older than the first buffered diff: try again
+                self._resync(symbol)
+                return
+
+        print(f"[SENSOR] {symbol} book synced at update {book.last_update_id} "
+              f"({book.bids.count} bids / {book.asks.count} asks).")
+        event_time = buffered[-1]['E'] / 1000.0 if buffered else time.time()
+        self._on_top(symbol, book.top(), event_time)
+
+    def _fetch_snapshot(self, symbol: str) -> dict:
+        url = f"{self.rest_url}?symbol={symbol.upper()}&limit={self.snapshot_depth}"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return json.loads(response.read())
+
+    # --- BOOK TICKER ---
+
+    def _on_ticker(self, data: dict):
+        symbol = data['s'].lower()
+        if data['u'] <= self._ticker_ids[symbol]:
+            return  # Out of order
+        self._ticker_ids[symbol] = data['u']
+        top = TopOfBook(float(data['b']), float(data['B']), float(data['a']), float(data['A']))
+        self._on_top(symbol, top, time.time())  # bookTicker carries no event time
+
+    # --- PUBLISH ---
+
+    def _on_top(self, symbol: str, top, event_time: float):
+        # Deep-level diffs leave the top unchanged: don't wake the math engine for them
+        if top is None or top == self.tops[symbol]:
+            return
+        self.tops[symbol] = top
+
+        top_a, top_b = self.tops[self.symbol_a], self.tops[self.symbol_b]
+        if top_a is not None and top_b is not None:
+            asyncio.create_task(self._update_and_signal(top_a, top_b, event_time))
+
+    async def _update_and_signal(self, top_a: TopOfBook, top_b: TopOfBook, timestamp):
+        """
+        Atomic sequence: Write to memory first, THEN wake up the consumer.
+        """
+        await self.blackboard.update_book(
+            price_a=getattr(top_a, self.price),
+            price_b=getattr(top_b, self.price),
+            timestamp=timestamp,
+            **top_a.fields('a'),
+            **top_b.fields('b')
+        )
+        TICKS_INGESTED.inc()
+        self.update_event.set()
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+def ou_filter(noise, theta, sigma, dt=1.0, x0=0.0) -> np.ndarray:
+    """
+    Exact-discretized Ornstein-Uhlenbeck path(s) driven by standard normal
+    'noise' along the last axis: x_t = phi * x_{t-1} + scale * noise_t,
+    phi = exp(-theta * dt), started from x0 (the AR(1) filter runs in C).
+    """
+    if not theta > 0:
+        raise ValueError(f"OU mean reversion speed theta must be positive, got {theta}")
+    noise = np.asarray(noise, dtype=float)
+    phi = np.exp(-theta * dt)
+    scale = sigma * np.sqrt((1.0 - phi ** 2) / (2.0 * theta))
+    zi = np.full(noise.shape[:-1] + (1,), phi * x0)
+    path, _ = lfilter([1.0], [1.0, -phi], noise * scale, axis=-1, zi=zi)
+    return path
+
+class SyntheticMarket:
+    """
+    Responsibility: Cointegrated price data with a KNOWN answer.
+    Asset B follows a geometric random walk, asset A = beta * B + spread,
+    where the spread is an exact-discretized Ornstein-Uhlenbeck process.
+
+    Used for benchmarks and for testing the pipeline without a live feed:
+    - ticks_per_second sets the timestamp spacing (and the OU time step)
+    - regime_length re-draws beta / theta / sigma every N ticks (regime shifts)
+    - every pair gets its own independent random stream (seed-reproducible)
+    """
+    def __init__(self, n_pairs=1, ticks_per_second=1.0, beta=0.05, theta=0.05, sigma=1.0,
+                 price_b=60000.0, vol_b=2e-4, regime_length=None, start_time=1.7e9, seed=None):
+        self.n_pairs = n_pairs
+        self.dt = 1.0 / ticks_per_second
+        self.beta = beta           # Hedge ratio (A per unit of B)
+        self.theta = theta         # Mean reversion speed (per second)
+        self.sigma = sigma         # Spread volatility (per sqrt second)
+        self.price_b = price_b
+        self.vol_b = vol_b         # Log-return volatility of B (per sqrt second)
+        self.regime_length = regime_length
+        self.start_time = start_time
+        self._seeds = np.random.SeedSequence(seed).spawn(n_pairs)
+
+    def pair(self, n_ticks, k=0) -> pd.DataFrame:
+        """
+        Ground truth for pair k: timestamp, price_a, price_b, beta, theta, spread.
+        """
+        rng = np.random.default_rng(self._seeds[k])
+        dt = self.dt
+
+        # 1. Regime parameters (piecewise constant)
+        length = self.regime_length or n_ticks
+        n_regimes = -(-n_ticks // length)
+        betas = self.beta * np.concatenate(([1.0], rng.uniform(0.8, 1.2, n_regimes - 1)))
+        thetas = self.theta * np.concatenate(([1.0], rng.lognormal(0.0, 0.5, n_regimes - 1)))
+        sigmas = self.sigma * np.concatenate(([1.0], rng.lognormal(0.0, 0.3, n_regimes - 1)))
+
+        # 2. Reference asset: geometric random walk
+        log_returns = rng.normal(0.0, self.vol_b * np.sqrt(dt), n_ticks)
+        log_returns[0] = 0.0
+        price_b = self.price_b * np.exp(np.cumsum(log_returns))
+
+        # 3. OU spread: x_t = phi * x_{t-1} + noise, one linear filter per regime
+        spread = np.empty(n_ticks)
+        noise = rng.normal(size=n_ticks)
+        last = 0.0
+        for r in range(n_regimes):
+            lo, hi = r * length, min((r + 1) * length, n_ticks)
+            spread[lo:hi] = ou_filter(noise[lo:hi], thetas[r], sigmas[r], dt, x0=last)
+            last = spread[hi - 1]
+
+        beta = np.repeat(betas, length)[:n_ticks]
+        price_a = beta * price_b + spread
+
+        return pd.DataFrame({
+            'timestamp': self.start_time + np.arange(n_ticks) * dt,
+            'price_a': price_a,
+            'price_b': price_b,
+            'beta': beta,
+            'theta': np.repeat(thetas, length)[:n_ticks],
+            'spread': spread,
+        })
+
+    def session(self, n_ticks, k=0, window=300) -> pd.DataFrame:
+        """
+        Pair k in the DataRecorder CSV schema (what TradingEnv trains on),
+        with rolling volatility / z-score computed over 'window' ticks.
+        """
+        df = self.pair(n_ticks, k)
+        rolling = df['spread'].rolling(window, min_periods=2)
+        mean, std = rolling.mean(), rolling.std().replace(0.0, np.nan)
+        df['volatility'] = std.fillna(1.0)
+        df['z_score'] = ((df['spread'] - mean) / std).fillna(0.0)
+        return df[["timestamp", "price_a", "price_b", "beta", "theta", "volatility", "spread", "z_score"]]
+
+    def to_csv(self, path, n_ticks, k=0, window=300):
+        self.session(n_ticks, k, window).to_csv(path, index=False)
+        return path
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+class FeeModel(ABC):
+    """
+    Responsibility: Commission Model.
+    Converts an array of trades into an array of fees paid (in $).
+    Input:  trade sizes (units of spread, signed), execution prices and
+            optionally the NOTIONAL traded per unit (for a spread: |A| + |beta * B|,
+            what the exchange actually charges on; defaults to |price|)
+    Output: np.ndarray of non-negative costs, one per time step
+    """
+
+    @abstractmethod
+    def compute(self, trades: np.ndarray, prices: np.ndarray, notional=None) -> np.ndarray:
+        ...
+
+class NoFee(FeeModel):
+    """
+    The frictionless world (the original V1 assumption).
+    """
+
+    def compute(self, trades, prices, notional=None):
+        return np.zeros(len(trades))
+
+class BpsFee(FeeModel):
+    """
+    Percentage fee charged on the NOTIONAL traded.
+    e.g. Binance taker fee 0.1% = 10 bps.
+    """
+
+    def __init__(self, bps=10.0):
+        self.rate = bps / 10_000.0
+
+    def compute(self, trades, prices, notional=None):
+        # Fee = |Units Traded| * Notional per Unit * Rate
+        notional = np.abs(prices) if notional is None else notional
+        return np.abs(trades) * notional * self.rate
+
+class FixedFee(FeeModel):
+    """
+    Flat ticket charge for every order sent, regardless of size.
+    """
+
+    def __init__(self, per_trade=1.0):
+        self.per_trade = per_trade
+
+    def compute(self, trades, prices, notional=None):
+        # Any non-zero trade is one ticket
+        return (trades != 0) * self.per_trade
+
+class CompositeFee(FeeModel):
+    """
+    Stacks several fee models (e.g. exchange bps + broker ticket charge).
+    """
+
+    def __init__(self, *models: FeeModel):
+        self.models = models
+
+    def compute(self, trades, prices, notional=None):
+        total = np.zeros(len(trades))
+        for model in self.models:
+            total += model.compute(trades, prices, notional)
+        return total
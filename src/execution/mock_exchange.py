@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+
+class MockExchange:
+    """
+    Responsibility: A local stand-in for the venue.
+    Speaks newline-delimited JSON over TCP so the OrderRouter can be tested
+    and load-tested offline.
+
+    Requests:
+        {"id": 1, "op": "order", "symbol": "ETHUSDT", "qty": -0.5}
+        {"id": 2, "op": "batch", "orders": [{"symbol": ..., "qty": ...}, ...]}
+        {"id": 3, "op": "ping"}
+    Responses carry the same "id". Market orders fill immediately at the
+    current mock price (a random walk per symbol), after 'latency' seconds.
+    """
+    def __init__(self, host="127.0.0.1", port=9001, latency=0.002, prices=None,
+                 max_batch=5, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.max_batch = max_batch  # Venue limit on orders per batch request
+        self.prices = dict(prices or {})
+        self.rng = random.Random(seed)
+
+        self.orders_filled = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"[EXCHANGE] Mock exchange listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        responses = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Requests on one connection are served concurrently (like a real venue)
+                task = asyncio.create_task(self._respond(json.loads(line), writer))
+                responses.add(task)
+                task.add_done_callback(responses.discard)
+        except (ConnectionResetError, json.JSONDecodeError) as e:
+            print(f"[EXCHANGE] Client error: {e}")
+        finally:
+            # Answer what is still in flight before closing the socket under it
+            await asyncio.gather(*responses, return_exceptions=True)
+            writer.close()
+
+    async def _respond(self, request: dict, writer: asyncio.StreamWriter):
+        await asyncio.sleep(self.latency)
+
+        op = request.get('op')
+        if op == 'order':
+            response = self._fill(request)
+        elif op == 'batch':
+            orders = request.get('orders', [])
+            if len(orders) > self.max_batch:
+                response = {'status': 'REJECTED', 'reason': f"batch limit is {self.max_batch}"}
+            else:
+                response = {'status': 'OK', 'results': [self._fill(order) for order in orders]}
+        elif op == 'ping':
+            response = {'status': 'OK'}
+        else:
+            response = {'status': 'REJECTED', 'reason': f"unknown op {op}"}
+
+        response['id'] = request.get('id')
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
+
+    def _fill(self, order: dict) -> dict:
+        symbol = order['symbol']
+        price = self.prices.get(symbol, 100.0)
+
+        # Random walk: every fill moves the mock market a little
+        price *= 1.0 + self.rng.gauss(0.0, 1e-4)
+        self.prices[symbol] = price
+        self.orders_filled += 1
+
+        return {'status': 'FILLED', 'symbol': symbol, 'qty': order['qty'], 'price': price}
+
+def _run(host, port, latency, prices):
+    asyncio.run(MockExchange(host, port, latency, prices).serve_forever())
+
+def start_in_process(host="127.0.0.1", port=9001, latency=0.002, prices=None) -> multiprocessing.Process:
+    """
+    Launches the exchange in its own PROCESS so load tests measure real socket round trips.
+    Caller is responsible for .terminate().
+    """
+    process = multiprocessing.Process(target=_run, args=(host, port, latency, prices), daemon=True)
+    process.start()
+    return process
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local mock exchange.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", type=float, default=0.002, help="Processing delay per request (s)")
+    args = parser.parse_args()
+
+    try:
+        _run(args.host, args.port, args.latency, None)
+    except KeyboardInterrupt:
+        print("\n[EXCHANGE] Stopped.")
@@ -0,0 +1,275 @@
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass
+
+@dataclass
+class Fill:
+    """
+    The venue's answer to one order, plus how long it took.
+    """
+    symbol: str
+    qty: float
+    price: float = 0.0
+    status: str = ""
+    rtt: float = 0.0  # Round-trip time in seconds (send -> response)
+
+class TokenBucket:
+    """
+    Rate limiter. Holds up to 'burst' tokens, refilled at 'rate' per second.
+    Each request spends one token; callers wait (without blocking the loop) when empty.
+    """
+    def __init__(self, rate=20.0, burst=40):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+class _Connection:
+    """
+    One persistent socket. Requests are tagged with an id and multiplexed;
+    a background reader resolves the matching future when the response arrives.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def request(self, message: dict) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message['id']] = future
+        self.writer.write((json.dumps(message) + "\n").encode())
+        await self.writer.drain()
+        return await future
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.pending.pop(response.get('id'), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            # Connection dropped: fail everything still in flight
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Exchange connection closed"))
+            self.pending.clear()
+
+    async def close(self):
+        self._reader_task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+class OrderRouter:
+    """
+    Responsibility: The Actuator (live).
+    Turns target spread positions into leg orders and sends them to the venue.
+
+    - Both legs go out CONCURRENTLY (or in one batch request when allowed),
+      so the time we are half-hedged is one round trip, not two.
+    - Orders reuse a pool of persistent connections (no handshake per order).
+    - A token bucket keeps us under the venue's request rate limit.
+    - Every Fill carries its round-trip latency.
+    """
+    def __init__(self, host="127.0.0.1", port=9001, pool_size=4, rate=20.0, burst=40,
+                 batch=True, max_batch=5):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.batch = batch
+        self.max_batch = max_batch
+        self.limiter = TokenBucket(rate, burst)
+
+        self.holdings = {}       # symbol -> units currently held (net across pairs)
+        self.pair_holdings = {}  # (symbol_a, symbol_b) -> {symbol: units held for THAT pair}
+        self.fills = []      # Recent fills (for latency stats)
+        self._pool = []
+        self._ids = itertools.count(1)
+        self._pair_locks = {}  # One rebalance in flight per pair (legs still go out together)
+
+    async def connect(self):
+        print(f"[ROUTER] Opening {self.pool_size} connections to {self.host}:{self.port}...")
+        for _ in range(self.pool_size):
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            self._pool.append(_Connection(reader, writer))
+
+    async def close(self):
+        await asyncio.gather(*(conn.close() for conn in self._pool))
+        self._pool.clear()
+
+    def _pick_connection(self) -> _Connection:
+        # Least in-flight requests wins
+        return min(self._pool, key=lambda conn: len(conn.pending))
+
+    async def _send(self, message: dict) -> tuple:
+        await self.limiter.acquire()
+        message['id'] = next(self._ids)
+        start = time.perf_counter()
+        response = await self._pick_connection().request(message)
+        return response, time.perf_counter() - start
+
+    async def submit(self, symbol: str, qty: float) -> Fill:
+        """
+        One market order (qty > 0 buys, qty < 0 sells).
+        """
+        response, rtt = await self._send({'op': 'order', 'symbol': symbol, 'qty': qty})
+        return self._record(symbol, qty, response, rtt)
+
+    async def submit_many(self, orders) -> list:
+        """
+        Sends [(symbol, qty), ...] as batches where the venue allows,
+        otherwise as concurrent single orders.
+        """
+        if not self.batch:
+            return list(await asyncio.gather(*(self.submit(symbol, qty) for symbol, qty in orders)))
+
+        chunks = [orders[i:i + self.max_batch] for i in range(0, len(orders), self.max_batch)]
+        results = await asyncio.gather(*(self._submit_batch(chunk) for chunk in chunks))
+        return [fill for chunk in results for fill in chunk]
+
+    async def _submit_batch(self, orders) -> list:
+        response, rtt = await self._send({
+            'op': 'batch',
+            'orders': [{'symbol': symbol, 'qty': qty} for symbol, qty in orders]
+        })
+        results = response.get('results') or [response] * len(orders)
+        return [self._record(symbol, qty, result, rtt) for (symbol, qty), result in zip(orders, results)]
+
+    async def rebalance(self, symbol_a: str, symbol_b: str, target_units: float, beta: float) -> list:
+        """
+        Moves the pair to 'target_units' of spread (1 unit = +1 A, -beta B).
+        Only the difference from the pair's own holdings is traded.
+        """
+        return await self.rebalance_many([(symbol_a, symbol_b, target_units, beta)])
+
+    async def rebalance_many(self, targets) -> list:
+        """
+        Moves several pairs at once: targets = [(symbol_a, symbol_b, target_units, beta), ...].
+
+        Each pair's deltas are computed from ITS OWN leg holdings, so pairs sharing
+        a leg (ETH/BTC and SOL/BTC) never trade against each other's inventory.
+        The deltas are then netted per symbol: one order per symbol goes out, and
+        when it fills every contributing pair's book is credited with its share.
+        A pair may appear only once (ValueError otherwise).
+        """
+        pairs = sorted({(symbol_a, symbol_b) for symbol_a, symbol_b, _, _ in targets})
+        if len(pairs) != len(targets):
+            raise ValueError("rebalance_many: each (symbol_a, symbol_b) pair may appear only once in targets")
+        locks = [self._pair_locks.setdefault(pair, asyncio.Lock()) for pair in pairs]
+
+        # Sorted acquisition: two overlapping calls can't deadlock
+        for lock in locks:
+            await lock.acquire()
+        try:
+            # 1. Per (pair, leg) deltas
+            contributions = {}  # symbol -> [(pair, delta), ...]
+            for symbol_a, symbol_b, target_units, beta in targets:
+                book = self.pair_holdings.setdefault((symbol_a, symbol_b), {symbol_a: 0.0, symbol_b: 0.0})
+                for symbol, target in ((symbol_a, target_units), (symbol_b, -beta * target_units)):
+                    delta = target - book.get(symbol, 0.0)
+                    if abs(delta) > 1e-12:
+                        contributions.setdefault(symbol, []).append(((symbol_a, symbol_b), delta))
+
+            # 2. Net per symbol
+            orders = []
+            for symbol, parts in contributions.items():
+                net = sum(delta for _, delta in parts)
+                if abs(net) > 1e-12:
+                    orders.append((symbol, net))
+                else:
+                    # Offsetting pairs: the inventory just changes owner, nothing to send
+                    self._credit_pairs(symbol, parts)
+            if not orders:
+                return []
+
+            # 3. Send, then credit the pairs behind every filled order
+            fills = await self.submit_many(orders)
+            for fill in fills:
+                if fill.status == 'FILLED':
+                    self._credit_pairs(fill.symbol, contributions[fill.symbol])
+            return fills
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def _credit_pairs(self, symbol, parts):
+        for pair, delta in parts:
+            self.pair_holdings[pair][symbol] = self.pair_holdings[pair].get(symbol, 0.0) + delta
+
+    def _record(self, symbol, qty, response, rtt) -> Fill:
+        fill = Fill(symbol=symbol, qty=qty, price=response.get('price', 0.0),
+                    status=response.get('status', 'UNKNOWN'), rtt=rtt)
+        if fill.status == 'FILLED':
+            self.holdings[symbol] = self.holdings.get(symbol, 0.0) + qty
+        else:
+            print(f"[ROUTER] Order {symbol} {qty:+.6f} not filled: {response.get('reason', fill.status)}")
+
+        self.fills.append(fill)
+        if len(self.fills) > 10_000:
+            del self.fills[:5_000]
+        return fill
+
+    def latency_stats(self) -> dict:
+        if not self.fills:
+            return {}
+        rtts = sorted(fill.rtt for fill in self.fills)
+        return {
+            'count': len(rtts),
+            'p50_ms': rtts[len(rtts) // 2] * 1000,
+            'p99_ms': rtts[min(len(rtts) - 1, int(len(rtts) * 0.99))] * 1000,
+            'max_ms': rtts[-1] * 1000,
+        }
+
+async def load_test(n_rebalances=1000, port=9001):
+    """
+    Offline load test: mock exchange in another process, router hammering it.
+    """
+    from src.execution.mock_exchange import start_in_process
+
+    exchange = start_in_process(port=port, prices={'ETHUSDT': 3000.0, 'BTCUSDT': 60000.0})
+    await asyncio.sleep(0.5)  # Let the server bind
+
+    router = OrderRouter(port=port, rate=5_000, burst=500)
+    try:
+        await router.connect()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            router.rebalance('ETHUSDT', 'BTCUSDT', target_units=(i % 3) - 1, beta=0.05)
+            for i in range(n_rebalances)
+        ))
+        elapsed = time.perf_counter() - start
+        print(f"[ROUTER] {len(router.fills)} fills in {elapsed:.2f}s ({len(router.fills) / elapsed:,.0f} orders/s)")
+        print(f"[ROUTER] Latency: {router.latency_stats()}")
+    finally:
+        await router.close()
+        exchange.terminate()
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    # Ensure python can find your src modules
+    sys.path.append(os.getcwd())
+
+    asyncio.run(load_test())
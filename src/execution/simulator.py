@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from src.execution.fees import FeeModel, NoFee
+from src.execution.slippage import SlippageModel, NoSlippage
+
+class LatencySimulator:
+    """
+    Responsibility: Realistic Fills.
+    The strategy decides at time t, but the order only reaches the exchange at
+    t + latency. Each leg (A and beta*B) is filled separately at the first
+    RECORDED trade print at or after its arrival time.
+
+    Everything is vectorized: fills are located with np.searchsorted over the
+    tick arrays, so weeks of ticks cost a few array passes.
+    """
+    def __init__(self, latency=0.250, latency_b=None, jitter=0.0, seed=0,
+                 fee_model: FeeModel = None, slippage_model: SlippageModel = None, beta_tolerance=0.05):
+        self.latency_a = latency
+        self.latency_b = latency if latency_b is None else latency_b  # Legs may route differently
+        self.jitter = jitter  # Std dev of random extra delay (seconds, truncated at 0)
+        self.seed = seed
+        self.fee_model = fee_model or NoFee()
+        self.slippage_model = slippage_model or NoSlippage()
+        # The B leg is re-hedged only when the spread position changes or the live beta
+        # drifts more than this (relative) from the beta it was last hedged at
+        self.beta_tolerance = beta_tolerance
+
+    def run(self, ticks_a: pd.DataFrame, ticks_b: pd.DataFrame, decision_times, target_units, betas,
+            initial_cash=10000.0):
+        """
+        Args:
+            ticks_a / ticks_b: Trade prints with 'timestamp' and 'price' columns
+            decision_times:    When the strategy produced each target (seconds)
+            target_units:      Target position in units of spread at each decision
+            betas:             Hedge ratio at each decision (B leg = -beta * units,
+                               re-hedged per 'beta_tolerance')
+
+        Returns:
+            (orders, equity): one row per order sent, and the equity marked
+            at every decision time.
+        """
+        ts_a = ticks_a['timestamp'].to_numpy(dtype=float)
+        px_a = ticks_a['price'].to_numpy(dtype=float)
+        ts_b = ticks_b['timestamp'].to_numpy(dtype=float)
+        px_b = ticks_b['price'].to_numpy(dtype=float)
+
+        times = np.asarray(decision_times, dtype=float)
+        units = np.nan_to_num(np.asarray(target_units, dtype=float))
+        betas = np.asarray(betas, dtype=float)
+
+        # 1. TARGET HOLDINGS per leg -> ORDERS are the changes
+        hold_a = units
+        hold_b = -_hedged_betas(units, betas, self.beta_tolerance) * units
+        qty_a = np.diff(hold_a, prepend=0.0)
+        qty_b = np.diff(hold_b, prepend=0.0)
+        sent = np.flatnonzero((qty_a != 0) | (qty_b != 0))
+
+        # 2. ARRIVAL at the venue
+        rng = np.random.default_rng(self.seed)
+        jitter = np.abs(rng.normal(0.0, self.jitter, size=(2, len(sent)))) if self.jitter > 0 else np.zeros((2, len(sent)))
+        arrive_a = times[sent] + self.latency_a + jitter[0]
+        arrive_b = times[sent] + self.latency_b + jitter[1]
+
+        # 3. FILL: first print at/after arrival (orders arriving after the tape ends never fill)
+        idx_a = np.searchsorted(ts_a, arrive_a, side='left')
+        idx_b = np.searchsorted(ts_b, arrive_b, side='left')
+        filled = (idx_a < len(ts_a)) & (idx_b < len(ts_b))
+        sent, idx_a, idx_b = sent[filled], idx_a[filled], idx_b[filled]
+
+        fill_a = px_a[idx_a]
+        fill_b = px_b[idx_b]
+        q_a = qty_a[sent]
+        q_b = qty_b[sent]
+
+        # Price the strategy SAW when deciding (last print at/before the decision)
+        seen_a = _last_price(ts_a, px_a, times[sent])
+        seen_b = _last_price(ts_b, px_b, times[sent])
+
+        # 4. COSTS per leg
+        costs = (self.fee_model.compute(q_a, fill_a) + self.fee_model.compute(q_b, fill_b)
+                 + self.slippage_model.compute(q_a, fill_a) + self.slippage_model.compute(q_b, fill_b))
+
+        orders = pd.DataFrame({
+            'decision_time': times[sent],
+            'qty_a': q_a,
+            'qty_b': q_b,
+            'fill_time_a': ts_a[idx_a],
+            'fill_time_b': ts_b[idx_b],
+            'fill_price_a': fill_a,
+            'fill_price_b': fill_b,
+            'leg_gap': np.abs(ts_a[idx_a] - ts_b[idx_b]),  # Time one leg is unhedged
+            # Implementation shortfall: what latency cost vs the decision price
+            'shortfall': q_a * (fill_a - seen_a) + q_b * (fill_b - seen_b),
+            'cost': costs,
+        })
+
+        # 5. EQUITY at each decision time
+        # Cash moves when an order fills; holdings only count once filled
+        fill_time = np.maximum(ts_a[idx_a], ts_b[idx_b])
+        order_cash = -(q_a * fill_a + q_b * fill_b) - costs
+        order = np.argsort(fill_time, kind='stable')
+        cum_cash = np.concatenate(([0.0], np.cumsum(order_cash[order])))
+        cum_a = np.concatenate(([0.0], np.cumsum(q_a[order])))
+        cum_b = np.concatenate(([0.0], np.cumsum(q_b[order])))
+
+        fill_time_sorted = fill_time[order]
+        done = np.searchsorted(fill_time_sorted, times, side='right')
+        equity = (initial_cash + cum_cash[done]
+                  + cum_a[done] * _last_price(ts_a, px_a, times)
+                  + cum_b[done] * _last_price(ts_b, px_b, times))
+
+        return orders, pd.Series(equity, index=times, name='portfolio_value')
+
+def _hedged_betas(units, betas, tolerance):
+    """
+    The beta the B leg actually holds at each decision: reset to the live beta
+    when the position changes or the live beta has drifted past 'tolerance'
+    (relative), otherwise the previous hedge is kept (no order, no ticket).
+
+    Vectorized per HEDGE, not per row: within a run of constant units the next
+    re-anchor is located with an array search over a window that doubles until
+    it finds a breach. While flat the hedge is irrelevant (0 units of B).
+    """
+    n = len(betas)
+    hedged = betas.astype(float).copy()
+    # Runs of constant units: [start, end)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(units) != 0) + 1)) if n else np.zeros(0, dtype=int)
+    ends = np.append(starts[1:], n)
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if units[start] == 0:
+            continue
+        anchor = start
+        while anchor < end:
+            current = hedged[anchor]
+            # First row after the anchor that breaches the band (NaN counts as a breach)
+            breach, lo, width = end, anchor + 1, 64
+            while lo < end:
+                hi = min(lo + width, end)
+                outside = ~(np.abs(hedged[lo:hi] - current) <= tolerance * abs(current))
+                if outside.any():
+                    breach = lo + int(outside.argmax())
+                    break
+                lo, width = hi, width * 2
+            hedged[anchor + 1:breach] = current
+            anchor = breach
+    return hedged
+
+def _last_price(timestamps, prices, at):
+    """
+    Last recorded price at or before each query time (first price if none yet).
+    """
+    idx = np.searchsorted(timestamps, at, side='right') - 1
+    return prices[np.clip(idx, 0, len(prices) - 1)]
+
+def ticks_from_session(filename: str):
+    """
+    Treats a recorded session CSV (live_session.csv) as two tick tapes,
+    one per leg, plus the recorded beta for hedging.
+    """
+    df = pd.read_csv(filename, usecols=['timestamp', 'price_a', 'price_b', 'beta']).dropna()
+    ticks_a = pd.DataFrame({'timestamp': df['timestamp'], 'price': df['price_a']})
+    ticks_b = pd.DataFrame({'timestamp': df['timestamp'], 'price': df['price_b']})
+    return ticks_a, ticks_b, df['beta'].to_numpy()
@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+class SlippageModel(ABC):
+    """
+    Responsibility: Price Impact Model.
+    Estimates how much worse than the quoted price we actually get filled.
+    Input:  trade sizes (signed), execution prices, optional volatility and
+            optional NOTIONAL per unit (see FeeModel; defaults to |price|)
+    Output: np.ndarray of non-negative costs (in $), one per time step
+    """
+
+    @abstractmethod
+    def compute(self, trades: np.ndarray, prices: np.ndarray, volatility=None, notional=None) -> np.ndarray:
+        ...
+
+class NoSlippage(SlippageModel):
+    """
+    Fills exactly at the quoted price.
+    """
+
+    def compute(self, trades, prices, volatility=None, notional=None):
+        return np.zeros(len(trades))
+
+class SpreadSlippage(SlippageModel):
+    """
+    Crossing the book: we pay half the bid-ask spread on every unit traded.
+    The spread is expressed in bps of price since we only record last prices.
+    """
+
+    def __init__(self, spread_bps=2.0):
+        self.half_spread = (spread_bps / 10_000.0) / 2.0
+
+    def compute(self, trades, prices, volatility=None, notional=None):
+        notional = np.abs(prices) if notional is None else notional
+        return np.abs(trades) * notional * self.half_spread
+
+class VolatilitySlippage(SlippageModel):
+    """
+    Impact grows with how fast the price is moving.
+    Cost = |Units Traded| * k * Sigma
+
+    If no volatility series is supplied, Sigma is the rolling std of
+    price changes over 'window' steps (computed with cumulative sums, no loops).
+    """
+
+    def __init__(self, k=0.1, window=30):
+        self.k = k
+        self.window = window
+
+    def compute(self, trades, prices, volatility=None, notional=None):
+        if volatility is None:
+            volatility = self._rolling_vol(np.asarray(prices, dtype=float))
+        return np.abs(trades) * self.k * np.nan_to_num(volatility)
+
+    def _rolling_vol(self, prices):
+        if len(prices) == 0:
+            return np.zeros(0)
+
+        # Price changes (first step has no history -> 0)
+        diffs = np.diff(prices, prepend=prices[0])
+
+        # Rolling sums via cumsum: sum[t] = c[t] - c[t-window]
+        n = len(diffs)
+        w = np.minimum(np.arange(1, n + 1), self.window)
+        c1 = np.concatenate(([0.0], np.cumsum(diffs)))
+        c2 = np.concatenate(([0.0], np.cumsum(diffs ** 2)))
+        idx = np.arange(1, n + 1)
+        s1 = c1[idx] - c1[idx - w]
+        s2 = c2[idx] - c2[idx - w]
+
+        var = s2 / w - (s1 / w) ** 2
+        return np.sqrt(np.maximum(var, 0.0))
+
+class CompositeSlippage(SlippageModel):
+    """
+    Stacks several slippage models (e.g. half-spread + volatility impact).
+    """
+
+    def __init__(self, *models: SlippageModel):
+        self.models = models
+
+    def compute(self, trades, prices, volatility=None, notional=None):
+        total = np.zeros(len(trades))
+        for model in self.models:
+            total += model.compute(trades, prices, volatility, notional)
+        return total
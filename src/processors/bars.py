@@ -0,0 +1,264 @@
+import argparse
+import math
+import os
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+BAR_KINDS = ('time', 'volume', 'dollar')
+
+@dataclass
+class Bar:
+    """
+    One completed bar of a symbol.
+    """
+    symbol: str
+    start: float     # Timestamp of the first trade (time bars: the grid boundary)
+    end: float       # Timestamp of the last trade (time bars: the next boundary)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float    # Base-asset quantity
+    notional: float  # Sum of price * quantity
+    trades: int
+
+    @property
+    def vwap(self) -> float:
+        return self.notional / self.volume if self.volume > 0 else self.close
+
+class BarBuilder:
+    """
+    Responsibility: Turn ONE symbol's trades into bars, O(1) per trade.
+
+    Kinds:
+        'time'   -> closes on the 'size'-second grid (floor(ts / size) * size)
+        'volume' -> closes once 'size' units of the asset have traded
+        'dollar' -> closes once 'size' of notional (price * quantity) has traded
+
+    A trade is never split: the one that crosses a volume/dollar threshold
+    closes the bar it belongs to. Time intervals without trades produce no bar.
+    """
+    def __init__(self, kind='time', size=60.0, symbol=""):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"Unknown bar kind: {kind}")
+        if size <= 0:
+            raise ValueError("Bar size must be positive")
+        self.kind = kind
+        self.size = float(size)
+        self.symbol = symbol
+        self._reset()
+
+    def _reset(self):
+        self.trades = 0
+        self.volume = 0.0
+        self.notional = 0.0
+        self.bucket_end = math.inf  # Time bars: boundary that closes the open bar
+
+    def update(self, price: float, quantity: float, timestamp: float):
+        """
+        Adds one trade.
+        Returns: the Bar it completed, or None.
+        """
+        completed = None
+
+        # 1. Time bars close BEFORE the trade that starts the next interval
+        if self.kind == 'time' and timestamp >= self.bucket_end:
+            completed = self.close_bar()
+
+        # 2. Accumulate
+        if self.trades == 0:
+            self.open = self.high = self.low = price
+            self.start = timestamp
+            if self.kind == 'time':
+                self.start = math.floor(timestamp / self.size) * self.size
+                self.bucket_end = self.start + self.size
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.last_ts = timestamp
+        self.trades += 1
+        self.volume += quantity
+        self.notional += price * quantity
+
+        # 3. Volume / dollar bars close ON the trade that reaches the threshold
+        if self.kind == 'volume' and self.volume >= self.size:
+            completed = self.close_bar()
+        elif self.kind == 'dollar' and self.notional >= self.size:
+            completed = self.close_bar()
+        return completed
+
+    def close_bar(self):
+        """
+        Closes the open bar now (end of a time interval, or end of data).
+        Returns: the Bar, or None if nothing is open.
+        """
+        if self.trades == 0:
+            return None
+        end = self.bucket_end if self.kind == 'time' else self.last_ts
+        bar = Bar(self.symbol, self.start, end, self.open, self.high, self.low, self.close,
+                  self.volume, self.notional, self.trades)
+        self._reset()
+        return bar
+
+class BarAggregator:
+    """
+    Responsibility: The aggregation stage between ingestion and math.
+    Holds one BarBuilder per symbol and emits only COMPLETED bars.
+
+    Time bars share one grid across symbols: the first trade (of any symbol)
+    past a boundary closes every open bar at once, so the legs of a pair
+    complete together instead of one interval apart. A late print whose
+    interval has already closed is booked at the start of the current one,
+    so no bar (and no pair update) ever goes back in time.
+    """
+    def __init__(self, kind='time', size=60.0):
+        self.kind = kind
+        self.size = size
+        self.builders = {}
+        self._boundary = math.inf  # Earliest open time-bar end across symbols
+        self._grid_start = -math.inf  # Start of the newest time interval seen
+        BarBuilder(kind, size)  # Validate the arguments up front
+
+    def update(self, symbol: str, price: float, quantity: float, timestamp: float) -> list:
+        """
+        Adds one trade. Returns: the list of bars it completed (often empty).
+        """
+        completed = []
+
+        # 0. Out-of-order print: clamp it into the current interval
+        if self.kind == 'time':
+            if timestamp < self._grid_start:
+                timestamp = self._grid_start
+            else:
+                self._grid_start = math.floor(timestamp / self.size) * self.size
+
+        # 1. Time grid: close everyone's interval together
+        if timestamp >= self._boundary:
+            completed = self._close_until(timestamp)
+
+        # 2. The trade itself
+        builder = self.builders.get(symbol)
+        if builder is None:
+            builder = self.builders[symbol] = BarBuilder(self.kind, self.size, symbol)
+        bar = builder.update(price, quantity, timestamp)
+        if bar is not None:
+            completed.append(bar)
+        if self.kind == 'time' and builder.bucket_end < self._boundary:
+            self._boundary = builder.bucket_end
+        return completed
+
+    def _close_until(self, timestamp):
+        completed = []
+        self._boundary = math.inf
+        for builder in self.builders.values():
+            if builder.bucket_end <= timestamp:
+                completed.append(builder.close_bar())
+            elif builder.bucket_end < self._boundary:
+                self._boundary = builder.bucket_end
+        return completed
+
+    def flush(self) -> list:
+        """
+        End of data: the bars still open (incomplete), one per symbol.
+        """
+        self._boundary = math.inf
+        return [bar for bar in (b.close_bar() for b in self.builders.values()) if bar is not None]
+
+class PairBarFeed:
+    """
+    Responsibility: Turn completed bars of two symbols into pair price updates
+    (what BinanceStream / ReplayStream write to the Blackboard).
+    Each update uses the latest completed bar of both legs ('vwap' or 'close').
+    """
+    def __init__(self, aggregator: BarAggregator, symbol_a: str, symbol_b: str, price_field='vwap'):
+        if price_field not in ('vwap', 'close'):
+            raise ValueError(f"Unknown bar price field: {price_field}")
+        self.aggregator = aggregator
+        self.symbol_a = symbol_a
+        self.symbol_b = symbol_b
+        self.price_field = price_field
+        self.last = {symbol_a: None, symbol_b: None}
+
+    def on_trade(self, symbol, price, quantity, timestamp):
+        """
+        Returns: (price_a, price_b, timestamp) when a bar completed and both legs
+        have one, else None.
+        """
+        bars = self.aggregator.update(symbol, price, quantity, timestamp)
+        if not bars:
+            return None
+
+        end = 0.0
+        for bar in bars:
+            if bar.symbol in self.last:
+                self.last[bar.symbol] = getattr(bar, self.price_field)
+                end = max(end, bar.end)
+        if end == 0.0 or self.last[self.symbol_a] is None or self.last[self.symbol_b] is None:
+            return None
+        return self.last[self.symbol_a], self.last[self.symbol_b], end
+
+# --- OFFLINE ---
+
+def build_bars(timestamps, prices, quantities=None, kind='time', size=60.0, symbol="", include_partial=False) -> pd.DataFrame:
+    """
+    The same stage over a recorded tape of one symbol.
+    quantities: None -> 1 per trade (tick-count volume).
+    Returns: one row per completed bar (plus the open one if include_partial).
+    """
+    builder = BarBuilder(kind, size, symbol)
+    quantities = np.ones(len(prices)) if quantities is None else np.asarray(quantities, dtype=float)
+
+    bars = []
+    update = builder.update
+    for timestamp, price, quantity in zip(np.asarray(timestamps, dtype=float).tolist(),
+                                          np.asarray(prices, dtype=float).tolist(), quantities.tolist()):
+        bar = update(price, quantity, timestamp)
+        if bar is not None:
+            bars.append(bar)
+    if include_partial:
+        bar = builder.close_bar()
+        if bar is not None:
+            bars.append(bar)
+    return bars_to_frame(bars)
+
+def bars_to_frame(bars) -> pd.DataFrame:
+    columns = ['symbol', 'start', 'end', 'open', 'high', 'low', 'close', 'volume', 'notional', 'trades', 'vwap']
+    return pd.DataFrame([(b.symbol, b.start, b.end, b.open, b.high, b.low, b.close, b.volume, b.notional,
+                          b.trades, b.vwap) for b in bars], columns=columns)
+
+def session_bars(csv_path, kind='time', size=60.0, price_field='vwap') -> pd.DataFrame:
+    """
+    Re-samples a recorded pair session (recorder schema) into a pair bar tape
+    with 'timestamp, price_a, price_b' columns, ready for replay_session.
+    Every row counts as one print of each leg with quantity 1 (the recorder
+    stores no trade sizes), so 'volume' bars are tick-count bars here.
+    """
+    df = pd.read_csv(csv_path, usecols=["timestamp", "price_a", "price_b"]).dropna().sort_values("timestamp")
+    feed = PairBarFeed(BarAggregator(kind, size), "a", "b", price_field)
+
+    rows = []
+    for timestamp, price_a, price_b in zip(df["timestamp"].tolist(), df["price_a"].tolist(), df["price_b"].tolist()):
+        for symbol, price in (("a", price_a), ("b", price_b)):
+            update = feed.on_trade(symbol, price, 1.0, timestamp)
+            if update is not None and (not rows or update[2] > rows[-1][0]):
+                rows.append((update[2], update[0], update[1]))
+            elif update is not None:
+                rows[-1] = (update[2], update[0], update[1])  # Both legs closed on the same print
+    return pd.DataFrame(rows, columns=["timestamp", "price_a", "price_b"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate a recorded session into time / volume / dollar bars.")
+    parser.add_argument("--source", default="data/raw/live_session.csv")
+    parser.add_argument("--output", default="data/processed/session_bars.csv")
+    parser.add_argument("--kind", choices=BAR_KINDS, default="time")
+    parser.add_argument("--size", type=float, default=60.0, help="Seconds, units or notional per bar")
+    parser.add_argument("--price", choices=("vwap", "close"), default="vwap")
+    args = parser.parse_args()
+
+    bars = session_bars(args.source, args.kind, args.size, args.price)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    bars.to_csv(args.output, index=False)
+    print(f"[BARS] {len(bars)} {args.kind} bars written to {args.output}")
@@ -0,0 +1,177 @@
+import csv
+import io
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+
+def input_mode(bars=None, book=None, book_price="microprice") -> str:
+    """
+    The key of what the math engine is fed: 'trades', 'bars:<kind>:<size>' or
+    'book:<price>'. A model state (or a recording) made in one mode means
+    nothing in another: the Kalman filter and the window are tuned to its cadence.
+    """
+    if book:
+        return f"book:{book_price}"
+    if bars:
+        kind, size = bars
+        return f"bars:{kind}:{float(size):g}"
+    return "trades"
+
+class MathCheckpoint:
+    """
+    Responsibility: Persist the live math state (Kalman state + covariance,
+    statistics window) so a restart resumes with a warm model instead of
+    minutes of warm-up garbage.
+
+    Writes are atomic (temp file in the same folder, then rename): a crash
+    mid-write leaves the previous checkpoint intact, never a torn one.
+    A checkpoint is a few KB, so saving every 'interval' seconds is cheap.
+
+    It is only restored for the SAME pair ('symbols') and input mode ('mode', see
+    input_mode), both stored with it, and if it is at most 'max_age' seconds old: an older spread window would skew the
+    z-scores until it refills, so the caller falls back to the recording instead.
+    """
+    def __init__(self, path="data/state/math_engine.npz", interval=30.0, symbols=("", ""), max_age=None,
+                 mode="trades"):
+        self.path = path
+        self.interval = interval
+        self.symbols = tuple(symbol.lower() for symbol in symbols)
+        self.mode = mode
+        self.max_age = max_age  # Seconds (None: any age)
+        self._last_save = time.monotonic()
+
+    def save(self, model, timestamp: float = 0.0):
+        """
+        model: a PairModel. timestamp: market time of the last tick it has seen.
+        """
+        folder = os.path.dirname(self.path) or "."
+        os.makedirs(folder, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, timestamp=timestamp, saved_at=time.time(), symbols=np.array(self.symbols),
+                         mode=np.array(self.mode), **model.state_dict())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[CHECKPOINT] Could not write {self.path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, model, timestamp: float = 0.0) -> bool:
+        """
+        Saves if 'interval' seconds (wall time) passed since the last save.
+        """
+        if time.monotonic() - self._last_save < self.interval:
+            return False
+        self.save(model, timestamp)
+        return True
+
+    def load(self, model):
+        """
+        Restores the checkpoint into 'model' in place.
+        Returns: the market timestamp it was taken at, or None (nothing usable on
+        disk: missing, unreadable, another pair or mode, or too old). 'model' is untouched then.
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path) as data:
+                # 1. Is it ours, and recent enough?
+                symbols = tuple(str(symbol) for symbol in data['symbols'])
+                if symbols != self.symbols:
+                    raise ValueError(f"saved for pair {symbols}, this engine runs {self.symbols}")
+                mode = str(data['mode'])
+                if mode != self.mode:
+                    raise ValueError(f"saved in mode '{mode}', this engine runs '{self.mode}'")
+                age = time.time() - float(data['saved_at'])
+                if self.max_age is not None and age > self.max_age:
+                    raise ValueError(f"saved {age:.0f}s ago (max age {self.max_age:.0f}s)")
+
+                # 2. Restore
+                model.load_state_dict(data)
+                timestamp = float(data['timestamp'])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print(f"[CHECKPOINT] Ignoring {self.path}: {e}")
+            return None
+
+        print(f"[CHECKPOINT] Restored math state from {self.path} (saved {age:.0f}s ago).")
+        return timestamp
+
+# --- WARM START FROM A RECORDING ---
+
+def read_recent_ticks(csv_path, n_ticks=600):
+    """
+    The last 'n_ticks' (price_a, price_b) rows of a recorded session CSV.
+    Reads backwards from the end of the file, so a long recording costs the
+    same as a short one.
+    Returns: (prices_a, prices_b) as float arrays (empty if the file is missing).
+    """
+    if not os.path.exists(csv_path):
+        return np.empty(0), np.empty(0)
+
+    with open(csv_path, "rb") as f:
+        header = f.readline().decode().strip().split(",")
+        body_start = f.tell()
+
+        # 1. Grab blocks from the end until we hold enough lines
+        f.seek(0, os.SEEK_END)
+        position, tail = f.tell(), b""
+        while position > body_start and tail.count(b"\n") <= n_ticks:
+            step = min(65536, position - body_start)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+
+    # 2. Drop the (possibly partial) first line unless we reached the header
+    lines = tail.decode().splitlines()
+    if position > body_start:
+        lines = lines[1:]
+    rows = [row for row in csv.reader(io.StringIO("\n".join(lines[-n_ticks:]))) if row]
+
+    col_a, col_b = header.index("price_a"), header.index("price_b")
+    prices_a = np.array([float(row[col_a]) for row in rows])
+    prices_b = np.array([float(row[col_b]) for row in rows])
+    return prices_a, prices_b
+
+def recording_mode(csv_path) -> str:
+    """
+    The input mode the session recorded to 'csv_path' ran in (kept next to it
+    as '<csv_path>.mode'). Recordings older than the marker were all trades.
+    """
+    try:
+        with open(csv_path + ".mode") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return "trades"
+
+def mark_recording(csv_path, mode):
+    """
+    Stamps 'csv_path' with the input mode the session appending to it runs in.
+    """
+    with open(csv_path + ".mode", "w") as f:
+        f.write(mode + "\n")
+
+def recording_applies(csv_path, mode) -> bool:
+    """
+    Can the tail of 'csv_path' warm-start an engine running in 'mode'?
+    Only if it was recorded in that same mode, and not for bars: the recorder
+    samples once per second, so a bar shows up as many identical rows.
+    """
+    return not mode.startswith("bars") and recording_mode(csv_path) == mode
+
+def warm_start_from_recording(model, csv_path, n_ticks=600) -> int:
+    """
+    Primes 'model' with the tail of a recorded session (through PairModel.warm_start).
+    Note: recordings are sampled (1 row per second), so this approximates the
+    tick-level state; a checkpoint is exact.
+    Returns: number of rows consumed.
+    """
+    prices_a, prices_b = read_recent_ticks(csv_path, n_ticks)
+    consumed = model.warm_start(prices_a, prices_b)
+    if consumed:
+        print(f"[CHECKPOINT] Warm-started math state from the last {consumed} rows of {csv_path}.")
+    return consumed
@@ -0,0 +1,115 @@
+import asyncio
+import math
+import numpy as np
+from src.shared.state import Blackboard, TOPIC_PRICES
+from src.shared.clock import RealClock
+from src.signals.cointegration import engle_granger_fast
+
+class CointegrationMonitor:
+    """
+    Responsibility: Keep checking, live, that the pair is still cointegrated.
+
+    - The SAMPLER takes one aligned (price_a, price_b) every 'sample_interval'
+      seconds (a throttled Blackboard subscription) into a fixed ring buffer:
+      O(1) and never more than one sample per interval, whatever the tick rate.
+      Quiet markets yield FEWER samples, so each one keeps its timestamp.
+    - The TESTER wakes every 'interval' seconds, copies the window and runs the
+      Engle-Granger test in a worker thread, off the event loop and off the tick path.
+    - The verdict is published to the Blackboard: 'tradeable' plus the ADF
+      statistic, p-value and half-life (seconds: samples x their mean spacing).
+
+    Tradeable = p-value below 'p_threshold' AND half-life within
+    [min_half_life, max_half_life]. Until 'min_samples' are collected nothing
+    is published and the Blackboard keeps its default (tradeable).
+    """
+    def __init__(self, blackboard: Blackboard, window=3600, sample_interval=1.0, interval=60.0, lags=1,
+                 p_threshold=0.05, min_half_life=0.0, max_half_life=math.inf, min_samples=300, clock=None):
+        self.blackboard = blackboard
+        self.window = window
+        self.sample_interval = sample_interval
+        self.interval = interval
+        self.lags = lags
+        self.p_threshold = p_threshold
+        self.min_half_life = min_half_life
+        self.max_half_life = max_half_life
+        self.min_samples = max(min_samples, lags + 10)
+        self.clock = clock or RealClock()
+
+        # Ring buffer of aligned samples and their timestamps
+        self._prices = np.empty((window, 2))
+        self._times = np.empty(window)
+        self._count = 0
+
+        self.last_result = None
+        self.tests_run = 0
+
+    async def run(self):
+        print(f"[COINT] Monitor started. Window {self.window} x {self.sample_interval:g}s, "
+              f"testing every {self.interval:g}s.")
+        await asyncio.gather(self._sample(), self._test_loop())
+
+    # --- SAMPLER (on the loop, O(1)) ---
+
+    async def _sample(self):
+        subscription = self.blackboard.subscribe(mode='throttle', interval=self.sample_interval,
+                                                 topics=(TOPIC_PRICES,), clock=self.clock)
+        try:
+            async for state in subscription:
+                if state.price_a == 0 or state.price_b == 0:
+                    continue
+                slot = self._count % self.window
+                self._prices[slot] = (state.price_a, state.price_b)
+                self._times[slot] = state.timestamp
+                self._count += 1
+        finally:
+            subscription.close()
+
+    def samples(self) -> np.ndarray:
+        """
+        The window in time order (a copy: safe to hand to another thread).
+        """
+        return self._ordered(self._prices)
+
+    def sample_spacing(self) -> float:
+        """
+        Mean seconds between the samples in the window ('sample_interval' until
+        two samples exist). Larger than 'sample_interval' when ticks are sparse.
+        """
+        times = self._ordered(self._times)
+        if len(times) < 2 or not times[-1] > times[0]:
+            return self.sample_interval
+        return float(times[-1] - times[0]) / (len(times) - 1)
+
+    def _ordered(self, ring: np.ndarray) -> np.ndarray:
+        if self._count < self.window:
+            return ring[:self._count].copy()
+        head = self._count % self.window
+        return np.concatenate((ring[head:], ring[:head]))
+
+    # --- TESTER (background thread) ---
+
+    async def _test_loop(self):
+        while True:
+            await self.clock.sleep(self.interval)
+            if math.isinf(self.clock.now()):
+                return  # Replay clock released at the end of the tape
+            if self._count < self.min_samples:
+                continue
+            window, spacing = self.samples(), self.sample_spacing()
+            result = await asyncio.to_thread(engle_granger_fast, window[:, 0], window[:, 1], self.lags)
+            await self._publish(result, spacing)
+
+    async def _publish(self, result: dict, spacing: float):
+        half_life = result['half_life'] * spacing
+        tradeable = (result['p_value'] < self.p_threshold
+                     and self.min_half_life <= half_life <= self.max_half_life)
+
+        previous = self.last_result
+        self.last_result = {**result, 'half_life': half_life, 'tradeable': tradeable}
+        self.tests_run += 1
+
+        await self.blackboard.update_cointegration(tradeable, result['adf_stat'], result['p_value'], half_life)
+        if previous is None or previous['tradeable'] != tradeable:
+            verdict = "TRADEABLE" if tradeable else "NOT TRADEABLE (relationship broken)"
+            print(f"[COINT] {verdict}: ADF {result['adf_stat']:.2f} | p {result['p_value']:.4f} | "
+                  f"half-life {half_life:.0f}s")
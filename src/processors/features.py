@@ -0,0 +1,308 @@
+import copy
+import inspect
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+
+# name -> Feature class
+FEATURES = {}
+
+def register(cls):
+    """
+    Class decorator: makes a Feature available to pipelines by its 'name'.
+    """
+    FEATURES[cls.name] = cls
+    return cls
+
+class Feature(ABC):
+    """
+    Responsibility: ONE feature, defined twice with identical results:
+        batch(data)  -> vectorized over a whole session (backfill, training)
+        update(row)  -> O(1) streaming step on one row (recorder, live inference)
+
+    'data' is a dict of column arrays and 'row' a dict of scalars, both with the
+    recorder's columns ('timestamp', 'price_a', 'spread', 'z_score', ...).
+    Parameters are keyword arguments; they are part of the column name
+    (e.g. z_delta(lag=30) -> 'z_delta_30') and of the cache key.
+    """
+    name = None
+    inputs = ()  # Recorded columns the feature reads
+
+    def __init__(self, **params):
+        self.params = params
+        self.reset()
+
+    @property
+    def column(self) -> str:
+        return "_".join([self.name] + [f"{value:g}" if isinstance(value, float) else str(value)
+                                       for value in self.params.values()])
+
+    def reset(self):
+        """
+        Clears the streaming state (start of a new session).
+        """
+
+    @abstractmethod
+    def batch(self, data: dict) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def update(self, row: dict) -> float:
+        ...
+
+# --- RECORDED COLUMNS (the math engine's outputs, passed through) ---
+
+class Recorded(Feature):
+    def batch(self, data):
+        return np.asarray(data[self.name], dtype=float)
+
+    def update(self, row):
+        return float(row[self.name])
+
+for _column in ('z_score', 'theta', 'volatility', 'spread'):
+    register(type(f"Recorded_{_column}", (Recorded,), {'name': _column, 'inputs': (_column,)}))
+
+# --- CALENDAR (UTC hour of day, day of week with Monday = 0) ---
+
+def hour_and_weekday(timestamp):
+    """
+    UTC hour (0-23) and weekday (Monday = 0) of UNIX timestamps, scalar or array.
+    Pure arithmetic, so the batch and streaming paths agree to the bit.
+    """
+    days = np.floor_divide(timestamp, 86400)
+    hour = np.floor_divide(timestamp, 3600) % 24
+    return hour, (days + 3) % 7  # 1970-01-01 was a Thursday
+
+class _Cyclical(Feature):
+    inputs = ('timestamp',)
+    period = None  # 24 (hours) or 7 (days)
+    wave = None    # np.sin or np.cos
+
+    def _value(self, timestamp):
+        hour, weekday = hour_and_weekday(timestamp)
+        unit = hour if self.period == 24 else weekday
+        return self.wave(2 * np.pi * unit / float(self.period))
+
+    def batch(self, data):
+        return self._value(np.asarray(data['timestamp'], dtype=float))
+
+    def update(self, row):
+        return float(self._value(float(row['timestamp'])))
+
+for _name, _period, _wave in (('hour_sin', 24, np.sin), ('hour_cos', 24, np.cos),
+                              ('day_sin', 7, np.sin), ('day_cos', 7, np.cos)):
+    register(type(f"Cyclical_{_name}", (_Cyclical,), {'name': _name, 'period': _period, 'wave': staticmethod(_wave)}))
+
+# --- DERIVED (new features backfilled from the recorded columns) ---
+
+@register
+class ZDelta(Feature):
+    """
+    Z-score momentum: z[t] - z[t - lag] (0 until 'lag' rows exist).
+    """
+    name = 'z_delta'
+    inputs = ('z_score',)
+
+    def __init__(self, lag=30):
+        super().__init__(lag=lag)
+
+    def reset(self):
+        self._history = deque(maxlen=self.params['lag'] + 1)
+
+    def batch(self, data):
+        z = np.asarray(data['z_score'], dtype=float)
+        lag = self.params['lag']
+        out = np.zeros(len(z))
+        out[lag:] = z[lag:] - z[:-lag]
+        return out
+
+    def update(self, row):
+        self._history.append(float(row['z_score']))
+        if len(self._history) <= self.params['lag']:
+            return 0.0
+        return self._history[-1] - self._history[0]
+
+@register
+class SpreadEwmZ(Feature):
+    """
+    Spread z-score against an exponentially weighted mean / variance
+    (alpha = 2 / (span + 1)): a smoother, longer-memory sibling of 'z_score'.
+    """
+    name = 'spread_ewm_z'
+    inputs = ('spread',)
+
+    def __init__(self, span=300):
+        super().__init__(span=span)
+
+    def reset(self):
+        self._mean = None
+        self._var = 0.0
+
+    def batch(self, data):
+        x = np.asarray(data['spread'], dtype=float)
+        if len(x) == 0:
+            return x
+        # Offline only: the live path (update) never pays the scipy import
+        from scipy.signal import lfilter
+        alpha = 2.0 / (self.params['span'] + 1.0)
+
+        # mean[t] = (1 - a) * mean[t-1] + a * x[t], seeded with x[0]
+        mean, _ = lfilter([alpha], [1.0, alpha - 1.0], x[1:], zi=[(1.0 - alpha) * x[0]])
+        mean = np.concatenate(([x[0]], mean))
+        # var[t] = (1 - a) * (var[t-1] + a * (x[t] - mean[t-1])^2), seeded with 0
+        surprise = np.concatenate(([0.0], x[1:] - mean[:-1]))
+        var = lfilter([(1.0 - alpha) * alpha], [1.0, alpha - 1.0], surprise ** 2)
+
+        std = np.sqrt(var)
+        out = np.zeros(len(x))
+        np.divide(x - mean, std, out=out, where=std > 0)
+        return out
+
+    def update(self, row):
+        x = float(row['spread'])
+        if self._mean is None:
+            self._mean = x
+            return 0.0
+        alpha = 2.0 / (self.params['span'] + 1.0)
+        surprise = x - self._mean
+        self._mean += alpha * surprise
+        self._var = (1.0 - alpha) * (self._var + alpha * surprise * surprise)
+        return (x - self._mean) / math.sqrt(self._var) if self._var > 0 else 0.0
+
+@register
+class SpreadChangeVol(Feature):
+    """
+    Rolling standard deviation of the spread's row-to-row change over 'window' rows.
+    Streaming keeps running sums over a ring of changes (O(1) per row).
+    """
+    name = 'spread_change_vol'
+    inputs = ('spread',)
+
+    def __init__(self, window=60):
+        super().__init__(window=window)
+
+    def reset(self):
+        self._last = None
+        self._changes = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def batch(self, data):
+        x = np.asarray(data['spread'], dtype=float)
+        window = self.params['window']
+        changes = np.diff(x, prepend=x[:1]) if len(x) else x
+        changes[:1] = 0.0
+        # Rolling sums via cumulative sums; row i covers changes (i - window, i]
+        csum = np.concatenate(([0.0], np.cumsum(changes)))
+        csum_sq = np.concatenate(([0.0], np.cumsum(changes ** 2)))
+        idx = np.arange(1, len(x) + 1)
+        lo = np.maximum(idx - window, 1)  # The first row has no change
+        count = idx - lo
+        safe = np.maximum(count, 1)
+        mean = (csum[idx] - csum[lo]) / safe
+        var = np.maximum((csum_sq[idx] - csum_sq[lo]) / safe - mean ** 2, 0.0)
+        return np.where(count > 1, np.sqrt(var), 0.0)
+
+    def update(self, row):
+        x = float(row['spread'])
+        if self._last is not None:
+            change = x - self._last
+            self._changes.append(change)
+            self._sum += change
+            self._sum_sq += change * change
+            if len(self._changes) > self.params['window']:
+                old = self._changes.popleft()
+                self._sum -= old
+                self._sum_sq -= old * old
+        self._last = x
+
+        count = len(self._changes)
+        if count <= 1:
+            return 0.0
+        mean = self._sum / count
+        return math.sqrt(max(self._sum_sq / count - mean * mean, 0.0))
+
+# --- PIPELINE ---
+
+def make_feature(spec) -> Feature:
+    """
+    'name' or ('name', {params}) -> a Feature instance.
+    """
+    name, params = (spec, {}) if isinstance(spec, str) else spec
+    if name not in FEATURES:
+        raise KeyError(f"Unknown feature '{name}'. Registered: {sorted(FEATURES)}")
+    return FEATURES[name](**params)
+
+def spec_from_column(column: str):
+    """
+    Inverse of Feature.column: 'z_delta_30' -> ('z_delta', {'lag': 30}).
+    Lets a stored observation layout (column names) rebuild its pipeline.
+    """
+    for name in sorted(FEATURES, key=len, reverse=True):
+        if column == name:
+            return name
+        if column.startswith(name + "_"):
+            values = column[len(name) + 1:].split("_")
+            params = list(inspect.signature(FEATURES[name].__init__).parameters)[1:]
+            if len(values) == len(params):
+                return name, {param: int(value) if value.lstrip('-').isdigit() else float(value)
+                              for param, value in zip(params, values)}
+    raise KeyError(f"No registered feature produces column '{column}'")
+
+class FeaturePipeline:
+    """
+    Responsibility: Compute a configured SET of registered features in one pass,
+    either over a whole session (batch) or row by row (stream), with the same values.
+
+    specs: list of 'name' or ('name', {params}), e.g.
+        ['z_score', 'theta', ('z_delta', {'lag': 30})]
+    """
+    def __init__(self, specs):
+        self.features = [make_feature(spec) for spec in specs]
+        self.columns = [feature.column for feature in self.features]
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError(f"Duplicate feature columns: {self.columns}")
+
+    @property
+    def spec(self) -> list:
+        """
+        JSON-able description (part of the feature-cache key).
+        """
+        return [[feature.name, feature.params] for feature in self.features]
+
+    @property
+    def inputs(self) -> list:
+        return sorted({column for feature in self.features for column in feature.inputs})
+
+    def batch(self, data: dict) -> dict:
+        """
+        data: dict of column arrays -> dict column name -> np.ndarray.
+        """
+        return {column: feature.batch(data) for column, feature in zip(self.columns, self.features)}
+
+    def stream(self) -> "FeatureStream":
+        return FeatureStream(self)
+
+class FeatureStream:
+    """
+    Responsibility: The pipeline's streaming side, with its own state.
+    update(row) -> np.ndarray of the feature values in pipeline order
+    (written into one preallocated buffer: copy it if you keep it).
+    """
+    def __init__(self, pipeline: FeaturePipeline):
+        self.columns = pipeline.columns
+        self.features = [copy.deepcopy(feature) for feature in pipeline.features]
+        for feature in self.features:
+            feature.reset()
+        self._out = np.empty(len(self.features))
+
+    def update(self, row: dict) -> np.ndarray:
+        out = self._out
+        for i, feature in enumerate(self.features):
+            out[i] = feature.update(row)
+        return out
+
+    def reset(self):
+        for feature in self.features:
+            feature.reset()
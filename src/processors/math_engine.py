@@ -1,59 +1,154 @@
 import asyncio
+import time
+import numpy as np
 from src.shared.state import Blackboard
 from src.math.kalman import KalmanFilter
 from src.math.statistics import WindowStatistics
+from src.shared.metrics import TICKS_PROCESSED, MATH_BUSY
+from src.processors.checkpoint import MathCheckpoint, warm_start_from_recording
 
-async def run_math_engine(blackboard: Blackboard, 
-                          update_event: asyncio.Event):
+class PairModel:
     """
-    The Brain Loop.
-    Triggered ONLY when new market data arrives.
+    Responsibility: The per-pair math chain (Kalman -> OU Statistics -> Z-Score).
+    Holds all the memory of one pair, so it can be pickled and moved to
+    another process (or to disk) with its warm state.
     """
-    print("[SYSTEM] Math Engine Started.")
-    
-    # Initialize our Math Models
-    # These persist across loops (Memory)
-    kalman = KalmanFilter(delta=1e-4, R=1e-3)
-    stats = WindowStatistics(window_size=300) # 5 min window
-    
-    while True:
-        # 1. THE PAUSE
-        # We wait here efficiently until the WebSocket tells us to wake up.
-        await update_event.wait()
-        update_event.clear() # Reset the flag immediately
-        
-        # 2. THE READ (Atomic Snapshot)
-        # We need the generic price_a and price_b
-        state = await blackboard.get_state()
-        
-        # Safety Check: Don't run math on empty data
-        if state.price_a == 0 or state.price_b == 0:
-            continue
-            
-        # 3. THE COMPUTE (Sequential Math Chain)
-        
+    def __init__(self, delta=1e-4, R=1e-3, window_size=300):
+        # These persist across ticks (Memory)
+        self.kalman = KalmanFilter(delta=delta, R=R)
+        self.stats = WindowStatistics(window_size=window_size) # 5 min window
+
+    def update(self, price_a: float, price_b: float):
+        """
+        Returns: (beta, theta, sigma, spread, z_score)
+        """
         # A. Update Kalman -> Get Beta
-        beta, spread = kalman.update(state.price_a, state.price_b)
-        
+        beta, spread = self.kalman.update(price_a, price_b)
+
         # B. Calculate Raw Spread (The Error Signal)
         # spread = Price_A - (Beta * Price_B)
         # spread = state.price_a - (beta * state.price_b)
-        
+
         # C. Update Statistics -> Get Physics
-        theta, mu, sigma = stats.update(spread)
-        
+        theta, mu, sigma = self.stats.update(spread)
+
         # D. Calculate Z-Score (The Trading Signal)
         # Z = (Current_Value - Mean) / Volatility
         z_score = (spread - mu) / sigma
-        
-        # 4. THE WRITE (Update Shared State)
-        await blackboard.update_math(
-            beta=beta,
-            theta=theta,
-            vol=sigma,    # passing sigma as 'volatility'
-            spread=spread,
-            z_score=z_score
-        )
-        
-        # (Optional) Logging to prove it's alive
-        # print(f"[MATH] Z: {z_score:.2f} | Beta: {beta:.4f} | Theta: {theta:.4f}")
\ No newline at end of file
+
+        return beta, theta, sigma, spread, z_score
+
+    def warm_start(self, prices_a, prices_b) -> int:
+        """
+        The batch path: runs a block of past prices through the Kalman filter
+        and loads the resulting spreads straight into the statistics window.
+        Ends in the same state as calling update() on every pair of prices,
+        without the per-tick OU fit whose outputs would be thrown away.
+        Returns: number of ticks consumed.
+        """
+        spreads = []
+        for price_a, price_b in zip(prices_a, prices_b):
+            _, spread = self.kalman.update(float(price_a), float(price_b))
+            spreads.append(spread)
+        self.stats.history.extend(spreads[-self.stats.window_size:])
+        return len(spreads)
+
+    # --- CHECKPOINTING ---
+
+    def state_dict(self) -> dict:
+        """
+        Everything needed to resume: filter state, covariance, the spread window
+        and the parameters they were produced with.
+        """
+        return {
+            'kalman_state': self.kalman.state,
+            'kalman_P': self.kalman.P,
+            'stats_history': np.array(self.stats.history, dtype=float),
+            'delta': self.kalman.Q[0, 0],
+            'R': self.kalman.R,
+            'window_size': self.stats.window_size,
+        }
+
+    def load_state_dict(self, state: dict):
+        """
+        Restores a state_dict(). Refuses state built with different parameters
+        (it would silently mix two models).
+        """
+        params = (float(state['delta']), float(state['R']), int(state['window_size']))
+        if not np.allclose(params, (self.kalman.Q[0, 0], self.kalman.R, self.stats.window_size)):
+            raise ValueError(f"Checkpoint parameters (delta, R, window) {params} do not match the model")
+        self.kalman.state = np.array(state['kalman_state'], dtype=float)
+        self.kalman.P = np.array(state['kalman_P'], dtype=float)
+        self.stats.history.clear()
+        self.stats.history.extend(float(v) for v in state['stats_history'])
+
+async def run_math_engine(blackboard: Blackboard,
+                          update_event: asyncio.Event,
+                          checkpoint: MathCheckpoint = None,
+                          warm_start_csv: str = None,
+                          warm_ticks: int = 600,
+                          ack: asyncio.Event = None):
+    """
+    The Brain Loop.
+    Triggered ONLY when new market data arrives.
+
+    checkpoint:     restore from it on startup and save to it periodically
+                    (and on shutdown).
+    warm_start_csv: if no checkpoint could be restored, prime the model with
+                    the last 'warm_ticks' rows of this recorded session.
+    ack:            set on every pickup of the bell (lockstep replay waits on it).
+    """
+    print("[SYSTEM] Math Engine Started.")
+
+    # Initialize our Math Models
+    model = PairModel(delta=1e-4, R=1e-3, window_size=300)
+
+    # Warm Restart: checkpoint first (exact), then the recording (approximate), else cold
+    restored = checkpoint.load(model) if checkpoint is not None else None
+    if restored is None and warm_start_csv:
+        warm_start_from_recording(model, warm_start_csv, warm_ticks)
+
+    last_timestamp = restored or 0.0
+    try:
+        while True:
+            # 1. THE PAUSE
+            # We wait here efficiently until the WebSocket tells us to wake up.
+            await update_event.wait()
+            update_event.clear() # Reset the flag immediately
+            if ack is not None:
+                ack.set()
+
+            # 2. THE READ (Atomic Snapshot)
+            # We need the generic price_a and price_b
+            state = await blackboard.get_state()
+
+            # Safety Check: Don't run math on empty data
+            if state.price_a == 0 or state.price_b == 0:
+                continue
+
+            # 3. THE COMPUTE (Sequential Math Chain)
+            started = time.perf_counter()
+            beta, theta, sigma, spread, z_score = model.update(state.price_a, state.price_b)
+            MATH_BUSY.inc(time.perf_counter() - started)
+            TICKS_PROCESSED.inc()
+            last_timestamp = state.timestamp
+
+            # 4. THE WRITE (Update Shared State)
+            await blackboard.update_math(
+                beta=beta,
+                theta=theta,
+                vol=sigma,    # passing sigma as 'volatility'
+                spread=spread,
+                z_score=z_score
+            )
+
+            # 5. THE CHECKPOINT (cheap, and only every checkpoint.interval seconds)
+            if checkpoint is not None:
+                checkpoint.maybe_save(model, last_timestamp)
+
+            # (Optional) Logging to prove it's alive
+            # print(f"[MATH] Z: {z_score:.2f} | Beta: {beta:.4f} | Theta: {theta:.4f}")
+    finally:
+        # Shutdown (cancel / Ctrl+C): keep the freshest state for the next start
+        if checkpoint is not None:
+            checkpoint.save(model, last_timestamp)
@@ -0,0 +1,389 @@
+import asyncio
+import hashlib
+import multiprocessing as mp
+import queue
+import time
+
+from src.shared.state import Blackboard
+from src.processors.math_engine import PairModel
+from src.shared.metrics import TICKS_PROCESSED
+
+# --- PAIR UNIVERSE ---
+
+def to_binance_symbol(ticker: str) -> str:
+    """
+    'BTC-USD' (Yahoo, as in config.PAIRS) -> 'btcusdt' (Binance spot).
+    """
+    base, _, quote = ticker.upper().partition("-")
+    if quote in ("", "USD"):
+        quote = "USDT"
+    return f"{base}{quote}".lower()
+
+def pairs_from_config(pairs) -> list:
+    """
+    config.PAIRS entries -> [{'id', 'symbol_a', 'symbol_b'}] for the live engine.
+    Entries that already carry 'symbol_a' / 'symbol_b' are used as is.
+    """
+    return [{
+        'id': pair['id'],
+        'symbol_a': pair.get('symbol_a') or to_binance_symbol(pair['asset_a']),
+        'symbol_b': pair.get('symbol_b') or to_binance_symbol(pair['asset_b']),
+    } for pair in pairs]
+
+def assign_pairs(pair_ids, n_workers) -> dict:
+    """
+    Stable pair -> worker assignment (rendezvous hashing).
+    The same pair always lands on the same worker across restarts, and
+    going from N to N+1 workers only moves the ~1/(N+1) pairs that the new
+    worker wins: everything else keeps its warm state where it is.
+    """
+    def weight(worker, pair_id):
+        return hashlib.sha1(f"{worker}:{pair_id}".encode()).digest()
+
+    return {pair_id: max(range(n_workers), key=lambda w: weight(w, pair_id)) for pair_id in pair_ids}
+
+# --- WORKER PROCESS ---
+
+class _Shard:
+    """
+    One worker's pairs, their PairModels and the last price of every symbol it sees.
+    Pairs announced with expect() but not adopted yet (state still in flight
+    from their old owner) buffer their ticks, which are replayed on adopt():
+    a moved pair misses nothing.
+    """
+    def __init__(self, coalesce):
+        self.coalesce = coalesce
+        self.pairs = {}      # pair_id -> pair dict
+        self.models = {}     # pair_id -> PairModel
+        self.backlog = {}    # pair_id -> [(symbol, price, ts), ...] while awaiting adoption
+        self.by_symbol = {}  # symbol -> [pair_id, ...] (owned + expected)
+        self.prices = {}     # symbol -> (last price, timestamp)
+        self.dirty = {}      # Insertion-ordered set of pairs touched by coalesced ticks
+
+    def _index(self):
+        self.by_symbol = {}
+        for pair_id, pair in list(self.pairs.items()):
+            self.by_symbol.setdefault(pair['symbol_a'], []).append(pair_id)
+            self.by_symbol.setdefault(pair['symbol_b'], []).append(pair_id)
+
+    def _compute(self, pair_id, prices, rows):
+        pair = self.pairs[pair_id]
+        a, b = prices.get(pair['symbol_a']), prices.get(pair['symbol_b'])
+        if a is None or b is None:
+            return  # Waiting for the first print of both legs
+        beta, theta, sigma, spread, z_score = self.models[pair_id].update(a[0], b[0])
+        rows.append((pair_id, max(a[1], b[1]), a[0], b[0], beta, theta, sigma, spread, z_score))
+
+    def on_ticks(self, ticks, rows):
+        for symbol, price, timestamp in ticks:
+            self.prices[symbol] = (price, timestamp)
+            for pair_id in self.by_symbol.get(symbol, ()):
+                if pair_id in self.backlog:
+                    self.backlog[pair_id].append((symbol, price, timestamp))
+                elif self.coalesce:
+                    self.dirty[pair_id] = None
+                else:
+                    self._compute(pair_id, self.prices, rows)
+
+    def flush(self, rows):
+        for pair_id in self.dirty:
+            if pair_id in self.models:
+                self._compute(pair_id, self.prices, rows)
+        self.dirty = {}
+
+    def expect(self, pair):
+        self.pairs[pair['id']] = pair
+        self.backlog[pair['id']] = []
+        self._index()
+
+    def adopt(self, pair, model, last_prices, rows):
+        pair_id = pair['id']
+        self.pairs[pair_id] = pair
+        self.models[pair_id] = model or PairModel()
+        self._index()
+
+        # Replay what arrived while the state was in flight, on the prices as they were then
+        prices = dict(last_prices or {})
+        backlog = self.backlog.pop(pair_id, [])
+        for symbol, price, timestamp in backlog:
+            prices[symbol] = (price, timestamp)
+            if not self.coalesce:
+                self._compute(pair_id, prices, rows)
+        if backlog and self.coalesce:
+            self._compute(pair_id, prices, rows)
+        for symbol, value in prices.items():
+            self.prices.setdefault(symbol, value)
+
+    def release(self, pair_id):
+        pair = self.pairs.pop(pair_id)
+        self.dirty.pop(pair_id, None)
+        self._index()
+        last = {s: self.prices[s] for s in (pair['symbol_a'], pair['symbol_b']) if s in self.prices}
+        return self.models.pop(pair_id), last
+
+def _worker_main(worker_id, inbox, outbox, coalesce):
+    """
+    Process entry point. Inbox messages:
+        ('ticks', [(symbol, price, ts), ...])  price updates (only symbols this shard needs)
+        ('expect', pair)                       a pair is moving here: buffer its ticks
+        ('adopt', pair, model, last_prices)    take ownership (model None = cold start)
+        ('release', [pair_id, ...])            hand pairs over (state goes to the outbox)
+        None                                   shut down
+    """
+    shard = _Shard(coalesce)
+    outbox.put(('ready', worker_id))
+
+    while True:
+        messages = [inbox.get()]
+        # Drain the backlog: a shard that fell behind catches up in one pass
+        while True:
+            try:
+                messages.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        rows = []
+        for message in messages:
+            if message is None:
+                shard.flush(rows)
+                if rows:
+                    outbox.put(('math', worker_id, rows))
+                return
+
+            kind = message[0]
+            if kind == 'ticks':
+                shard.on_ticks(message[1], rows)
+                continue
+
+            # Ownership changes apply after the coalesced work of the current owner set
+            shard.flush(rows)
+            if kind == 'expect':
+                shard.expect(message[1])
+            elif kind == 'adopt':
+                shard.adopt(message[1], message[2], message[3], rows)
+            elif kind == 'release':
+                # Results computed so far go out first: the new owner's replay must merge after them
+                if rows:
+                    outbox.put(('math', worker_id, rows))
+                    rows = []
+                for pair_id in message[1]:
+                    model, last = shard.release(pair_id)
+                    outbox.put(('state', pair_id, model, last))
+
+        shard.flush(rows)
+        if rows:
+            outbox.put(('math', worker_id, rows))
+
+# --- PARENT ---
+
+class ShardedEngine:
+    """
+    Responsibility: Run the live math for MANY pairs across worker processes.
+
+    - Pairs are spread over N workers by a stable hash (assign_pairs).
+    - Ingestion happens once per SYMBOL in this process (feed() / on_trade);
+      each tick is routed only to the workers whose pairs use that symbol,
+      batched per event-loop iteration to keep IPC overhead low.
+    - Results are merged back into one Blackboard per pair ('boards'), so the
+      recorder, monitors and execution subscribe exactly as in the single-pair setup.
+    - add_worker() rebalances: the pairs the new worker wins are released by
+      their old owner and adopted with their warm Kalman / statistics state
+      (ticks that arrive during the handover are buffered and replayed).
+
+    coalesce=True: a shard that falls behind computes each pair once on the
+    newest prices (like the single-pair event), instead of replaying every tick.
+    """
+    def __init__(self, pairs, n_workers=2, coalesce=True):
+        self.pairs = {pair['id']: pair for pair in pairs}
+        self.boards = {pair_id: Blackboard() for pair_id in self.pairs}
+        self.coalesce = coalesce
+        self.n_workers = 0
+        self.assignment = {}
+        self.routes = {}  # symbol -> set of worker ids
+
+        # 'spawn', not the default fork: close() joins workers from to_thread threads,
+        # and forking while other threads run can copy their held locks into the child
+        self._ctx = mp.get_context('spawn')
+        self._outbox = self._ctx.Queue()
+        self._inboxes = []
+        self._processes = []
+        self._pending = {}  # worker id -> [(symbol, price, ts), ...] awaiting flush
+        self._flush_scheduled = False
+        self._handover = {}  # pair_id -> new owner (adopt as soon as the state arrives)
+        self._merge_task = None
+
+        self._initial_workers = n_workers
+        self.ticks_routed = 0
+        self.rows_merged = 0
+
+    # --- LIFECYCLE ---
+
+    async def start(self):
+        for _ in range(self._initial_workers):
+            self._spawn_worker()
+        self.assignment = assign_pairs(self.pairs, self.n_workers)
+        for pair_id, worker in self.assignment.items():
+            self._inboxes[worker].put(('adopt', self.pairs[pair_id], None, None))
+        self._rebuild_routes()
+
+        self._merge_task = asyncio.create_task(self._merge_loop())
+        print(f"[SHARDS] {len(self.pairs)} pairs on {self.n_workers} workers, "
+              f"{len(self.routes)} symbols ingested once each.")
+
+    async def close(self, handover_timeout=5.0):
+        self._flush()
+        # Let in-flight handovers land before the workers stop (but not forever: a dead
+        # worker never sends the state it was releasing)
+        deadline = time.monotonic() + handover_timeout
+        while self._handover:
+            dead = [process.name for process in self._processes if not process.is_alive()]
+            if dead or time.monotonic() > deadline:
+                reason = f"worker(s) {', '.join(dead)} died" if dead else f"timed out after {handover_timeout}s"
+                print(f"[SHARDS] Handover of {sorted(self._handover)} abandoned: {reason}.")
+                self._handover.clear()
+                break
+            await asyncio.sleep(0.01)
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            await asyncio.to_thread(process.join, 5)
+        # Workers flushed their last results before exiting: the sentinel queues up behind them
+        self._outbox.put(('stop',))
+        if self._merge_task is not None:
+            await self._merge_task
+        print(f"[SHARDS] Stopped. {self.ticks_routed:,} ticks routed, {self.rows_merged:,} results merged.")
+
+    def _spawn_worker(self):
+        worker_id = self.n_workers
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(target=_worker_main, args=(worker_id, inbox, self._outbox, self.coalesce),
+                                    name=f"shard-{worker_id}", daemon=True)
+        process.start()
+        self._inboxes.append(inbox)
+        self._processes.append(process)
+        self.n_workers += 1
+        return worker_id
+
+    def _rebuild_routes(self):
+        self.routes = {}
+        for pair_id, worker in self.assignment.items():
+            pair = self.pairs[pair_id]
+            for symbol in (pair['symbol_a'], pair['symbol_b']):
+                self.routes.setdefault(symbol, set()).add(worker)
+
+    @property
+    def symbols(self) -> list:
+        return sorted(self.routes)
+
+    # --- INGESTION ---
+
+    def feed(self, symbol: str, price: float, timestamp: float):
+        """
+        One trade print. Synchronous (use as BinanceMultiStream's on_trade):
+        the tick is queued for every interested worker and flushed once per loop iteration.
+        """
+        for worker in self.routes.get(symbol, ()):
+            self._pending.setdefault(worker, []).append((symbol, price, timestamp))
+        self.ticks_routed += 1
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        for worker, ticks in pending.items():
+            self._inboxes[worker].put(('ticks', ticks))
+
+    # --- REBALANCING ---
+
+    def add_worker(self) -> list:
+        """
+        Scales out by one process. Returns the ids of the pairs that moved.
+        """
+        self._flush()  # Ticks already routed stay with the old owners
+        new_worker = self._spawn_worker()
+        new_assignment = assign_pairs(self.pairs, self.n_workers)
+
+        moved = [pair_id for pair_id in self.pairs if new_assignment[pair_id] != self.assignment[pair_id]]
+        releases = {}
+        for pair_id in moved:
+            releases.setdefault(self.assignment[pair_id], []).append(pair_id)
+            self._handover[pair_id] = new_assignment[pair_id]
+            # The new owner buffers this pair's ticks until the warm state arrives
+            self._inboxes[new_assignment[pair_id]].put(('expect', self.pairs[pair_id]))
+        for worker, pair_ids in releases.items():
+            self._inboxes[worker].put(('release', pair_ids))
+
+        self.assignment = new_assignment
+        self._rebuild_routes()
+        print(f"[SHARDS] Worker {new_worker} added: {len(moved)} of {len(self.pairs)} pairs moved.")
+        return moved
+
+    # --- MERGE ---
+
+    async def _merge_loop(self):
+        while True:
+            messages = [await asyncio.to_thread(self._outbox.get)]
+            # Drain without another thread hop while results are flowing
+            while True:
+                try:
+                    messages.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            for message in messages:
+                if message[0] == 'stop':
+                    return
+                await self._handle(message)
+
+    async def _handle(self, message):
+        kind = message[0]
+        if kind == 'math':
+            for pair_id, timestamp, price_a, price_b, beta, theta, sigma, spread, z_score in message[2]:
+                board = self.boards[pair_id]
+                await board.update_prices(price_a, price_b, timestamp)
+                await board.update_math(beta=beta, theta=theta, vol=sigma, spread=spread, z_score=z_score)
+            self.rows_merged += len(message[2])
+            TICKS_PROCESSED.inc(len(message[2]))
+        elif kind == 'state':
+            # Warm handover: the old owner let go, the new owner takes the state as is
+            _, pair_id, model, last_prices = message
+            new_owner = self._handover.pop(pair_id, self.assignment[pair_id])
+            self._inboxes[new_owner].put(('adopt', self.pairs[pair_id], model, last_prices))
+
+    async def snapshot(self) -> dict:
+        """
+        The merged view: pair id -> MarketData (one consistent copy per pair).
+        """
+        return {pair_id: await board.get_state() for pair_id, board in self.boards.items()}
+
+async def run_live(pairs, n_workers=2, print_every=5.0):
+    """
+    Live entry point: one Binance connection for every symbol, N math shards,
+    and a merged status line per pair.
+    """
+    # Imported here: offline users of the engine don't need the websocket stack
+    from src.data_loader.stream import BinanceMultiStream
+
+    engine = ShardedEngine(pairs, n_workers)
+    await engine.start()
+    stream = BinanceMultiStream(engine.symbols, engine.feed)
+    task_stream = asyncio.create_task(stream.connect())
+    try:
+        while True:
+            await asyncio.sleep(print_every)
+            for pair_id, state in (await engine.snapshot()).items():
+                if state.price_a != 0:
+                    print(f"[SHARDS] {pair_id}: Z {state.z_score:+.3f} | Beta {state.beta:.4f} | "
+                          f"worker {engine.assignment[pair_id]}")
+    finally:
+        task_stream.cancel()
+        await engine.close()
+
+if __name__ == "__main__":
+    import config
+
+    try:
+        asyncio.run(run_live(pairs_from_config(config.PAIRS), n_workers=config.LIVE_WORKERS))
+    except KeyboardInterrupt:
+        print("\n[SYSTEM] Shutting down...")
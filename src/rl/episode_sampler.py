@@ -0,0 +1,66 @@
+import numpy as np
+from src.data_loader.feature_store import FeatureStore
+from src.rl.gym_env import load_features, FEATURE_VERSION, FEATURE_CACHE_DIR
+
+class SessionCatalog:
+    """
+    Responsibility: Many recorded sessions (and pairs) as ONE dataset.
+    Every session is cleaned and feature-engineered once, then all of them are
+    concatenated into a single memory-mapped block. 'session_starts' marks
+    where each session begins so episodes never straddle two recordings.
+    Only the concatenation (with its offsets) is cached, never the sessions
+    one by one, so the data sits on disk once.
+    """
+    def __init__(self, csv_paths, skip_rows=100, cache_dir=FEATURE_CACHE_DIR):
+        self.csv_paths = list(csv_paths)
+
+        params = {'skip_rows': skip_rows, 'version': FEATURE_VERSION}
+        build = lambda: self._concatenate(skip_rows)
+        if cache_dir is None:
+            arrays = build()
+        else:
+            arrays = FeatureStore(cache_dir).get(self.csv_paths, params, build)
+
+        self.session_starts = np.asarray(arrays.pop('session_starts'))
+        self.features = arrays
+        self.n_steps = len(self.features['spread'])
+        self.session_lengths = np.diff(np.append(self.session_starts, self.n_steps))
+
+        print(f"[CATALOG] {len(self.csv_paths)} sessions, {self.n_steps:,} steps")
+
+    def _concatenate(self, skip_rows):
+        sessions = [load_features(path, skip_rows, cache_dir=None) for path in self.csv_paths]
+        lengths = [len(session['spread']) for session in sessions]
+        arrays = {name: np.concatenate([session[name] for session in sessions]) for name in sessions[0]}
+        arrays['session_starts'] = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        return arrays
+
+class EpisodeSampler:
+    """
+    Draws fixed-length episode windows uniformly over every valid start
+    position in the catalog (longer sessions get proportionally more episodes).
+
+    A window [start, end) always lies inside one session. Sampling is a
+    random integer plus one binary search over sessions: no data is touched.
+    """
+    def __init__(self, catalog: SessionCatalog, episode_length=2048):
+        self.episode_length = episode_length
+
+        # Valid starts per session: the episode needs 'episode_length' steps + 1 to mark the end
+        valid = np.maximum(catalog.session_lengths - episode_length, 0)
+        if valid.sum() == 0:
+            raise ValueError(f"No session is longer than episode_length={episode_length}.")
+
+        self.session_starts = catalog.session_starts
+        self.cum_valid = np.cumsum(valid)
+        self.total = int(self.cum_valid[-1])
+
+    def sample(self, rng: np.random.Generator, size=None):
+        """
+        Returns (start, end) step indices (arrays when size is given).
+        """
+        u = rng.integers(0, self.total, size=size)
+        session = np.searchsorted(self.cum_valid, u, side='right')
+        before = np.where(session > 0, self.cum_valid[session - 1], 0)
+        start = self.session_starts[session] + (u - before)
+        return start, start + self.episode_length
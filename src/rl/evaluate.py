@@ -1,166 +1,210 @@
 import os
 import sys
+import glob
+import time
+import argparse
+import functools
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+from concurrent.futures import ProcessPoolExecutor
 
 # Ensure we can find the src folder
 sys.path.append(os.getcwd())
 
-from src.rl.gym_env import TradingEnv
+from src.rl.gym_env import load_features, observation_specs, OBS_FEATURES
+from src.rl.policy import NumpyPolicy, ACTION_TO_POSITION
+from src.backtester.performance import compute_metrics, find_trades, PERIODS_SECONDLY
+
+# Rows per batched forward pass (bounds the policy's buffers to a few MB)
+ROLLOUT_CHUNK = 65_536
+
+# Fee estimator for the trade report (approximate based on env settings)
+# We use a fixed proxy for the 'Asset Price' since we don't log price_a.
+EST_FEE_PER_TRADE = 1.50 # $3000 * 0.05%
 
 def evaluate_agent():
     # 1. Configuration
     TEST_FILE = "data/raw/live_session.csv"
     MODEL_PATH = "models/ppo_stat_arb_v1"
     STATS_PATH = "models/vec_normalize.pkl"
-    
-    # 2. Recreate Environment
-    # CRITICAL: Must match training config exactly
-    env = DummyVecEnv([lambda: TradingEnv(TEST_FILE, skip_rows=100)])
-    env = VecNormalize.load(STATS_PATH, env)
-    env.training = False
-    env.norm_reward = False 
-    
-    # 3. Load Brain
+
+    # 2. Load Brain (converted to a NumPy actor: same actions as model.predict)
     print(f"[EVAL] Loading model from {MODEL_PATH}...")
-    model = PPO.load(MODEL_PATH)
-    
-    # 4. Simulation Loop
-    obs = env.reset()
-    done = False
-    
-    # Access inner env for raw data
-    raw_env = env.envs[0]
-    
-    history = {
-        'step': [],
-        'price': [],
-        'z_score': [],
-        'action': [],
-        'portfolio': [],
-        'position': []
-    }
-    
+    policy = load_policy(MODEL_PATH, STATS_PATH)
+
+    # 3. Load Data (same cleaning as training, plus any extra features the agent observes)
+    features = load_features(TEST_FILE, skip_rows=100, features=observation_specs(policy.obs_features or OBS_FEATURES))
+
+    # 4. Simulation
     print("[EVAL] Running simulation...")
-    while not done:
-        action, _ = model.predict(obs, deterministic=True)
-        
-        # Log State BEFORE step
-        history['step'].append(raw_env.current_step)
-        history['price'].append(raw_env.prices[raw_env.current_step]) # Spread Price
-        history['z_score'].append(raw_env.z_scores[raw_env.current_step])
-        history['portfolio'].append(raw_env.portfolio_value)
-        history['position'].append(raw_env.position) # Previous position
-        history['action'].append(int(action[0]))     # Target position
-        
-        obs, reward, done, _ = env.step(action)
+    history = rollout(policy, features)
 
     # 5. Generate Text Report
-    analyze_performance(history, raw_env)
+    analyze_performance(history, initial_balance=10000.0)
 
     # 6. Plotting (Optional - keeps the visual)
     plot_results(history)
 
-def analyze_performance(history, env_instance):
+# --- POLICY LOADING ---
+
+def find_stats(checkpoint):
+    """
+    VecNormalize stats for a checkpoint: '<name>_vec_normalize.pkl' next to it
+    if present, otherwise the shared 'vec_normalize.pkl' in the same folder.
+    """
+    base = os.path.splitext(checkpoint)[0]
+    for candidate in (f"{base}_vec_normalize.pkl", os.path.join(os.path.dirname(checkpoint), "vec_normalize.pkl")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def load_policy(checkpoint, stats_path=None, max_batch=ROLLOUT_CHUNK) -> NumpyPolicy:
+    """
+    An exported .npz loads directly; an SB3 .zip is converted in memory
+    (this is the only place torch gets imported).
+    """
+    if checkpoint.endswith(".npz"):
+        return NumpyPolicy.load(checkpoint, max_batch)
+
+    from src.rl.export_policy import policy_arrays
+    return NumpyPolicy.from_arrays(policy_arrays(checkpoint, stats_path or find_stats(checkpoint)), max_batch)
+
+# --- SIMULATION ---
+
+def rollout(policy: NumpyPolicy, features: dict, initial_balance=10000.0, transaction_fee=0.0) -> dict:
+    """
+    Plays one deterministic episode over a whole session, with the same rules
+    as TradingEnv (default fee 0 mirrors its testing override).
+
+    The observation only depends on the agent through the position (3 values),
+    so the network is evaluated ONCE per possible position for every step in
+    batched forward passes. The episode itself is then just a chain of table
+    lookups, and the accounting is vectorized.
+
+    Returns:
+        dict of np.ndarray, one entry per decision step:
+        'step', 'price', 'z_score', 'action', 'portfolio', 'position'
+        (portfolio and position are the values BEFORE the action is applied)
+    """
+    prices = np.asarray(features['spread'], dtype=float)
+    n = len(prices) - 1  # TradingEnv ends the episode on the step reaching the last row
+
+    # 1. Decision table: best action at every step for each current position
+    # The columns the agent was trained on (policies exported before they were stored: the default)
+    obs_features = policy.obs_features or OBS_FEATURES
+    position_col = obs_features.index('position')
+    obs = np.empty((min(n, ROLLOUT_CHUNK), len(obs_features)), dtype=np.float32)
+    table = np.empty((len(ACTION_TO_POSITION), n), dtype=np.int64)
+    for start in range(0, n, ROLLOUT_CHUNK):
+        stop = min(start + ROLLOUT_CHUNK, n)
+        chunk = obs[:stop - start]
+        for col, name in enumerate(obs_features):
+            if name != 'position':
+                chunk[:, col] = features[name][start:stop]
+        for action, position in enumerate(ACTION_TO_POSITION):
+            chunk[:, position_col] = position
+            table[action, start:stop] = policy.predict(chunk)
+
+    # 2. Follow the chain: the action at t sets the position the agent sees at t+1
+    choices = table.tolist()
+    actions = np.empty(n, dtype=np.int64)
+    chain = [0] * n
+    action = 0
+    for t in range(n):
+        action = choices[action][t]
+        chain[t] = action
+    actions[:] = chain
+
+    # 3. Accounting (mark to market, fee on every position change)
+    held = ACTION_TO_POSITION[actions]
+    position = np.concatenate(([0.0], held[:-1]))
+    traded = held != position
+    cash = initial_balance - np.cumsum(traded * np.abs(prices[:n]) * transaction_fee)
+    portfolio = np.empty(n)
+    portfolio[0] = initial_balance
+    portfolio[1:] = cash[:-1] + held[:-1] * prices[1:n]
+
+    return {
+        'step': np.arange(n),
+        'price': prices[:n],
+        'z_score': np.asarray(features['z_score'][:n]),
+        'action': actions,
+        'portfolio': portfolio,
+        'position': position
+    }
+
+def reconstruct_trades(history: dict) -> pd.DataFrame:
+    """
+    Vectorized trade list: every change of target position closes the open
+    trade (if any) and opens a new one (if the target is not flat).
+    Step 0 is the reference, as in the old row loop: a target already set
+    there is not counted as a trade; changes are detected from step 1 on.
+    """
+    direction = ACTION_TO_POSITION[history['action']]
+    entry, exit_ = find_trades(direction[1:], initial=direction[0]) if len(direction) else ([], [])
+    entry, exit_ = np.asarray(entry, dtype=int) + 1, np.asarray(exit_, dtype=int) + 1
+    price = history['price']
+
+    trades = pd.DataFrame({
+        'entry_step': history['step'][entry],
+        'exit_step': history['step'][exit_],
+        'entry_price': price[entry],
+        'exit_price': price[exit_],
+        'direction': direction[entry].astype(int),
+    })
+    trades['type'] = np.where(trades['direction'] == 1, "LONG", "SHORT")
+    trades['duration'] = trades['exit_step'] - trades['entry_step']
+    trades['gross_pnl'] = trades['direction'] * (trades['exit_price'] - trades['entry_price'])
+    trades['fee'] = EST_FEE_PER_TRADE # Entry fee
+    trades['net_pnl'] = trades['gross_pnl'] - EST_FEE_PER_TRADE * 2 # Entry + Exit fees
+    return trades
+
+def analyze_performance(history: dict, initial_balance=10000.0):
     """
     Reconstructs trades and prints a detailed forensic report.
     """
-    df = pd.DataFrame(history)
-    df['prev_action'] = df['action'].shift(1).fillna(0)
-    
-    # Detect Trade Changes
-    # A "Trade" happens when the Target Action changes (e.g., 0 -> 1, or 1 -> -1)
-    trades = []
-    current_trade = {}
-    
-    # Fee estimator (approximate based on env settings)
-    # We use a fixed proxy for the 'Asset Price' since we don't have it in history dict easily
-    # Ideally, you'd log 'price_a' in history too, but we can estimate.
-    est_fee_per_trade = 1.50 # $3000 * 0.05%
-    
-    for i, row in df.iterrows():
-        if i == 0: continue
-        
-        # If Action changed, we closed the old position and/or opened a new one
-        if row['action'] != row['prev_action']:
-            
-            # 1. Close Previous Trade (if we weren't flat)
-            if current_trade:
-                current_trade['exit_step'] = row['step']
-                current_trade['exit_price'] = row['price']
-                current_trade['duration'] = row['step'] - current_trade['entry_step']
-                
-                # Raw PnL = Position * (Exit - Entry)
-                price_delta = row['price'] - current_trade['entry_price']
-                gross_pnl = current_trade['direction'] * price_delta
-                
-                current_trade['gross_pnl'] = gross_pnl
-                current_trade['fee'] = est_fee_per_trade # Entry fee
-                current_trade['net_pnl'] = gross_pnl - (est_fee_per_trade * 2) # Entry + Exit fees
-                
-                trades.append(current_trade)
-                current_trade = {}
-            
-            # 2. Open New Trade (if target is not flat)
-            target = row['action']
-            direction = 0
-            if target == 1: direction = 1
-            if target == 2: direction = -1
-            
-            if direction != 0:
-                current_trade = {
-                    'entry_step': row['step'],
-                    'entry_price': row['price'],
-                    'direction': direction, # 1 or -1
-                    'type': "LONG" if direction == 1 else "SHORT"
-                }
+    trades = reconstruct_trades(history)
 
     # METRICS CALCULATION
     n_trades = len(trades)
-    final_balance = df['portfolio'].iloc[-1]
-    total_pnl = final_balance - env_instance.initial_balance
-    
+    final_balance = history['portfolio'][-1]
+    total_pnl = final_balance - initial_balance
+
     print("\n" + "="*40)
     print(f"       PERFORMANCE AUTOPSY")
     print("="*40)
-    print(f"Initial Balance:   ${env_instance.initial_balance:,.2f}")
+    print(f"Initial Balance:   ${initial_balance:,.2f}")
     print(f"Final Balance:     ${final_balance:,.2f}")
-    print(f"Total Net PnL:     ${total_pnl:,.2f}  ({(total_pnl/env_instance.initial_balance)*100:.2f}%)")
+    print(f"Total Net PnL:     ${total_pnl:,.2f}  ({(total_pnl/initial_balance)*100:.2f}%)")
     print(f"Total Trades:      {n_trades}")
-    
+
     if n_trades > 0:
         # Trade Stats
-        wins = [t for t in trades if t['net_pnl'] > 0]
-        losses = [t for t in trades if t['net_pnl'] <= 0]
+        wins = trades['net_pnl'][trades['net_pnl'] > 0]
+        losses = trades['net_pnl'][trades['net_pnl'] <= 0]
         win_rate = len(wins) / n_trades * 100
-        
-        avg_win = np.mean([t['net_pnl'] for t in wins]) if wins else 0
-        avg_loss = np.mean([t['net_pnl'] for t in losses]) if losses else 0
-        
-        fees_paid = n_trades * (est_fee_per_trade * 2)
-        
+
+        avg_win = wins.mean() if len(wins) else 0
+        avg_loss = losses.mean() if len(losses) else 0
+
+        fees_paid = n_trades * (EST_FEE_PER_TRADE * 2)
+
         print(f"-"*40)
         print(f"Win Rate:          {win_rate:.1f}%  ({len(wins)} W / {len(losses)} L)")
         print(f"Avg Win:           ${avg_win:.2f}")
         print(f"Avg Loss:          ${avg_loss:.2f}")
         print(f"Est Fees Paid:     ${fees_paid:.2f}")
         print(f"-"*40)
-        
+
         # Duration Stats
-        avg_duration = np.mean([t['duration'] for t in trades])
-        print(f"Avg Hold Time:     {avg_duration:.1f} seconds")
-        print(f"Longest Trade:     {max([t['duration'] for t in trades])} seconds")
-        
+        print(f"Avg Hold Time:     {trades['duration'].mean():.1f} seconds")
+        print(f"Longest Trade:     {trades['duration'].max()} seconds")
+
         # Drawdown
-        equity_curve = df['portfolio']
-        running_max = equity_curve.cummax()
-        drawdown = (equity_curve - running_max)
-        max_dd = drawdown.min()
+        equity_curve = history['portfolio']
+        max_dd = (equity_curve - np.maximum.accumulate(equity_curve)).min()
         print(f"Max Drawdown:      ${max_dd:.2f}")
-        
+
     else:
         print("\n[WARN] No trades were executed.")
         print("Possible causes:")
@@ -169,37 +213,134 @@ def analyze_performance(history, env_instance):
         print("3. Neural Net converged to 'Always Hold' -> Needs more training.")
 
     print("="*40 + "\n")
+    return trades
+
+# --- MULTI-CHECKPOINT COMPARISON ---
+
+@functools.lru_cache(maxsize=None)
+def _cached_policy(checkpoint, stats_path):
+    # Per worker process: each checkpoint is converted once, whatever the number of sessions
+    return load_policy(checkpoint, stats_path)
+
+def _evaluate_task(task) -> dict:
+    checkpoint, stats_path, session, skip_rows, initial_balance = task
+    started = time.perf_counter()
+
+    policy = _cached_policy(checkpoint, stats_path)
+    features = load_features(session, skip_rows, features=observation_specs(policy.obs_features or OBS_FEATURES))
+    history = rollout(policy, features, initial_balance)
+    metrics = compute_metrics(history['portfolio'], ACTION_TO_POSITION[history['action']], PERIODS_SECONDLY)
+
+    return {
+        'checkpoint': os.path.basename(checkpoint),
+        'session': os.path.basename(session),
+        'steps': metrics['n_steps'],
+        'total_pnl': metrics['total_pnl'],
+        'total_return': metrics['total_return'],
+        'sharpe': metrics['sharpe'],
+        'max_drawdown': metrics['max_drawdown'],
+        'n_trades': metrics['n_trades'],
+        'win_rate': metrics['win_rate'],
+        'profit_factor': metrics['profit_factor'],
+        'exposure': metrics['exposure'],
+        'seconds': time.perf_counter() - started,
+    }
+
+def discover_checkpoints(model_dir="models/") -> list:
+    """
+    Every SB3 checkpoint (.zip) in a folder, e.g. the saves of one training run.
+    """
+    return sorted(glob.glob(os.path.join(model_dir, "*.zip")))
+
+def evaluate_checkpoints(checkpoints, sessions, workers=None, skip_rows=100, initial_balance=10000.0):
+    """
+    Scores every checkpoint on every held-out session in parallel worker
+    processes and returns (per-run table, per-checkpoint comparison table).
+
+    The comparison is sorted best-first by mean Sharpe across sessions.
+    Both tables are empty when there are no checkpoints or no sessions.
+    """
+    checkpoints, sessions = list(checkpoints), list(sessions)
+    if not checkpoints or not sessions:
+        missing = "checkpoints (pass --models or train one into models/)" if not checkpoints else "sessions (pass --sessions)"
+        print(f"[EVAL] Nothing to evaluate: no {missing}.")
+        return pd.DataFrame(), pd.DataFrame()
+    tasks = [(checkpoint, find_stats(checkpoint), session, skip_rows, initial_balance)
+             for checkpoint in checkpoints for session in sessions]
+
+    # Build / load each session's feature cache once here, so workers only memory-map it
+    for session in sessions:
+        load_features(session, skip_rows)
+
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    print(f"[EVAL] {len(checkpoints)} checkpoints x {len(sessions)} sessions on {workers} workers...")
+
+    if workers > 1:
+        # chunksize=len(sessions): one worker handles all sessions of a checkpoint (one conversion)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_evaluate_task, tasks, chunksize=len(sessions)))
+    else:
+        rows = [_evaluate_task(task) for task in tasks]
+
+    runs = pd.DataFrame(rows)
+    comparison = runs.groupby('checkpoint').agg(
+        sessions=('session', 'count'),
+        total_pnl=('total_pnl', 'sum'),
+        mean_return=('total_return', 'mean'),
+        mean_sharpe=('sharpe', 'mean'),
+        worst_drawdown=('max_drawdown', 'min'),
+        n_trades=('n_trades', 'sum'),
+        win_rate=('win_rate', 'mean'),
+    ).sort_values('mean_sharpe', ascending=False)
+    return runs, comparison
 
 def plot_results(history):
-    # (Same visualization logic as before)
+    # Imported here: headless / parallel evaluation never pays for matplotlib
+    import matplotlib.pyplot as plt
+
     spread = np.array(history['price'])
     actions = np.array(history['action'])
     portfolio = np.array(history['portfolio'])
-    
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
-    
+
     ax1.plot(spread, label='Spread', color='gray', alpha=0.5)
-    
+
     # Map 0, 1, 2 actions to visual markers
     # We want to see where it was LONG (1) vs SHORT (2)
     # This is a 'State' plot, not just entry points
     is_long = (actions == 1)
     is_short = (actions == 2)
-    
+
     ax1.fill_between(range(len(spread)), spread, min(spread), where=is_long, color='green', alpha=0.1, label='Long Zone')
     ax1.fill_between(range(len(spread)), spread, min(spread), where=is_short, color='red', alpha=0.1, label='Short Zone')
-    
+
     ax1.set_title("Agent Behavior (Green=Long, Red=Short)")
     ax1.set_ylabel("Spread ($)")
     ax1.legend()
-    
+
     ax2.plot(portfolio, color='blue')
     ax2.set_title("Equity Curve")
     ax2.set_ylabel("Account Balance ($)")
-    
+
     plt.tight_layout()
     plt.savefig("evaluation_report.png")
     print("[EVAL] Visual saved to evaluation_report.png")
 
 if __name__ == "__main__":
-    evaluate_agent()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Evaluate PPO agents.")
+    parser.add_argument("--compare", action="store_true", help="Compare many checkpoints instead of the single report")
+    parser.add_argument("--models", nargs="*", help="Checkpoints (.zip or exported .npz); default: every .zip in models/")
+    parser.add_argument("--sessions", nargs="*", default=["data/raw/live_session.csv"], help="Held-out session CSVs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="Optional CSV path for the per-run table")
+    args = parser.parse_args()
+
+    if not args.compare:
+        evaluate_agent()
+    else:
+        runs, comparison = evaluate_checkpoints(args.models or discover_checkpoints(), args.sessions, args.workers)
+        print("\n" + comparison.to_string(float_format=lambda x: f"{x:,.4f}"))
+        if args.out:
+            runs.to_csv(args.out, index=False)
+            print(f"[EVAL] Per-run results saved to {args.out}")
@@ -0,0 +1,83 @@
+import os
+import argparse
+import pickle
+import numpy as np
+from stable_baselines3 import PPO
+
+from src.rl.gym_env import OBS_FEATURES
+
+def policy_arrays(model_path="models/ppo_stat_arb_v1", stats_path="models/vec_normalize.pkl",
+                  obs_features=OBS_FEATURES) -> dict:
+    """
+    Extracts the ACTOR of a trained PPO agent (policy MLP + action head) and its
+    VecNormalize observation stats as plain NumPy arrays.
+    The critic is not needed to choose actions, so it is dropped.
+    obs_features: the observation columns the agent was trained on (stored with it).
+    """
+    # 1. Load the brain on CPU
+    model = PPO.load(model_path, device='cpu')
+    policy = model.policy
+
+    activation = policy.activation_fn.__name__.lower()
+    if activation not in ('tanh', 'relu'):
+        raise ValueError(f"Unsupported activation for export: {policy.activation_fn.__name__}")
+
+    # 2. Collect the Linear layers of the actor (hidden layers, then the action head)
+    layers = [module for module in policy.mlp_extractor.policy_net if hasattr(module, 'weight')]
+    layers.append(policy.action_net)
+
+    arrays = {}
+    for i, layer in enumerate(layers):
+        # Stored as (in, out) so the forward pass is x @ W + b
+        arrays[f'W{i}'] = layer.weight.detach().cpu().numpy().T.astype(np.float32)
+        arrays[f'b{i}'] = layer.bias.detach().cpu().numpy().astype(np.float32)
+
+    # 3. Observation normalization (VecNormalize running stats)
+    n_obs = layers[0].in_features
+    if n_obs != len(obs_features):
+        raise ValueError(f"Agent observes {n_obs} values but obs_features lists {len(obs_features)}")
+    obs_mean, obs_var = np.zeros(n_obs), np.ones(n_obs)
+    clip_obs, epsilon, norm_obs = np.inf, 0.0, False
+    if stats_path:
+        # Unpickle directly: VecNormalize.load would demand a live env to wrap
+        with open(stats_path, "rb") as f:
+            vec_normalize = pickle.load(f)
+        norm_obs = bool(vec_normalize.norm_obs)
+        if norm_obs:
+            obs_mean, obs_var = vec_normalize.obs_rms.mean, vec_normalize.obs_rms.var
+            clip_obs, epsilon = vec_normalize.clip_obs, vec_normalize.epsilon
+
+    arrays.update(
+        n_layers=np.array(len(layers)),
+        activation=np.array(activation),
+        obs_mean=np.asarray(obs_mean, dtype=np.float64),
+        obs_std=np.sqrt(np.asarray(obs_var, dtype=np.float64) + epsilon),
+        clip_obs=np.array(float(clip_obs)),
+        norm_obs=np.array(norm_obs),
+        obs_features=np.array(list(obs_features)),
+    )
+    return arrays
+
+def export_policy(model_path="models/ppo_stat_arb_v1", stats_path="models/vec_normalize.pkl",
+                  out_path="models/ppo_stat_arb_v1_policy.npz", obs_features=OBS_FEATURES):
+    """
+    Converts a trained PPO agent + its VecNormalize stats into one small .npz
+    that NumpyPolicy (src/rl/policy.py) can run without torch or SB3.
+    """
+    arrays = policy_arrays(model_path, stats_path, obs_features)
+    np.savez(out_path, **arrays)
+
+    n_layers = int(arrays['n_layers'])
+    sizes = " -> ".join([str(arrays['W0'].shape[0])] + [str(arrays[f'W{i}'].shape[1]) for i in range(n_layers)])
+    print(f"[EXPORT] {model_path} ({sizes}, {arrays['activation']}) -> {out_path} "
+          f"({os.path.getsize(out_path) / 1024:.1f} KB)")
+    return out_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a PPO agent to a NumPy weight file.")
+    parser.add_argument("--model", default="models/ppo_stat_arb_v1")
+    parser.add_argument("--stats", default="models/vec_normalize.pkl")
+    parser.add_argument("--out", default="models/ppo_stat_arb_v1_policy.npz")
+    args = parser.parse_args()
+
+    export_policy(args.model, args.stats, args.out)
@@ -2,6 +2,76 @@ import gymnasium as gym
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
+from src.data_loader.feature_store import FeatureStore
+from src.processors.features import FeaturePipeline, spec_from_column
+
+# Bump when the cleaning / feature engineering below changes (invalidates the cache)
+FEATURE_VERSION = 1
+FEATURE_CACHE_DIR = "data/processed/feature_cache"
+
+# Column order of the observation vector (index 3 is filled with the live position)
+OBS_FEATURES = ['z_score', 'theta', 'volatility', 'position', 'hour_sin', 'hour_cos', 'day_sin', 'day_cos']
+
+# Registered features (src/processors/features.py) every session always gets
+BASE_FEATURES = ['z_score', 'spread', 'theta', 'volatility', 'hour_sin', 'hour_cos', 'day_sin', 'day_cos']
+
+def load_features(csv_path, skip_rows=100, cache_dir=FEATURE_CACHE_DIR, features=None):
+    """
+    Loads a recorded session, cleans it and engineers the time features.
+    Shared by every environment flavour so they all see identical data.
+
+    features: extra registered feature specs to backfill on top of the base
+    set, e.g. [('z_delta', {'lag': 30})]; each adds its column name
+    (here 'z_delta_30') to the result, ready to be used in an observation.
+
+    Results are cached on disk (memory-mapped .npy) keyed by the file's
+    fingerprint and the parameters; pass cache_dir=None to always rebuild.
+
+    Returns:
+        dict of np.ndarray: 'z_score', 'theta', 'volatility', 'spread',
+        'hour_sin', 'hour_cos', 'day_sin', 'day_cos', 'timestamp' (+ extras)
+    """
+    pipeline = FeaturePipeline(BASE_FEATURES + list(features or []))
+    if cache_dir is None:
+        return _build_features(csv_path, skip_rows, pipeline)
+
+    params = {'skip_rows': skip_rows, 'version': FEATURE_VERSION}
+    if features:
+        params['features'] = pipeline.spec  # The base set alone keeps the existing cache keys
+    return FeatureStore(cache_dir).get(csv_path, params, lambda: _build_features(csv_path, skip_rows, pipeline))
+
+def observation_specs(obs_features=OBS_FEATURES) -> list:
+    """
+    The extra feature specs load_features() needs to serve an observation layout
+    (e.g. a trained policy's obs_features): every column beyond the base set.
+    """
+    return [spec_from_column(name) for name in obs_features if name != 'position' and name not in BASE_FEATURES]
+
+def _build_features(csv_path, skip_rows, pipeline):
+    # --- LOAD DATA ---
+    raw_data = pd.read_csv(csv_path)
+    
+    # --- SANITIZATION (The Fix) ---
+    # 1. Replace "Infinite" values with NaN
+    raw_data.replace([np.inf, -np.inf], np.nan, inplace=True)
+    
+    # 2. Forward Fill (If a value is missing, use the previous second's value)
+    raw_data.ffill(inplace=True)
+    
+    # 3. Drop any remaining NaNs (e.g., if the very first row is bad)
+    raw_data.dropna(inplace=True)
+    
+    # 4. Clean Garbage (Warm-up Phase)
+    if len(raw_data) > skip_rows:
+        raw_data = raw_data.iloc[skip_rows:].reset_index(drop=True)
+        
+    # Safety Check: If data is empty after cleaning, stop immediately
+    if len(raw_data) < 10:
+        raise ValueError("Data is empty or too short after cleaning NaNs. Check your CSV!")
+
+    # --- FEATURE ENGINEERING (Vectorized, one pass of the pipeline) ---
+    data = {column: raw_data[column].values for column in raw_data.columns}
+    return {'timestamp': raw_data['timestamp'].values, **pipeline.batch(data)}
 
 class TradingEnv(gym.Env):
     """
@@ -9,7 +79,8 @@ class TradingEnv(gym.Env):
     Simulates a 'Game' where the agent trades the spread based on math features.
     """
     
-    def __init__(self, csv_path, initial_balance=10000.0, transaction_fee=0.0005, skip_rows=100):
+    def __init__(self, csv_path=None, initial_balance=10000.0, transaction_fee=0.0005, skip_rows=100,
+                 features=None, start_step=0, sampler=None, obs_features=OBS_FEATURES):
         super(TradingEnv, self).__init__()
         
         # --- 1. CONFIGURATION ---
@@ -18,51 +89,38 @@ class TradingEnv(gym.Env):
         #just for testing, set fee to 0
         self.fee = 0.00
         
-        # --- 2. LOAD DATA ---
-        self.raw_data = pd.read_csv(csv_path)
-        
-        # --- SANITIZATION (The Fix) ---
-        # 1. Replace "Infinite" values with NaN
-        self.raw_data.replace([np.inf, -np.inf], np.nan, inplace=True)
+        # --- 2. LOAD DATA + 3. FEATURE ENGINEERING ---
+        # Pre-built 'features' (e.g. attached from shared memory) skip the CSV entirely
+        if features is None:
+            features = load_features(csv_path, skip_rows)
         
-        # 2. Forward Fill (If a value is missing, use the previous second's value)
-        self.raw_data.ffill(inplace=True)
+        self.spreads = features['spread']
+        self.prices = features['spread']
         
-        # 3. Drop any remaining NaNs (e.g., if the very first row is bad)
-        self.raw_data.dropna(inplace=True)
-        
-        # 4. Clean Garbage (Warm-up Phase)
-        if len(self.raw_data) > skip_rows:
-            self.raw_data = self.raw_data.iloc[skip_rows:].reset_index(drop=True)
-            
-        # Safety Check: If data is empty after cleaning, stop immediately
-        if len(self.raw_data) < 10:
-            raise ValueError("Data is empty or too short after cleaning NaNs. Check your CSV!")
-
-        # --- 3. FEATURE ENGINEERING (Vectorized) ---
-        # (This part remains the same)
-        timestamps = pd.to_datetime(self.raw_data['timestamp'], unit='s', utc=True)
+        self.n_steps = len(self.prices)
         
-        self.hour_sin = np.sin(2 * np.pi * timestamps.dt.hour / 24.0).values
-        self.hour_cos = np.cos(2 * np.pi * timestamps.dt.hour / 24.0).values
-        self.day_sin = np.sin(2 * np.pi * timestamps.dt.dayofweek / 7.0).values
-        self.day_cos = np.cos(2 * np.pi * timestamps.dt.dayofweek / 7.0).values
+        # Observation columns: any loaded feature, plus 'position' (filled with the live inventory)
+        self.obs_features = list(obs_features)
+        self.position_col = self.obs_features.index('position')
+        self.feature_matrix = np.zeros((self.n_steps, len(self.obs_features)), dtype=np.float32)
+        for col, name in enumerate(self.obs_features):
+            if name != 'position':
+                self.feature_matrix[:, col] = features[name]
         
-        self.z_scores = self.raw_data['z_score'].values
-        self.spreads = self.raw_data['spread'].values
-        self.thetas = self.raw_data['theta'].values
-        self.vols = self.raw_data['volatility'].values
-        self.prices = self.raw_data['spread'].values
+        # Where each episode begins (lets parallel workers cover different parts of the data)
+        self.start_step = start_step
+        self.end_step = self.n_steps
         
-        self.n_steps = len(self.raw_data)
+        # Optional EpisodeSampler: every reset draws a fresh random window instead
+        self.sampler = sampler
         
         # --- 4. SPACES ---
         self.action_space = gym.spaces.Discrete(3)
         self.observation_space = gym.spaces.Box(
-            low=-np.inf, high=np.inf, shape=(8,), dtype=np.float32
+            low=-np.inf, high=np.inf, shape=(len(self.obs_features),), dtype=np.float32
         )
         
-        self.current_step = 0
+        self.current_step = self.start_step
         self.position = 0
         self.cash = self.initial_balance
         self.portfolio_value = self.initial_balance
@@ -71,7 +129,10 @@ class TradingEnv(gym.Env):
         super().reset(seed=seed)
         
         # Reset State
-        self.current_step = 0
+        self.current_step = self.start_step
+        if self.sampler is not None:
+            start, end = self.sampler.sample(self.np_random)
+            self.current_step, self.end_step = int(start), int(end)
         self.position = 0
         self.cash = self.initial_balance
         self.portfolio_value = self.initial_balance
@@ -106,7 +167,7 @@ class TradingEnv(gym.Env):
         
         # --- 2. ADVANCE TIME ---
         self.current_step += 1
-        terminated = (self.current_step >= self.n_steps - 1)
+        terminated = (self.current_step >= self.end_step - 1)
         
         if terminated:
             return self._get_observation(), 0, True, False, {}
@@ -131,18 +192,8 @@ class TradingEnv(gym.Env):
         """
         Constructs the observation vector efficiently using the pre-calculated arrays.
         """
-        # Look up values from Numpy arrays (Fast)
-        idx = self.current_step
-        
-        obs = np.array([
-            self.z_scores[idx],
-            self.thetas[idx],
-            self.vols[idx],
-            float(self.position), # Current inventory
-            self.hour_sin[idx],
-            self.hour_cos[idx],
-            self.day_sin[idx],
-            self.day_cos[idx]
-        ], dtype=np.float32)
+        # Look up the pre-stacked row (Fast), then add the current inventory
+        obs = self.feature_matrix[self.current_step].copy()
+        obs[self.position_col] = float(self.position)
         
         return obs
\ No newline at end of file
@@ -0,0 +1,182 @@
+import time
+import numpy as np
+from src.processors.features import FeaturePipeline, spec_from_column, hour_and_weekday
+
+# Action -> target position (same mapping as TradingEnv: 0 flat, 1 long, 2 short)
+ACTION_TO_POSITION = np.array([0.0, 1.0, -1.0])
+
+class NumpyPolicy:
+    """
+    Responsibility: Run the trained PPO actor in the live loop with NumPy only.
+    Loads the weight file written by src/rl/export_policy.py, applies the
+    VecNormalize observation scaling and the MLP forward pass, and picks the
+    deterministic (argmax) action, exactly like model.predict(deterministic=True).
+
+    No torch / SB3 import: the live process starts in milliseconds.
+    All intermediate arrays are preallocated, so a tick allocates nothing;
+    pass an (n_pairs, n_obs) matrix to decide for every pair in one call.
+    """
+    def __init__(self, weights: list, biases: list, obs_mean, obs_std, clip_obs=np.inf,
+                 activation='tanh', obs_features=None, max_batch=1):
+        self.weights = [np.ascontiguousarray(W, dtype=np.float32) for W in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.obs_mean = np.asarray(obs_mean, dtype=np.float64)
+        self.obs_std = np.asarray(obs_std, dtype=np.float64)
+        self.clip_obs = float(clip_obs)
+        self.activation = np.tanh if activation == 'tanh' else self._relu
+        self.obs_features = list(obs_features) if obs_features is not None else None
+
+        self.n_obs = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+        self._allocate(max_batch)
+
+    @classmethod
+    def load(cls, path="models/ppo_stat_arb_v1_policy.npz", max_batch=1):
+        with np.load(path) as data:
+            return cls.from_arrays(data, max_batch)
+
+    @classmethod
+    def from_arrays(cls, data, max_batch=1):
+        """
+        Builds the policy from the dict written by export_policy.policy_arrays().
+        """
+        n_layers = int(data['n_layers'])
+        return cls(
+            weights=[data[f'W{i}'] for i in range(n_layers)],
+            biases=[data[f'b{i}'] for i in range(n_layers)],
+            obs_mean=data['obs_mean'],
+            obs_std=data['obs_std'],
+            clip_obs=float(data['clip_obs']),
+            activation=str(data['activation']),
+            obs_features=data['obs_features'].tolist(),
+            max_batch=max_batch
+        )
+
+    @staticmethod
+    def _relu(x, out):
+        return np.maximum(x, 0.0, out=out)
+
+    def _allocate(self, batch):
+        # One buffer per stage of the forward pass, sized for 'batch' rows
+        self._batch = batch
+        self._norm = np.empty((batch, self.n_obs), dtype=np.float64)
+        self._x = np.empty((batch, self.n_obs), dtype=np.float32)
+        self._hidden = [np.empty((batch, W.shape[1]), dtype=np.float32) for W in self.weights]
+        self._actions = np.empty(batch, dtype=np.int64)
+
+    # --- INFERENCE ---
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Action logits for a raw (un-normalized) observation batch (n, n_obs).
+        The returned array is an internal buffer: copy it to keep it past the next call.
+        """
+        n = obs.shape[0]
+        if n > self._batch:
+            self._allocate(n)
+
+        # 1. Normalize (float64, like VecNormalize) then hand float32 to the network
+        norm = self._norm[:n]
+        np.subtract(obs, self.obs_mean, out=norm)
+        np.divide(norm, self.obs_std, out=norm)
+        np.clip(norm, -self.clip_obs, self.clip_obs, out=norm)
+        x = self._x[:n]
+        x[:] = norm
+
+        # 2. Forward pass: hidden layers with activation, linear action head
+        last = len(self.weights) - 1
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            out = self._hidden[i][:n]
+            np.matmul(x, W, out=out)
+            out += b
+            if i < last:
+                self.activation(out, out=out)
+            x = out
+        return x
+
+    def predict(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Deterministic actions (0 flat, 1 long, 2 short) for an observation batch.
+        A single (n_obs,) observation returns a plain int.
+        """
+        obs = np.asarray(obs)
+        if obs.ndim == 1:
+            return int(self.predict(obs[None, :])[0])
+
+        logits = self.logits(obs)
+        actions = self._actions[:obs.shape[0]]
+        np.argmax(logits, axis=1, out=actions)
+        return actions
+
+    def target_positions(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Same as predict() but mapped to target positions (0, +1, -1).
+        """
+        return ACTION_TO_POSITION[self.predict(np.atleast_2d(obs))]
+
+# --- LIVE OBSERVATIONS ---
+
+def time_features(timestamp: float):
+    """
+    (hour_sin, hour_cos, day_sin, day_cos) for a UNIX timestamp, computed
+    exactly like the training features (UTC hour of day, Monday = 0).
+    """
+    hour, weekday = hour_and_weekday(float(timestamp))
+    hour = 2 * np.pi * hour / 24.0
+    day = 2 * np.pi * weekday / 7.0
+    return np.sin(hour), np.cos(hour), np.sin(day), np.cos(day)
+
+def build_observations(z_score, theta, volatility, position, timestamp, out=None):
+    """
+    Fills an (n_pairs, 8) observation matrix in OBS_FEATURES order from the
+    live math state. Scalars or (n_pairs,) arrays are accepted; all pairs share
+    the tick's timestamp.
+    """
+    z_score = np.atleast_1d(z_score)
+    if out is None:
+        out = np.empty((len(z_score), 8), dtype=np.float32)
+
+    hour_sin, hour_cos, day_sin, day_cos = time_features(timestamp)
+    out[:, 0] = z_score
+    out[:, 1] = theta
+    out[:, 2] = volatility
+    out[:, 3] = position
+    out[:, 4] = hour_sin
+    out[:, 5] = hour_cos
+    out[:, 6] = day_sin
+    out[:, 7] = day_cos
+    return out
+
+class ObservationStream:
+    """
+    Responsibility: Live observation rows for ANY trained layout (the policy's
+    obs_features), streamed through the same registered features the training
+    data was backfilled with (src/processors/features.py).
+
+    update(row, position): row is one recorder-style dict ('timestamp', 'spread',
+    'z_score', ...) per tick; returns the (n_obs,) float32 observation in a
+    preallocated buffer (copy it to keep it).
+    """
+    def __init__(self, obs_features):
+        obs_features = list(obs_features)
+        self.position_col = obs_features.index('position')
+        self._cols = [col for col, name in enumerate(obs_features) if name != 'position']
+        self.stream = FeaturePipeline([spec_from_column(obs_features[col]) for col in self._cols]).stream()
+        self.out = np.zeros(len(obs_features), dtype=np.float32)
+
+    def update(self, row: dict, position: float) -> np.ndarray:
+        self.out[self._cols] = self.stream.update(row)
+        self.out[self.position_col] = position
+        return self.out
+
+if __name__ == "__main__":
+    # Quick latency check on the exported agent
+    policy = NumpyPolicy.load()
+    for batch in (1, 64):
+        obs = np.random.default_rng(0).normal(size=(batch, policy.n_obs)).astype(np.float32)
+        policy.predict(obs)
+        start = time.perf_counter()
+        for _ in range(10_000):
+            policy.predict(obs)
+        elapsed = (time.perf_counter() - start) / 10_000
+        print(f"[POLICY] batch={batch}: {elapsed * 1e6:.1f} us/call ({elapsed * 1e6 / batch:.2f} us/pair)")
@@ -0,0 +1,71 @@
+import functools
+from src.shared.shared_arrays import SharedArray
+from src.rl.gym_env import TradingEnv, load_features
+
+# Worker-side: attached blocks must outlive the envs that view them
+_ATTACHED = []
+
+class SharedFeatureSet:
+    """
+    Responsibility: One copy of the training data for ALL workers.
+    The parent loads and cleans a session once and copies every feature
+    array into shared memory. SubprocVecEnv workers attach by name and
+    build their TradingEnv on top of zero-copy, read-only views.
+    """
+    def __init__(self, arrays: dict, n_steps: int):
+        self.arrays = arrays  # name -> SharedArray
+        self.n_steps = n_steps
+
+    @classmethod
+    def create(cls, features: dict):
+        arrays = {name: SharedArray.create(values) for name, values in features.items()}
+        return cls(arrays, len(features['spread']))
+
+    @classmethod
+    def from_csv(cls, csv_path, skip_rows=100):
+        return cls.create(load_features(csv_path, skip_rows))
+
+    @property
+    def spec(self) -> dict:
+        """
+        Picklable handle (block names, shapes, dtypes) to ship to workers.
+        """
+        return {name: shared.spec for name, shared in self.arrays.items()}
+
+    @staticmethod
+    def attach(spec: dict) -> dict:
+        """
+        Worker side: map the blocks and return a features dict for TradingEnv.
+        """
+        features = {}
+        for name, array_spec in spec.items():
+            shared = SharedArray.attach(array_spec)
+            _ATTACHED.append(shared)
+            features[name] = shared.array
+        return features
+
+    def close(self):
+        for shared in self.arrays.values():
+            shared.close()
+        self.arrays = {}
+
+def _make_worker_env(spec, start_step, env_kwargs):
+    return TradingEnv(features=SharedFeatureSet.attach(spec), start_step=start_step, **env_kwargs)
+
+def make_env_fns(datasets, n_workers, **env_kwargs) -> list:
+    """
+    Env factories for SubprocVecEnv.
+    Workers are dealt round-robin across the datasets (sessions); workers that share
+    a dataset start at evenly spaced offsets so they don't replay the same ticks.
+    """
+    if isinstance(datasets, SharedFeatureSet):
+        datasets = [datasets]
+
+    env_fns = []
+    for rank in range(n_workers):
+        dataset = datasets[rank % len(datasets)]
+        sharing = len(range(rank % len(datasets), n_workers, len(datasets)))
+        slot = rank // len(datasets)
+        start_step = slot * (dataset.n_steps - 1) // sharing
+        env_fns.append(functools.partial(_make_worker_env, dataset.spec, start_step, env_kwargs))
+    return env_fns
@@ -2,13 +2,39 @@ import os
 import sys
 import gymnasium as gym
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecNormalize
 from stable_baselines3.common.callbacks import EvalCallback
 
 # Ensure we can find the src folder
 sys.path.append(os.getcwd())
 
-from src.rl.gym_env import TradingEnv
+from src.rl.vec_env import BatchedTradingEnv
+from src.rl.shared_dataset import SharedFeatureSet, make_env_fns
+from src.rl.episode_sampler import SessionCatalog, EpisodeSampler
+from src.rl.export_policy import export_policy
+
+# Default PPO hyperparameters (the search in src/rl/tune.py varies these)
+PPO_PARAMS = {
+    'learning_rate': 0.0003,
+    'n_steps': 2048,  # Update the brain every 2048 ticks (summed over all envs)
+    'batch_size': 64, # Train on chunks of 64 ticks
+    'gamma': 0.99,    # Discount factor (Future rewards are slightly less valuable)
+}
+
+def build_model(env, params=None, **kwargs) -> PPO:
+    """
+    The agent definition shared by train_agent() and the hyperparameter search.
+    params: overrides of PPO_PARAMS (n_steps is the total across env.num_envs).
+    """
+    params = {**PPO_PARAMS, **(params or {})}
+    n_steps = max(params.pop('n_steps') // env.num_envs, 1)
+    return PPO(
+        "MlpPolicy",        # Standard Multi-Layer Perceptron (Simple Neural Net)
+        env,
+        n_steps=n_steps,
+        **params,
+        **kwargs
+    )
 
 def train_agent():
     # 1. Configuration
@@ -16,14 +42,30 @@ def train_agent():
     LOG_DIR = "logs/"
     MODEL_DIR = "models/"
     TIMESTEPS = 100_000 # How many "seconds" of trading to simulate
+    N_ENVS = 8          # Parallel episodes stepped together in one NumPy call
+    N_WORKERS = 0       # >0: one process per worker (multi-core), data shared via shared memory
+    TRAIN_FILES = [TRAIN_FILE] # Catalog of sessions / pairs used when EPISODE_LENGTH is set
+    EPISODE_LENGTH = None      # e.g. 2048: random fixed-length windows instead of whole-session episodes
     
     os.makedirs(LOG_DIR, exist_ok=True)
     os.makedirs(MODEL_DIR, exist_ok=True)
     
     # 2. Setup the Environment
-    # We wrap it in a 'DummyVecEnv' because SB3 expects vectorized environments
-    # (This allows running 4 simulations in parallel on 4 CPU cores later if we want)
-    env = DummyVecEnv([lambda: TradingEnv(TRAIN_FILE, skip_rows=100)])
+    shared_data = None
+    if N_WORKERS > 0:
+        # Multi-core: the CSV is parsed ONCE here, workers attach to the arrays zero-copy
+        # and each starts at a different offset of the session.
+        shared_data = SharedFeatureSet.from_csv(TRAIN_FILE, skip_rows=100)
+        env = SubprocVecEnv(make_env_fns(shared_data, N_WORKERS))
+    elif EPISODE_LENGTH:
+        # Random windows across every session in the catalog (O(1) resets, no reloads)
+        catalog = SessionCatalog(TRAIN_FILES, skip_rows=100)
+        env = BatchedTradingEnv(features=catalog.features, num_envs=N_ENVS,
+                                sampler=EpisodeSampler(catalog, EPISODE_LENGTH))
+    else:
+        # A natively vectorized env: N episodes (staggered through the session)
+        # advance together with array ops instead of N Python step() calls.
+        env = BatchedTradingEnv(TRAIN_FILE, num_envs=N_ENVS, skip_rows=100, stagger=True)
     
     # 3. Normalize Rewards
     # CRITICAL: This fixes the "Balance didn't change" issue.
@@ -32,16 +74,7 @@ def train_agent():
     env = VecNormalize(env, norm_obs=True, norm_reward=True, clip_obs=10.)
     
     # 4. Define the Agent (PPO)
-    model = PPO(
-        "MlpPolicy",        # Standard Multi-Layer Perceptron (Simple Neural Net)
-        env, 
-        verbose=1,
-        learning_rate=0.0003,
-        n_steps=2048,       # Update the brain every 2048 ticks
-        batch_size=64,      # Train on chunks of 64 ticks
-        gamma=0.99,         # Discount factor (Future rewards are slightly less valuable)
-        tensorboard_log=LOG_DIR
-    )
+    model = build_model(env, verbose=1, tensorboard_log=LOG_DIR)
     
     print(f"[TRAIN] Starting PPO training on {TRAIN_FILE}...")
     print(f"[TRAIN] Target Steps: {TIMESTEPS}")
@@ -62,6 +95,15 @@ def train_agent():
     
     print(f"[TRAIN] Model saved to {model_path}.zip")
     print(f"[TRAIN] Normalizer saved to {MODEL_DIR}vec_normalize.pkl")
+
+    # Torch-free copy of the actor for the live loop (see src/rl/policy.py)
+    export_policy(model_path, os.path.join(MODEL_DIR, "vec_normalize.pkl"),
+                  os.path.join(MODEL_DIR, "ppo_stat_arb_v1_policy.npz"))
+    
+    # 7. Release workers + shared memory
+    env.close()
+    if shared_data is not None:
+        shared_data.close()
     print("Done.")
 
 if __name__ == "__main__":
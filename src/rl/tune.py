@@ -0,0 +1,186 @@
+import os
+import json
+import math
+import time
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from src.rl.gym_env import load_features, observation_specs, OBS_FEATURES
+from src.rl.policy import NumpyPolicy, ACTION_TO_POSITION
+from src.backtester.performance import compute_metrics, PERIODS_SECONDLY
+
+# What the search draws from (anything PPO() accepts; n_steps is the total across envs)
+SEARCH_SPACE = {
+    'learning_rate': [1e-4, 3e-4, 1e-3],
+    'n_steps': [512, 1024, 2048],
+    'batch_size': [64, 128, 256],
+    'gamma': [0.95, 0.99, 0.995],
+    'ent_coef': [0.0, 0.01],
+}
+
+def sample_trials(space=SEARCH_SPACE, n_trials=9, seed=0) -> list:
+    """
+    n_trials distinct configurations drawn at random from the grid 'space'
+    (the whole grid if it is smaller).
+    """
+    names = sorted(space)
+    grid = list(itertools.product(*(space[name] for name in names)))
+    rng = np.random.default_rng(seed)
+    picks = rng.permutation(len(grid))[:n_trials]
+    return [{name: grid[i][k] for k, name in enumerate(names)} for i in picks]
+
+# --- ONE RUNG OF ONE TRIAL (worker process) ---
+
+def _score(policy_path, sessions, skip_rows, initial_balance) -> dict:
+    # Held-out score with the torch-free evaluator (same numbers as evaluate.py --compare)
+    from src.rl.evaluate import rollout
+
+    policy = NumpyPolicy.load(policy_path, max_batch=65_536)
+    runs = []
+    for session in sessions:
+        features = load_features(session, skip_rows, features=observation_specs(policy.obs_features or OBS_FEATURES))
+        history = rollout(policy, features, initial_balance)
+        runs.append(compute_metrics(history['portfolio'], ACTION_TO_POSITION[history['action']], PERIODS_SECONDLY))
+    return {
+        'sharpe': float(np.mean([run['sharpe'] for run in runs])),
+        'total_pnl': float(np.sum([run['total_pnl'] for run in runs])),
+        'max_drawdown': float(np.min([run['max_drawdown'] for run in runs])),
+        'n_trades': int(np.sum([run['n_trades'] for run in runs])),
+    }
+
+def _run_rung(task) -> dict:
+    """
+    Trains one trial up to 'budget' timesteps (resuming its previous rung from
+    disk), exports and scores it. Everything the trial produces stays in its folder.
+    """
+    trial_id, params, trial_dir, budget, train_file, sessions, n_envs, skip_rows, seed = task
+    started = time.perf_counter()
+
+    # Heavy imports live in the workers only; one torch thread each (the pool is the parallelism)
+    import torch
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import VecNormalize
+    from src.rl.vec_env import BatchedTradingEnv
+    from src.rl.train import build_model
+    from src.rl.export_policy import export_policy
+    torch.set_num_threads(1)
+
+    model_path = os.path.join(trial_dir, "model")
+    stats_path = os.path.join(trial_dir, "vec_normalize.pkl")
+    policy_path = os.path.join(trial_dir, "policy.npz")
+
+    # Features come from the shared on-disk cache: memory-mapped, one copy for all workers
+    env = BatchedTradingEnv(features=load_features(train_file, skip_rows), num_envs=n_envs, stagger=True, seed=seed)
+    if os.path.exists(model_path + ".zip"):
+        env = VecNormalize.load(stats_path, env)
+        model = PPO.load(model_path, env=env)
+    else:
+        os.makedirs(trial_dir, exist_ok=True)
+        env = VecNormalize(env, norm_obs=True, norm_reward=True, clip_obs=10.)
+        model = build_model(env, params, seed=seed, verbose=0)
+
+    # PPO stops at the first update past the budget, so a trial with a large n_steps
+    # may already be there: it is just scored again
+    if model.num_timesteps < budget:
+        model.learn(total_timesteps=budget - model.num_timesteps, reset_num_timesteps=False)
+        model.save(model_path)
+        env.save(stats_path)
+        export_policy(model_path, stats_path, policy_path)
+    env.close()
+
+    return {'trial': trial_id, 'steps': model.num_timesteps, **_score(policy_path, sessions, skip_rows, 10000.0),
+            'seconds': time.perf_counter() - started, **params}
+
+# --- THE SCHEDULER ---
+
+def successive_halving(trials, train_file, sessions, out_dir="logs/tune", min_steps=10_000, max_steps=100_000,
+                       eta=3, workers=None, n_envs=8, skip_rows=100, metric='sharpe', seed=0):
+    """
+    Successive halving over 'trials' (list of param dicts):
+    every surviving trial trains to the rung budget (min_steps, x eta, ... up to
+    max_steps) in parallel, is scored on the held-out 'sessions', and only the
+    best 1/eta go on to the next rung. Most of the compute goes to the few
+    configurations that keep winning instead of being spread evenly.
+
+    Every rung of every trial is appended to out_dir/results.csv; each trial
+    keeps its model, normalizer and exported policy in out_dir/trial_NNN/
+    (an existing trial folder is resumed: use a fresh out_dir per study).
+    Returns: (all results, final leaderboard)
+    """
+    # Scoring on the training data would rank trials by how well they memorized it
+    held_in = [path for path in sessions if os.path.abspath(path) == os.path.abspath(train_file)]
+    if held_in or not sessions:
+        raise ValueError(f"Held-out sessions must be given and differ from the training file {train_file}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    results_path = os.path.join(out_dir, "results.csv")
+    with open(os.path.join(out_dir, "trials.json"), "w") as f:
+        json.dump({f"trial_{i:03d}": params for i, params in enumerate(trials)}, f, indent=2)
+
+    # Build the feature caches once here, so workers only memory-map them
+    for path in [train_file, *sessions]:
+        load_features(path, skip_rows)
+
+    alive = list(range(len(trials)))
+    budget, rung = min_steps, 0
+    rows = []
+    while alive:
+        budget = min(budget, max_steps)
+        tasks = [(f"trial_{i:03d}", trials[i], os.path.join(out_dir, f"trial_{i:03d}"), budget,
+                  train_file, list(sessions), n_envs, skip_rows, seed + i) for i in alive]
+        n_workers = workers or min(len(tasks), os.cpu_count() or 1)
+        print(f"[TUNE] Rung {rung}: {len(tasks)} trials x {budget:,} steps on {n_workers} workers...")
+
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(_run_rung, tasks))
+        else:
+            results = [_run_rung(task) for task in tasks]
+
+        # 1. Record
+        for result in results:
+            result['rung'] = rung
+        rows.extend(results)
+        pd.DataFrame(rows).to_csv(results_path, index=False)
+
+        # 2. Promote the best 1/eta (a NaN score, e.g. no trades, ranks last)
+        ranked = sorted(zip(alive, results), key=lambda item: _rank_key(item[1][metric]), reverse=True)
+        for trial, result in ranked:
+            print(f"[TUNE]   {result['trial']}: {metric} {result[metric]:.4f} | PnL ${result['total_pnl']:,.2f} "
+                  f"| {result['n_trades']} trades | {result['seconds']:.0f}s")
+        if budget >= max_steps or len(alive) == 1:
+            break
+        alive = [trial for trial, _ in ranked[:max(1, math.ceil(len(alive) / eta))]]
+        budget, rung = budget * eta, rung + 1
+
+    runs = pd.DataFrame(rows)
+    # Last rung per trial, taken as a row (groupby().last() would fill a NaN score from an earlier rung)
+    leaderboard = (runs.sort_values('rung', kind='stable').groupby('trial').tail(1).set_index('trial')
+                   .sort_values(['rung', metric], ascending=False, key=lambda col: col.fillna(-np.inf)))
+    leaderboard.to_csv(os.path.join(out_dir, "leaderboard.csv"))
+    best = leaderboard.index[0]
+    print(f"[TUNE] Best: {best} ({metric} {leaderboard.iloc[0][metric]:.4f}) -> {os.path.join(out_dir, best)}")
+    return runs, leaderboard
+
+def _rank_key(value):
+    return -np.inf if value is None or np.isnan(value) else value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel PPO hyperparameter search (successive halving).")
+    parser.add_argument("--train", default="data/raw/live_session.csv")
+    parser.add_argument("--sessions", nargs="+", required=True, help="Held-out session CSVs (not the --train file)")
+    parser.add_argument("--trials", type=int, default=9)
+    parser.add_argument("--min-steps", type=int, default=10_000, help="Budget of the first rung")
+    parser.add_argument("--max-steps", type=int, default=100_000, help="Budget of the last rung")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the trials per rung")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="logs/tune")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trials = sample_trials(SEARCH_SPACE, args.trials, args.seed)
+    successive_halving(trials, args.train, args.sessions, args.out, args.min_steps, args.max_steps,
+                       args.eta, args.workers, seed=args.seed)
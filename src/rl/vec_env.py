@@ -0,0 +1,163 @@
+import numpy as np
+import gymnasium as gym
+from stable_baselines3.common.vec_env import VecEnv
+
+from src.rl.gym_env import load_features, OBS_FEATURES
+
+class BatchedTradingEnv(VecEnv):
+    """
+    N copies of TradingEnv stepped together with array ops.
+    Same data, same rules, same rewards as TradingEnv, but positions, cash,
+    portfolio values and time offsets live in (N,) arrays and one step()
+    is a handful of NumPy calls regardless of N.
+
+    Drop-in for DummyVecEnv([lambda: TradingEnv(...)] * N), including
+    VecNormalize wrapping and SB3's auto-reset / 'terminal_observation' contract.
+
+    Episode starts:
+        stagger=False -> every env starts at step 0 (identical to TradingEnv)
+        stagger=True  -> env i starts at i/N of the way through the data,
+                         so the batch covers the whole session at once; every
+                         later restart draws a fresh uniform start, so no env
+                         keeps replaying the same tail of the session
+        sampler       -> every (re)set draws a random fixed-length window
+                         (see EpisodeSampler), overriding stagger
+    """
+    def __init__(self, csv_path=None, num_envs=8, initial_balance=10000.0, transaction_fee=0.0,
+                 skip_rows=100, stagger=False, features=None, sampler=None, seed=None, obs_features=OBS_FEATURES):
+        # --- 1. DATA ---
+        # Pre-stack the static columns into one (n_steps, n_obs) float32 matrix so an
+        # observation batch is a single row gather. The 'position' column is patched per step.
+        features = features if features is not None else load_features(csv_path, skip_rows)
+        self.prices = np.asarray(features['spread'], dtype=float)
+        self.n_steps = len(self.prices)
+        self.obs_features = list(obs_features)
+        self.position_col = self.obs_features.index('position')
+        self.feature_matrix = np.zeros((self.n_steps, len(self.obs_features)), dtype=np.float32)
+        for col, name in enumerate(self.obs_features):
+            if name != 'position':
+                self.feature_matrix[:, col] = features[name]
+
+        self.initial_balance = initial_balance
+        self.fee = transaction_fee  # Default 0 mirrors TradingEnv's testing override
+        self.render_mode = None
+
+        super().__init__(
+            num_envs,
+            gym.spaces.Box(low=-np.inf, high=np.inf, shape=(len(self.obs_features),), dtype=np.float32),
+            gym.spaces.Discrete(3)
+        )
+
+        # --- 2. STATE (one slot per episode) ---
+        stride = (self.n_steps - 1) // num_envs if stagger else 0
+        self.start_steps = np.arange(num_envs) * stride
+        self.current_step = self.start_steps.copy()
+        self.end_steps = np.full(num_envs, self.n_steps)
+        self.stagger = stagger
+        self.sampler = sampler
+        self._rng = np.random.default_rng(seed)
+        self.position = np.zeros(num_envs)
+        self.cash = np.full(num_envs, initial_balance)
+        self.portfolio_value = np.full(num_envs, initial_balance)
+
+        # Action -> target position lookup (0: flat, 1: long, 2: short)
+        self._action_map = np.array([0.0, 1.0, -1.0])
+
+        # --- 3. PREALLOCATED BUFFERS ---
+        # Two observation buffers, alternated each step: SB3 keeps a reference to the
+        # previous observation until after the next step, so one buffer would be overwritten.
+        self._obs = [np.empty((num_envs, len(self.obs_features)), dtype=np.float32) for _ in range(2)]
+        self._obs_idx = 0
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._actions = None
+
+    # --- VecEnv API ---
+
+    def reset(self):
+        self.current_step[:] = self.start_steps
+        if self.sampler is not None:
+            self.current_step[:], self.end_steps[:] = self.sampler.sample(self._rng, self.num_envs)
+        self.position[:] = 0.0
+        self.cash[:] = self.initial_balance
+        self.portfolio_value[:] = self.initial_balance
+        return self._observe()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(-1)
+
+    def step_wait(self):
+        prev_portfolio_value = self.portfolio_value.copy()
+        current_price = self.prices[self.current_step]
+
+        # --- 1. EXECUTE ACTION ---
+        target_position = self._action_map[self._actions]
+        traded = target_position != self.position
+        self.cash -= traded * np.abs(current_price) * self.fee
+        self.position[:] = target_position
+
+        # --- 2. ADVANCE TIME ---
+        self.current_step += 1
+        dones = self.current_step >= self.end_steps - 1
+
+        # --- 3. CALCULATE REWARD (Mark to Market) ---
+        new_price = self.prices[self.current_step]
+        live = ~dones
+        self.portfolio_value[live] = self.cash[live] + self.position[live] * new_price[live]
+        np.subtract(self.portfolio_value, prev_portfolio_value, out=self._rewards, casting='unsafe')
+        self._rewards[dones] = 0.0
+
+        obs = self._observe()
+        infos = [{} for _ in range(self.num_envs)]
+
+        # --- 4. AUTO-RESET finished episodes (SB3 convention) ---
+        if dones.any():
+            finished = np.flatnonzero(dones)
+            for i in finished:
+                infos[i]['terminal_observation'] = obs[i].copy()
+            if self.sampler is not None:
+                self.current_step[finished], self.end_steps[finished] = self.sampler.sample(self._rng, len(finished))
+            elif self.stagger:
+                self.current_step[finished] = self._rng.integers(0, self.n_steps - 1, size=len(finished))
+            else:
+                self.current_step[finished] = self.start_steps[finished]
+            self.position[finished] = 0.0
+            self.cash[finished] = self.initial_balance
+            self.portfolio_value[finished] = self.initial_balance
+            obs[finished] = self.feature_matrix[self.current_step[finished]]
+            obs[finished, self.position_col] = 0.0
+
+        return obs, self._rewards.copy(), dones, infos
+
+    def _observe(self):
+        self._obs_idx ^= 1
+        obs = self._obs[self._obs_idx]
+        np.take(self.feature_matrix, self.current_step, axis=0, out=obs)
+        obs[:, self.position_col] = self.position
+        return obs
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        self._rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+    def _get_indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
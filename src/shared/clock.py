@@ -0,0 +1,49 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+class RealClock:
+    """
+    The wall clock. Default for live sessions.
+    """
+
+    def now(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+class VirtualClock:
+    """
+    A clock driven by the DATA instead of the wall.
+    The replay source calls advance_to(timestamp) on every tick; any task
+    sleeping on this clock wakes up as soon as market time passes its deadline.
+    This lets 'every 1 second' consumers run at 100x (or unthrottled) speed.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._waiters = []  # Heap of (deadline, seq, future)
+        self._seq = itertools.count()
+
+    def now(self) -> float:
+        return self._now
+
+    async def sleep(self, seconds: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._now + seconds, next(self._seq), future))
+        await future
+
+    def advance_to(self, timestamp: float):
+        """
+        Moves market time forward and wakes every sleeper whose deadline has passed.
+        """
+        if timestamp < self._now:
+            return  # Time never flows backwards
+        self._now = timestamp
+
+        while self._waiters and self._waiters[0][0] <= timestamp:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
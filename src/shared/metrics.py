@@ -0,0 +1,193 @@
+import asyncio
+import bisect
+
+# Default latency buckets (seconds): 50us .. 5s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Counter:
+    """
+    Monotonic total (ticks, seconds of work). Rates come from the scraper: rate(x[1m]).
+    """
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name, self.help = name, help_text
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def samples(self):
+        yield self.name, self.value
+
+class Gauge:
+    """
+    Point-in-time value. Either set() by the owner or computed at scrape time by 'fn'.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn=None):
+        self.name, self.help = name, help_text
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        yield self.name, self.fn() if self.fn else self.value
+
+class Histogram:
+    """
+    Latency distribution with fixed buckets: observe() is one binary search + two adds.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot: above the top bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound:g}"}}', cumulative
+        yield f'{self.name}_bucket{{le="+Inf"}}', self.count
+        yield f"{self.name}_sum", self.sum
+        yield f"{self.name}_count", self.count
+
+class MetricsRegistry:
+    """
+    Responsibility: Hold every metric of the process and render them in the
+    Prometheus text exposition format.
+    Metrics are plain Python objects updated in place, so instrumenting a hot
+    path costs an attribute add (no locks: everything runs on one event loop).
+    """
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        # Same name twice returns the existing metric (safe on module re-import)
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, fn=None) -> Gauge:
+        gauge = self._register(Gauge(name, help_text))
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {float(value):.10g}")
+        return "\n".join(lines) + "\n"
+
+# The process-wide registry every component reports into
+REGISTRY = MetricsRegistry()
+
+# --- PIPELINE METRICS ---
+TICKS_INGESTED = REGISTRY.counter("statarb_ticks_ingested_total", "Price updates written to the Blackboard by the stream")
+BOOK_RESYNCS = REGISTRY.counter("statarb_book_resyncs_total", "Order book snapshot reloads after a depth sequence gap")
+TICKS_PROCESSED = REGISTRY.counter("statarb_ticks_processed_total", "Ticks run through the math engine")
+MATH_BUSY = REGISTRY.counter("statarb_math_busy_seconds_total", "Time the math engine spent computing (rate = utilization)")
+LOCK_WAIT = REGISTRY.histogram("statarb_blackboard_lock_wait_seconds", "Time spent waiting for the Blackboard lock")
+RECORDER_FLUSH = REGISTRY.histogram("statarb_recorder_flush_seconds", "Time to append one row to the session CSV")
+LOOP_LAG = REGISTRY.histogram("statarb_event_loop_lag_seconds", "Extra delay of a timer on the event loop")
+LOOP_LAG_LAST = REGISTRY.gauge("statarb_event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+
+def _pending_tasks():
+    try:
+        return len(asyncio.all_tasks())
+    except RuntimeError:  # Scraped outside a running loop
+        return 0
+
+PENDING_TASKS = REGISTRY.gauge("statarb_asyncio_pending_tasks", "Unfinished asyncio tasks", fn=_pending_tasks)
+
+# --- EXPORTERS ---
+
+async def monitor_event_loop_lag(interval=0.25):
+    """
+    Schedules a timer every 'interval' and records how late it fires.
+    A loop that is falling behind (blocking math, too many pairs) shows up
+    here long before ticks visibly pile up.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - expected, 0.0)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_LAST.set(lag)
+
+class MetricsServer:
+    """
+    Responsibility: Serve REGISTRY on http://host:port/metrics for Prometheus.
+    A minimal HTTP/1.0 responder on the same event loop: no threads, no extra
+    dependency. Bind to localhost unless the scraper runs elsewhere.
+    """
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host="127.0.0.1", port=9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"[METRICS] Serving http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            # Drain the headers (we don't need them)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(f"HTTP/1.0 {status}\r\n"
+                         f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+async def serve_metrics(port=9100, host="127.0.0.1", lag_interval=0.25):
+    """
+    One-liner for entry points: start the endpoint and the loop-lag probe,
+    then run until cancelled.
+    """
+    server = MetricsServer(REGISTRY, host, port)
+    await server.start()
+    try:
+        await monitor_event_loop_lag(lag_interval)
+    finally:
+        await server.close()
@@ -0,0 +1,49 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+class SharedArray:
+    """
+    A NumPy array living in shared memory.
+    The parent process creates it once; worker processes attach to it by name
+    (zero-copy), so N workers do not hold N copies of the same data.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, shape, dtype, owner: bool):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, data: np.ndarray):
+        """
+        Parent side: allocate a block and copy the data in.
+        """
+        data = np.ascontiguousarray(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        shared = cls(shm, data.shape, data.dtype, owner=True)
+        shared.array[...] = data
+        return shared
+
+    @classmethod
+    def attach(cls, spec: dict):
+        """
+        Worker side: map an existing block (read-only by convention).
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        shared = cls(shm, spec['shape'], spec['dtype'], owner=False)
+        shared.array.flags.writeable = False
+        return shared
+
+    @property
+    def spec(self) -> dict:
+        """
+        Small picklable handle to send to workers instead of the data itself.
+        """
+        return {'name': self.shm.name, 'shape': self.shape, 'dtype': self.dtype.str}
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -1,6 +1,10 @@
 import asyncio
+import time
+from collections import deque
 from dataclasses import dataclass
 import copy
+from src.shared.clock import RealClock
+from src.shared.metrics import LOCK_WAIT
 
 @dataclass
 class MarketData:
@@ -11,11 +15,26 @@ class MarketData:
     timestamp: float = 0.0
     symbol_a: str = ""  # e.g. "BTCUSDT"
     symbol_b: str = ""  # e.g. "ETHUSDT"
-    
+    version: int = 0    # Bumped on every write (snapshots can be ordered / deduplicated)
+
     # Raw Inputs (The Sensors)
     price_a: float = 0.0
     price_b: float = 0.0
-    
+
+    # Top of Book (order-book ingestion only; price_a / price_b are then the mid or microprice)
+    bid_a: float = 0.0
+    ask_a: float = 0.0
+    bid_size_a: float = 0.0
+    ask_size_a: float = 0.0
+    mid_a: float = 0.0
+    microprice_a: float = 0.0
+    bid_b: float = 0.0
+    ask_b: float = 0.0
+    bid_size_b: float = 0.0
+    ask_size_b: float = 0.0
+    mid_b: float = 0.0
+    microprice_b: float = 0.0
+
     # Derived State
     beta: float = 0.0
     theta: float = 0.0
@@ -23,28 +42,182 @@ class MarketData:
     spread: float = 0.0
     z_score: float = 0.0
 
+    # Relationship Health (the cointegration monitor; trusted until its first verdict)
+    tradeable: bool = True
+    adf_stat: float = 0.0
+    coint_pvalue: float = 0.0
+    half_life: float = 0.0   # Seconds
+
+# Topics a subscriber can listen to
+TOPIC_PRICES = "prices"  # update_prices / update_book (the stream)
+TOPIC_MATH = "math"      # update_math (the math engine)
+TOPIC_COINT = "coint"    # update_cointegration (the cointegration monitor)
+
+class Subscription:
+    """
+    Responsibility: One consumer's private channel out of the Blackboard.
+    The Blackboard pushes snapshots in without ever waiting, so a slow
+    subscriber can only fall behind itself, never stall the others.
+
+    Modes:
+        'all'      -> every snapshot, in order, through a bounded queue
+                      (when full, the OLDEST is dropped and counted in 'dropped')
+        'latest'   -> only the newest snapshot (older unread ones are replaced)
+        'throttle' -> like 'latest', but delivered at most once per 'interval'
+                      seconds of the given clock (wall time or replay time)
+
+    Snapshots are shared between subscribers: treat them as read-only.
+    """
+    def __init__(self, blackboard, mode='latest', maxsize=1024, interval=1.0, topics=None, clock=None):
+        if mode not in ('all', 'latest', 'throttle'):
+            raise ValueError(f"Unknown subscription mode: {mode}")
+        self.blackboard = blackboard
+        self.mode = mode
+        self.interval = interval
+        self.topics = set(topics) if topics else None
+        self.clock = clock or RealClock()
+
+        self._queue = deque(maxlen=maxsize if mode == 'all' else 1)
+        self._ready = asyncio.Event()
+        self._next_due = float('-inf')
+        self.closed = False
+
+        # Counters
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def _push(self, snapshot: MarketData):
+        # Called by the Blackboard: never blocks, never awaits
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(snapshot)
+        self.received += 1
+        self._ready.set()
+
+    async def get(self) -> MarketData:
+        """
+        Waits for the next snapshot (per the mode) and returns it.
+        """
+        # 1. Wait for data
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+
+        # 2. Throttle: hold until the next slot, then hand over whatever is newest by then
+        if self.mode == 'throttle':
+            delay = self._next_due - self.clock.now()
+            if delay > 0:
+                await self.clock.sleep(delay)
+            self._next_due = self.clock.now() + self.interval
+
+        snapshot = self._queue.popleft()
+        self.delivered += 1
+        return snapshot
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.blackboard.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MarketData:
+        return await self.get()
+
 class Blackboard:
     """
     The Bridge. Thread-safe memory.
+    Consumers either read on demand (get_state) or subscribe() to be pushed
+    a versioned snapshot after every write, instead of polling on a timer.
     """
     def __init__(self):
         self._market = MarketData()
         self._lock = asyncio.Lock()
+        self._subscribers = []
 
     async def update_prices(self, price_a: float, price_b: float, timestamp: float):
+        start = time.perf_counter()
+        async with self._lock:
+            LOCK_WAIT.observe(time.perf_counter() - start)
+            self._market.price_a = price_a
+            self._market.price_b = price_b
+            self._market.timestamp = timestamp
+            self._market.version += 1
+            self._publish(TOPIC_PRICES)
+
+    async def update_book(self, price_a: float, price_b: float, timestamp: float, **book):
+        """
+        update_prices plus the top-of-book fields (bid_a, ask_size_b, mid_a, microprice_b, ...).
+        """
+        start = time.perf_counter()
         async with self._lock:
+            LOCK_WAIT.observe(time.perf_counter() - start)
             self._market.price_a = price_a
             self._market.price_b = price_b
             self._market.timestamp = timestamp
+            for name, value in book.items():
+                setattr(self._market, name, value)
+            self._market.version += 1
+            self._publish(TOPIC_PRICES)
 
     async def update_math(self, beta, theta, vol, spread, z_score):
+        start = time.perf_counter()
         async with self._lock:
+            LOCK_WAIT.observe(time.perf_counter() - start)
             self._market.beta = beta
             self._market.theta = theta
             self._market.volatility = vol
             self._market.spread = spread
             self._market.z_score = z_score
+            self._market.version += 1
+            self._publish(TOPIC_MATH)
+
+    async def update_cointegration(self, tradeable, adf_stat, p_value, half_life):
+        start = time.perf_counter()
+        async with self._lock:
+            LOCK_WAIT.observe(time.perf_counter() - start)
+            self._market.tradeable = tradeable
+            self._market.adf_stat = adf_stat
+            self._market.coint_pvalue = p_value
+            self._market.half_life = half_life
+            self._market.version += 1
+            self._publish(TOPIC_COINT)
 
     async def get_state(self) -> MarketData:
+        start = time.perf_counter()
         async with self._lock:
-            return copy.deepcopy(self._market)
\ No newline at end of file
+            LOCK_WAIT.observe(time.perf_counter() - start)
+            # Every field is an immutable scalar: a shallow copy is a full snapshot
+            return copy.copy(self._market)
+
+    # --- PUB/SUB ---
+
+    def subscribe(self, mode='latest', maxsize=1024, interval=1.0, topics=None, clock=None) -> Subscription:
+        """
+        Registers a consumer. See Subscription for the modes.
+        topics: iterable of TOPIC_PRICES / TOPIC_MATH / TOPIC_COINT (default: every write).
+        """
+        subscription = Subscription(self, mode, maxsize, interval, topics, clock)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def _publish(self, topic: str):
+        # One snapshot per write, shared by every interested subscriber (built only if needed)
+        snapshot = None
+        for subscription in self._subscribers:
+            if subscription.wants(topic):
+                if snapshot is None:
+                    snapshot = copy.copy(self._market)
+                subscription._push(snapshot)
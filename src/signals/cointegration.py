@@ -1,4 +1,6 @@
-import statsmodels.api as sm
+import itertools
+import math
+import numpy as np
 import pandas as pd
 
 class CointegrationTests:
@@ -6,17 +8,110 @@ class CointegrationTests:
     Responsibility: Research & Calibration.
     Finds the Hedge Ratio (Beta) and checks if the pair is actually mean-reverting.
     """
-    
+
     def calculate_hedge_ratio(self, series_a: pd.Series, series_b: pd.Series):
         """
         Calculates how many units of B needed to hedge 1 unit of A.
         Uses Ordinary Least Squares (OLS).
         Formula: Price_A = Beta * Price_B + Epsilon
         """
-        # Add a constant (intercept) to the independent variable (Asset B)
-        X = sm.add_constant(series_b)
-        model = sm.OLS(series_a, X).fit()
-        
-        # The slope coefficient is our hedge ratio
-        beta = model.params.iloc[1] 
-        return beta
\ No newline at end of file
+        # OLS slope with an intercept, in closed form (no statsmodels import for one number)
+        a = np.asarray(series_a, dtype=float)
+        b = np.asarray(series_b, dtype=float)
+        b_centered = b - b.mean()
+        beta = np.dot(b_centered, a - a.mean()) / np.dot(b_centered, b_centered)
+        return float(beta)
+
+    def engle_granger(self, series_a: pd.Series, series_b: pd.Series) -> dict:
+        """
+        Engle-Granger test: is the spread A - Beta * B stationary?
+        Returns: {'beta', 'p_value', 'half_life'} (half-life in bars, inf if not mean-reverting)
+        """
+        # Heavy import, only paid by research runs that actually test pairs
+        from statsmodels.tsa.stattools import coint
+
+        beta = self.calculate_hedge_ratio(series_a, series_b)
+        _, p_value, _ = coint(series_a, series_b)
+
+        # Half-life from the AR(1) fit of the spread: x_t - x_{t-1} = lambda * x_{t-1} + c
+        spread = np.asarray(series_a, dtype=float) - beta * np.asarray(series_b, dtype=float)
+        lagged = spread[:-1] - spread[:-1].mean()
+        lam = np.dot(lagged, np.diff(spread)) / np.dot(lagged, lagged)
+        half_life = -np.log(2) / lam if lam < 0 else np.inf
+
+        return {'beta': beta, 'p_value': float(p_value), 'half_life': float(half_life)}
+
+    def scan(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Tests every pair of columns of an aligned price matrix.
+        Returns: one row per pair, most cointegrated (lowest p-value) first.
+        """
+        rows = []
+        for asset_a, asset_b in itertools.combinations(prices.columns, 2):
+            both = prices[[asset_a, asset_b]].dropna()
+            rows.append({'asset_a': asset_a, 'asset_b': asset_b, 'bars': len(both),
+                         **self.engle_granger(both[asset_a], both[asset_b])})
+        return pd.DataFrame(rows).sort_values('p_value').reset_index(drop=True)
+
+# --- FAST ENGLE-GRANGER (NumPy only, for the live monitor) ---
+
+# MacKinnon (1994/2010) tables for 2 series with a constant (what statsmodels' coint() uses)
+_TAU_MAX, _TAU_MIN, _TAU_STAR = 0.92, -18.86, -2.62
+_TAU_SMALLP = (2.92, 1.5012, 0.039796)
+_TAU_LARGEP = (2.1945, 0.64695, -0.29198, -0.042377)
+_CRIT_5PCT = (-3.33613, -6.1101, -6.823)  # c0 + c1 / T + c2 / T^2
+
+def mackinnon_pvalue(adf_stat: float) -> float:
+    """
+    Approximate p-value of an Engle-Granger ADF statistic (2 series, constant).
+    """
+    if adf_stat > _TAU_MAX:
+        return 1.0
+    if adf_stat < _TAU_MIN:
+        return 0.0
+    coefs = _TAU_SMALLP if adf_stat <= _TAU_STAR else _TAU_LARGEP
+    x = sum(c * adf_stat ** k for k, c in enumerate(coefs))
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+def engle_granger_fast(price_a, price_b, lags=1) -> dict:
+    """
+    Engle-Granger test with a FIXED lag order in closed-form NumPy:
+    hedge ratio by OLS, then an ADF regression (no constant) on the residual
+    spread, as statsmodels' coint(maxlag=lags, autolag=None) does, without
+    importing statsmodels. Cheap enough to rerun every minute on hours of data.
+
+    Returns: {'beta', 'adf_stat', 'p_value', 'critical_5pct', 'half_life'}
+    (half-life in samples, inf if the spread doesn't mean-revert)
+    """
+    a = np.asarray(price_a, dtype=float)
+    b = np.asarray(price_b, dtype=float)
+
+    # 1. Hedge ratio (OLS with intercept) and the residual spread
+    b_centered = b - b.mean()
+    beta = np.dot(b_centered, a - a.mean()) / np.dot(b_centered, b_centered)
+    spread = (a - a.mean()) - beta * b_centered
+
+    # 2. ADF regression: d_spread[t] = gamma * spread[t-1] + sum(phi_i * d_spread[t-i])
+    diff = np.diff(spread)
+    y = diff[lags:]
+    X = np.empty((len(y), lags + 1))
+    X[:, 0] = spread[lags:-1]
+    for i in range(1, lags + 1):
+        X[:, i] = diff[lags - i:-i]
+
+    coef, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    resid = y - X @ coef
+    dof = len(y) - X.shape[1]
+    sigma2 = np.dot(resid, resid) / dof
+    cov = sigma2 * np.linalg.inv(X.T @ X)
+    gamma = coef[0]
+    adf_stat = float(gamma / np.sqrt(cov[0, 0]))
+
+    # 3. Half-life of the spread's AR(1) part: rho = 1 + gamma
+    rho = 1.0 + gamma
+    half_life = -math.log(2) / math.log(rho) if 0.0 < rho < 1.0 else math.inf
+
+    n = len(y)
+    critical = _CRIT_5PCT[0] + _CRIT_5PCT[1] / n + _CRIT_5PCT[2] / n ** 2
+    return {'beta': float(beta), 'adf_stat': adf_stat, 'p_value': mackinnon_pvalue(adf_stat),
+            'critical_5pct': critical, 'half_life': half_life}
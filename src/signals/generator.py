@@ -19,37 +19,42 @@ class SignalGenerator:
         - Long the Spread if Z < -2.0 (Expect reversion up)
         - Exit if Z crosses 0.0
         """
-        signals = pd.Series(index=z_scores.index, data=0)
-        position = 0 # 0: Flat, 1: Long, -1: Short
-        
-        # Iterate through time (We do this loop to maintain 'State')
-        # Note: Vectorizing this is harder because position depends on previous state
-        for i in range(len(z_scores)):
-            z = z_scores.iloc[i]
-            
-            # Check if Z is NaN (first 30 days)
-            if np.isnan(z): 
-                continue
-
-            # State Machine Logic
-            if position == 0:
-                # ENTRY LOGIC
-                if z > self.entry:
-                    position = -1 # Sell Spread
-                elif z < -self.entry:
-                    position = 1  # Buy Spread
-            
-            elif position == 1:
-                # EXIT LOGIC FOR LONG
-                if z >= -self.exit:
-                    position = 0
-            
-            elif position == -1:
-                # EXIT LOGIC FOR SHORT
-                if z <= self.exit:
-                    position = 0
-            
-            signals.iloc[i] = position
-            
-        return signals
-    
\ No newline at end of file
+        z = z_scores.to_numpy(dtype=float)
+        n = len(z)
+        positions = np.zeros(n, dtype=int)
+
+        # Pre-compute WHERE each transition could fire (NaN never fires)
+        with np.errstate(invalid='ignore'):
+            entries = np.flatnonzero((z > self.entry) | (z < -self.entry))
+            long_exits = np.flatnonzero(z >= -self.exit)
+            short_exits = np.flatnonzero(z <= self.exit)
+
+        # State Machine Logic
+        # Instead of visiting every bar, we jump from event to event:
+        # Flat -> next entry -> next matching exit -> Flat -> ...
+        # (Python work scales with the number of TRADES, not the number of bars)
+        t = 0
+        while True:
+            k = np.searchsorted(entries, t)
+            if k == len(entries):
+                break
+            i = entries[k]
+
+            # ENTRY LOGIC
+            if z[i] > self.entry:
+                side, exits = -1, short_exits  # Sell Spread
+            else:
+                side, exits = 1, long_exits    # Buy Spread
+
+            # EXIT LOGIC (checked from the bar after entry)
+            j = np.searchsorted(exits, i + 1)
+            end = exits[j] if j < len(exits) else n
+            positions[i:end] = side
+
+            # The exit bar itself is flat; entries are checked from the next bar
+            t = end + 1
+
+        # Bars with no Z-Score (first 30 days) carry no signal
+        positions[np.isnan(z)] = 0
+
+        return pd.Series(index=z_scores.index, data=positions)
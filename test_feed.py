@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import os
 import sys
@@ -5,9 +6,12 @@ import sys
 # Ensure python can find your src modules
 sys.path.append(os.getcwd())
 
-from src.shared.state import Blackboard
+import config
+from src.shared.state import Blackboard, TOPIC_MATH
 from src.data_loader.stream import BinanceStream
 from src.processors.math_engine import run_math_engine
+from src.processors.coint_monitor import CointegrationMonitor
+from src.shared.metrics import serve_metrics
 
 async def monitor_loop(blackboard: Blackboard):
     """
@@ -17,12 +21,8 @@ async def monitor_loop(blackboard: Blackboard):
     """
     print("[SYSTEM] Monitor started. Waiting for data...")
     
-    while True:
-        # Cadence: Update screen every 0.5s
-        await asyncio.sleep(0.5)
-        
-        # Get the latest "Truth"
-        state = await blackboard.get_state()
+    # Cadence: Pushed at most every 0.5s, and only when there is something new
+    async for state in blackboard.subscribe(mode='throttle', interval=0.5, topics=(TOPIC_MATH,)):
         
         # Only print if we actually have data
         if state.price_a == 0:
@@ -47,10 +47,13 @@ async def monitor_loop(blackboard: Blackboard):
         
         [SIGNAL]
         Z-SCORE:      {state.z_score:.4f}
+        
+        [HEALTH]
+        Tradeable:    {state.tradeable} (p={state.coint_pvalue:.4f}, half-life {state.half_life:.0f}s)
         ---------------------
         """)
 
-async def main():
+async def main(metrics_port=None):
     # 1. Init Shared Resources
     bb = Blackboard()
     update_event = asyncio.Event() # The "Bell"
@@ -69,11 +72,26 @@ async def main():
     # Task C: Monitor (Terminal Output)
     task_monitor = asyncio.create_task(monitor_loop(bb))
     
+    # Task D: Cointegration Monitor (Background Tests -> 'tradeable')
+    coint_monitor = CointegrationMonitor(bb, window=config.COINT_WINDOW, interval=config.COINT_INTERVAL,
+                                         p_threshold=config.COINT_P_THRESHOLD,
+                                         max_half_life=config.COINT_MAX_HALF_LIFE)
+    task_coint = asyncio.create_task(coint_monitor.run())
+    tasks = [task_stream, task_math, task_monitor, task_coint]
+    
+    # Task E (optional): Prometheus endpoint
+    if metrics_port is not None:
+        tasks.append(asyncio.create_task(serve_metrics(metrics_port)))
+    
     # 4. Keep them running forever
-    await asyncio.gather(task_stream, task_math, task_monitor)
+    await asyncio.gather(*tasks)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live feed + math engine dashboard.")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve metrics on localhost:PORT/metrics")
+    args = parser.parse_args()
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.metrics_port))
     except KeyboardInterrupt:
         print("\n[SYSTEM] Shutting down...")
\ No newline at end of file
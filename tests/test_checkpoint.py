@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.processors.checkpoint import MathCheckpoint, input_mode, mark_recording, recording_applies
+from src.processors.math_engine import PairModel
+
+def trained_model(n_ticks=50):
+    model = PairModel(window_size=20)
+    rng = np.random.default_rng(0)
+    prices_b = 100 + np.cumsum(rng.normal(0, 0.1, n_ticks))
+    for price_b in prices_b:
+        model.update(2 * price_b + rng.normal(0, 0.05), price_b)
+    return model
+
+def test_restores_only_the_same_input_mode(tmp_path):
+    path = str(tmp_path / "math.npz")
+    saved = trained_model()
+    MathCheckpoint(path, symbols=("ethusdt", "btcusdt"), mode=input_mode(bars=("time", 60))).save(saved, 123.0)
+
+    for mode in ("trades", input_mode(bars=("time", 30)), input_mode(bars=("volume", 60)),
+                 input_mode(book="depth", book_price="mid")):
+        model = PairModel(window_size=20)
+        assert MathCheckpoint(path, symbols=("ETHUSDT", "BTCUSDT"), mode=mode).load(model) is None
+        assert len(model.stats.history) == 0
+
+    model = PairModel(window_size=20)
+    assert MathCheckpoint(path, symbols=("ethusdt", "btcusdt"), mode="bars:time:60").load(model) == 123.0
+    np.testing.assert_array_equal(model.kalman.state, saved.kalman.state)
+    assert list(model.stats.history) == list(saved.stats.history)
+
+def test_book_mode_key_ignores_the_feed():
+    assert input_mode(book="depth", book_price="microprice") == input_mode(book="ticker", book_price="microprice")
+    assert input_mode(book="depth", book_price="mid") != input_mode(book="depth", book_price="microprice")
+
+def test_recording_warm_start_follows_the_mode(tmp_path):
+    csv_path = str(tmp_path / "live_session.csv")
+    book = input_mode(book="depth", book_price="microprice")
+
+    # Unmarked recordings predate the other modes
+    assert recording_applies(csv_path, "trades")
+    assert not recording_applies(csv_path, book)
+
+    mark_recording(csv_path, book)
+    assert recording_applies(csv_path, book)
+    assert not recording_applies(csv_path, "trades")
+
+    # Bars are never rebuilt from the once-per-second samples
+    mark_recording(csv_path, "bars:time:60")
+    assert not recording_applies(csv_path, "bars:time:60")
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from src.data_loader.synthetic import SyntheticMarket
+from src.signals.cointegration import engle_granger_fast, mackinnon_pvalue
+
+statsmodels = pytest.importorskip("statsmodels")
+
+def test_mackinnon_pvalue_matches_statsmodels():
+    from statsmodels.tsa.adfvalues import mackinnonp
+
+    for adf_stat in np.linspace(-20.0, 2.0, 221):
+        assert mackinnon_pvalue(adf_stat) == pytest.approx(mackinnonp(adf_stat, regression='c', N=2), abs=1e-12)
+
+@pytest.mark.parametrize("lags", [1, 3])
+@pytest.mark.parametrize("theta", [0.01, 0.0005])
+def test_engle_granger_fast_matches_coint(lags, theta):
+    from statsmodels.tsa.stattools import coint
+
+    df = SyntheticMarket(seed=1, theta=theta).pair(3000)
+    fast = engle_granger_fast(df['price_a'], df['price_b'], lags)
+    adf_stat, p_value, critical = coint(df['price_a'], df['price_b'], trend='c', maxlag=lags, autolag=None)
+
+    assert fast['adf_stat'] == pytest.approx(adf_stat, rel=1e-8)
+    assert fast['p_value'] == pytest.approx(p_value, rel=1e-6, abs=1e-12)
+    assert fast['critical_5pct'] == pytest.approx(critical[1], abs=1e-4)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_allclose
+
+from src.backtester.engine import BacktestEngine
+from src.execution.fees import BpsFee, CompositeFee, FixedFee, NoFee
+from src.execution.slippage import CompositeSlippage, NoSlippage, SpreadSlippage, VolatilitySlippage
+
+BETA = 2.0
+
+def trade_sequence() -> pd.DataFrame:
+    """
+    4 bars: long, hold, flip short (2 units), flat.
+    spread = A - 2 * B = [10, 12, 9, 13], notional = A + 2 * B = [210, 212, 213, 213].
+    """
+    df = pd.DataFrame({'asset_a': [110.0, 112.0, 111.0, 113.0], 'asset_b': [50.0, 50.0, 51.0, 50.0],
+                       'signal': [1, 1, -1, 0]})
+    df['spread'] = df['asset_a'] - BETA * df['asset_b']
+    return df
+
+def test_fee_models():
+    trades = np.array([1.0, 0.0, -2.0, 1.0])
+    prices = np.array([10.0, 12.0, 9.0, 13.0])
+    notional = np.array([210.0, 212.0, 213.0, 213.0])
+
+    assert_allclose(NoFee().compute(trades, prices), [0, 0, 0, 0])
+    # 10 bps of the notional, or of |price| when no notional is given
+    assert_allclose(BpsFee(10).compute(trades, prices, notional), [0.21, 0.0, 0.426, 0.213])
+    assert_allclose(BpsFee(10).compute(trades, prices), [0.01, 0.0, 0.018, 0.013])
+    assert_allclose(FixedFee(1.5).compute(trades, prices), [1.5, 0.0, 1.5, 1.5])
+    assert_allclose(CompositeFee(BpsFee(10), FixedFee(1.5)).compute(trades, prices, notional),
+                    [1.71, 0.0, 1.926, 1.713])
+
+def test_slippage_models():
+    trades = np.array([1.0, 0.0, -2.0, 1.0])
+    prices = np.array([10.0, 12.0, 9.0, 13.0])
+    notional = np.array([210.0, 212.0, 213.0, 213.0])
+
+    assert_allclose(NoSlippage().compute(trades, prices), [0, 0, 0, 0])
+    # Half of a 2 bps spread
+    assert_allclose(SpreadSlippage(2).compute(trades, prices, notional=notional), [0.021, 0.0, 0.0426, 0.0213])
+    # Rolling std of price changes [0, 2, -3, 4] over 2 steps: [0, 1, 2.5, 3.5]
+    assert_allclose(VolatilitySlippage(k=0.1, window=2).compute(trades, prices), [0.0, 0.0, 0.5, 0.35])
+    assert_allclose(VolatilitySlippage(k=0.1).compute(trades, prices, volatility=np.array([1.0, 1.0, 2.0, np.nan])),
+                    [0.1, 0.0, 0.4, 0.0])
+    assert_allclose(CompositeSlippage(SpreadSlippage(2), VolatilitySlippage(k=0.1, window=2)).compute(
+        trades, prices, notional=notional), [0.021, 0.0, 0.5426, 0.3713])
+
+def test_backtest_charges_costs_on_leg_notional():
+    engine = BacktestEngine(initial_cash=10_000.0, fee_model=BpsFee(10), slippage_model=SpreadSlippage(2),
+                            verbose=False)
+    results = engine.run_backtest(trade_sequence(), BETA)
+
+    assert_allclose(results['position'], [1, 1, -1, 0])
+    assert_allclose(results['trade'], [1, 0, -2, 1])
+    assert_allclose(results['cost'], [0.231, 0.0, 0.4686, 0.2343])
+    # cash = 10000 - cumsum(trade * spread + cost); equity = cash + position * spread
+    assert_allclose(results['portfolio_value'], [9999.769, 10001.769, 9998.3004, 9994.0661])
+    assert engine.cash == pytest.approx(9994.0661)
+    assert engine.position == 0
+
+def test_backtest_without_beta_charges_on_spread():
+    engine = BacktestEngine(fee_model=BpsFee(10), verbose=False)
+    results = engine.run_backtest(trade_sequence())
+    assert_allclose(results['cost'], [0.01, 0.0, 0.018, 0.013])
+
+def test_backtest_empty_frame():
+    empty = trade_sequence().iloc[:0]
+    engine = BacktestEngine(initial_cash=500.0, fee_model=BpsFee(10),
+                            slippage_model=CompositeSlippage(SpreadSlippage(2), VolatilitySlippage()), verbose=False)
+    results = engine.run_backtest(empty, BETA)
+
+    assert len(results) == 0
+    assert {'position', 'trade', 'cost', 'portfolio_value'} <= set(results.columns)
+    assert engine.cash == 500.0 and engine.position == 0
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from src.data_loader.aligner import DataAligner
+
+def mismatched_series():
+    # A trades on days 0-4, B starts later and skips day 4; indexes arrive unsorted
+    days = pd.date_range("2024-01-01", periods=6, freq="D")
+    a = pd.Series([14.0, 10.0, 11.0, 12.0, 13.0], index=days[[4, 0, 1, 2, 3]])
+    b = pd.Series([20.0, 21.0, 23.0, 25.0], index=days[[1, 2, 4, 5]])
+    return days, a, b
+
+def test_align_forward_fills_the_union_of_timestamps():
+    days, a, b = mismatched_series()
+    df = DataAligner().align_series(a, b)
+
+    # Day 0 has no B yet (dropped); day 3 reuses B's last price; day 5 reuses A's
+    assert list(df.index) == list(days[1:])
+    assert df.index.is_monotonic_increasing
+    np.testing.assert_array_equal(df['asset_a'], [11.0, 12.0, 13.0, 14.0, 14.0])
+    np.testing.assert_array_equal(df['asset_b'], [20.0, 21.0, 21.0, 23.0, 25.0])
+
+def test_align_without_fill_keeps_only_common_timestamps():
+    days, a, b = mismatched_series()
+    df = DataAligner().align_series(a, b, method=None)
+
+    assert list(df.index) == list(days[[1, 2, 4]])
+    np.testing.assert_array_equal(df['asset_a'], [11.0, 12.0, 14.0])
+
+def test_spread_uses_the_hedge_ratio():
+    days, a, b = mismatched_series()
+    df = DataAligner().calculate_spread(DataAligner().align_series(a, b), hedge_ratio=0.5)
+    np.testing.assert_allclose(df['spread'], df['asset_a'] - 0.5 * df['asset_b'])
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.data_loader.synthetic import SyntheticMarket
+from src.processors.features import FEATURES, FeaturePipeline
+
+SPECS = [*sorted(FEATURES), ('z_delta', {'lag': 5}), ('spread_ewm_z', {'span': 20}), ('spread_change_vol', {'window': 10})]
+
+def session_data(n_ticks=2000):
+    df = SyntheticMarket(seed=3, regime_length=500).session(n_ticks, window=100)
+    return {column: df[column].to_numpy(dtype=float) for column in df.columns}
+
+def stream_values(pipeline: FeaturePipeline, data: dict) -> np.ndarray:
+    stream = pipeline.stream()
+    n = len(data['timestamp'])
+    out = np.empty((n, len(pipeline.columns)))
+    for i in range(n):
+        out[i] = stream.update({column: values[i] for column, values in data.items()})
+    return out
+
+def test_batch_matches_stream():
+    data = session_data()
+    pipeline = FeaturePipeline(SPECS)
+
+    batch = pipeline.batch(data)
+    streamed = stream_values(pipeline, data)
+
+    for i, column in enumerate(pipeline.columns):
+        np.testing.assert_allclose(streamed[:, i], batch[column], rtol=1e-7, atol=1e-9, err_msg=column)
+
+def test_stream_reset_starts_a_new_session():
+    data = session_data(300)
+    pipeline = FeaturePipeline(SPECS)
+    stream = pipeline.stream()
+
+    first = stream_values(pipeline, data)
+    for i in range(len(data['timestamp'])):
+        stream.update({column: values[i] for column, values in data.items()})
+    stream.reset()
+    second = np.array([stream.update({column: values[i] for column, values in data.items()}).copy()
+                       for i in range(len(data['timestamp']))])
+
+    np.testing.assert_array_equal(first, second)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.data_loader.order_book import BookSide
+
+def reference_levels(book: dict, side: str) -> np.ndarray:
+    """
+    The same side kept as a plain {price: size} dict, best level first.
+    """
+    prices = sorted(book, reverse=(side == 'bid'))
+    return np.array([[price, book[price]] for price in prices]).reshape(-1, 2)
+
+def random_update(rng, book: dict, n_levels: int):
+    """
+    A Binance-style diff: new levels, changed sizes and removals (size 0).
+    """
+    existing = list(book)
+    prices = rng.integers(9000, 11000, size=n_levels).astype(float)
+    if existing:
+        # Touch levels already in the book too (size changes and deletions)
+        touched = rng.choice(existing, size=min(n_levels, len(existing)), replace=False)
+        prices = np.concatenate((prices, touched))
+    prices = np.unique(prices)
+    sizes = np.where(rng.random(len(prices)) < 0.3, 0.0, rng.integers(1, 100, len(prices)).astype(float))
+    return prices, sizes
+
+def test_apply_matches_dict_reference():
+    rng = np.random.default_rng(0)
+    for side in ('bid', 'ask'):
+        book_side = BookSide(side, capacity=5000)
+        reference = {}
+
+        prices, sizes = random_update(rng, reference, 200)
+        book_side.load(prices, sizes)
+        reference = {p: s for p, s in zip(prices.tolist(), sizes.tolist()) if s > 0}
+
+        for _ in range(300):
+            prices, sizes = random_update(rng, reference, int(rng.integers(0, 20)))
+            book_side.apply(prices, sizes)
+            for price, size in zip(prices.tolist(), sizes.tolist()):
+                if size > 0:
+                    reference[price] = size
+                else:
+                    reference.pop(price, None)
+
+            assert book_side.count == len(reference)
+            np.testing.assert_array_equal(book_side.levels(depth=book_side.count), reference_levels(reference, side))
+
+def test_best_level_and_empty_side():
+    asks = BookSide('ask')
+    assert asks.best() is None
+
+    asks.apply(np.array([101.0, 100.5, 102.0]), np.array([1.0, 2.0, 3.0]))
+    assert asks.best() == (100.5, 2.0)
+
+    asks.apply(np.array([100.5]), np.array([0.0]))
+    assert asks.best() == (101.0, 1.0)
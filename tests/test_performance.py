@@ -0,0 +1,28 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from src.backtester.performance import OnlineMetrics, compute_metrics, PERIODS_HOURLY
+
+def synthetic_run(n=2000, seed=5):
+    """
+    A noisy equity curve and a position series that enters, flips and exits.
+    """
+    rng = np.random.default_rng(seed)
+    equity = 10_000.0 * np.cumprod(1.0 + rng.normal(2e-4, 5e-3, n))
+    positions = np.repeat(rng.choice([-1, 0, 0, 1], size=n // 20), 20).astype(float)
+    return equity, positions
+
+def test_online_metrics_match_batch():
+    equity, positions = synthetic_run()
+
+    online = OnlineMetrics(periods_per_year=PERIODS_HOURLY)
+    for value, position in zip(equity.tolist(), positions.tolist()):
+        online.update(value, position)
+    streamed = online.summary()
+    batch = compute_metrics(equity, positions, periods_per_year=PERIODS_HOURLY)
+
+    assert streamed['n_trades'] > 10
+    for key in ('sharpe', 'max_drawdown', 'n_trades', 'win_rate'):
+        assert_allclose(streamed[key], batch[key], rtol=1e-9, err_msg=key)
+    for key, value in batch.items():
+        assert_allclose(streamed[key], value, rtol=1e-9, atol=1e-12, err_msg=key)
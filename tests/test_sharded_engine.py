@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.processors.math_engine import PairModel
+from src.processors.sharded_engine import ShardedEngine, _Shard, assign_pairs
+
+PAIR_IDS = [f"PAIR_{i}" for i in range(200)]
+
+def make_pairs(n):
+    return [{'id': f"P{i}", 'symbol_a': f"a{i}usdt", 'symbol_b': f"b{i}usdt"} for i in range(n)]
+
+def make_ticks(pairs, n_rounds, seed=0):
+    rng = np.random.default_rng(seed)
+    ticks = []
+    for r in range(n_rounds):
+        for pair in pairs:
+            for symbol, base in ((pair['symbol_a'], 3000.0), (pair['symbol_b'], 60000.0)):
+                ticks.append((symbol, base * (1.0 + 0.01 * rng.standard_normal()), 1000.0 + r))
+    return ticks
+
+def reference_rows(pair, ticks, collapse=()):
+    """
+    What one model that saw every tick of the pair computes (coalesce=False).
+    Ticks whose index is in 'collapse' only move the prices: a single update
+    follows the last of them (what a coalescing shard does with a backlog).
+    """
+    model, prices, rows = PairModel(), {}, []
+    collapse = list(collapse)
+    for i, (symbol, price, timestamp) in enumerate(ticks):
+        if symbol not in (pair['symbol_a'], pair['symbol_b']):
+            continue
+        prices[symbol] = (price, timestamp)
+        if i in collapse and i != collapse[-1]:
+            continue
+        if len(prices) == 2:
+            a, b = prices[pair['symbol_a']], prices[pair['symbol_b']]
+            rows.append((pair['id'], max(a[1], b[1]), a[0], b[0], *model.update(a[0], b[0])))
+    return rows
+
+# --- ASSIGNMENT (rendezvous hashing) ---
+
+def test_assignment_is_stable_and_in_range():
+    first = assign_pairs(PAIR_IDS, 4)
+    assert first == assign_pairs(list(reversed(PAIR_IDS)), 4)
+    assert set(first.values()) == {0, 1, 2, 3}
+
+def test_adding_a_worker_only_moves_pairs_to_it():
+    for n in (1, 2, 4, 7):
+        before, after = assign_pairs(PAIR_IDS, n), assign_pairs(PAIR_IDS, n + 1)
+        moved = [pair_id for pair_id in PAIR_IDS if before[pair_id] != after[pair_id]]
+        assert all(after[pair_id] == n for pair_id in moved)
+        # ~1 / (n + 1) of the pairs move
+        assert abs(len(moved) / len(PAIR_IDS) - 1.0 / (n + 1)) < 0.1
+
+def test_removing_the_last_worker_only_moves_its_pairs():
+    before, after = assign_pairs(PAIR_IDS, 5), assign_pairs(PAIR_IDS, 4)
+    assert all(after[p] == before[p] for p in PAIR_IDS if before[p] != 4)
+
+# --- HANDOVER (in-process shards) ---
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_handover_keeps_the_warm_state_and_misses_no_tick(coalesce):
+    pair = make_pairs(1)[0]
+    ticks = make_ticks([pair], 60)
+    head, in_flight, tail = ticks[:60], ticks[60:80], ticks[80:]
+
+    old, new, rows = _Shard(coalesce), _Shard(coalesce), []
+    old.adopt(pair, None, None, rows)
+    for tick in head:
+        old.on_ticks([tick], rows)
+        old.flush(rows)
+
+    # The new owner is told first; ticks routed to it while the state travels are buffered
+    new.expect(pair)
+    for tick in in_flight:
+        new.on_ticks([tick], rows)
+    assert len(new.backlog[pair['id']]) == len(in_flight)
+
+    model, last_prices = old.release(pair['id'])
+    assert pair['id'] not in old.models and not old.by_symbol
+    new.adopt(pair, model, last_prices, rows)
+    assert pair['id'] not in new.backlog
+    for tick in tail:
+        new.on_ticks([tick], rows)
+        new.flush(rows)
+
+    # Coalescing shards collapse the buffered ticks into one update on the newest prices
+    collapse = range(len(head), len(head) + len(in_flight)) if coalesce else ()
+    assert rows == reference_rows(pair, ticks, collapse)
+
+def test_engine_rebalance_across_processes():
+    pairs = make_pairs(8)
+    ticks = make_ticks(pairs, 40, seed=1)
+    half = len(ticks) // 2
+
+    async def scenario():
+        engine = ShardedEngine(pairs, n_workers=2, coalesce=False)
+        await engine.start()
+        for symbol, price, timestamp in ticks[:half]:
+            engine.feed(symbol, price, timestamp)
+        await asyncio.sleep(0)
+        moved = engine.add_worker()
+        for symbol, price, timestamp in ticks[half:]:
+            engine.feed(symbol, price, timestamp)
+        await asyncio.sleep(0)
+        await engine.close()
+        return engine, moved, await engine.snapshot()
+
+    engine, moved, snapshot = asyncio.run(scenario())
+    assert moved and all(engine.assignment[pair_id] == 2 for pair_id in moved)
+    assert engine.rows_merged == sum(len(reference_rows(pair, ticks)) for pair in pairs)
+    for pair in pairs:
+        last = reference_rows(pair, ticks)[-1]
+        assert snapshot[pair['id']].z_score == last[-1]
+        assert snapshot[pair['id']].beta == last[4]
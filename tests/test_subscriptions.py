@@ -0,0 +1,127 @@
+import asyncio
+import csv
+
+import pytest
+
+from src.data_loader.recorder import DataRecorder
+from src.shared.clock import VirtualClock
+from src.shared.state import Blackboard, TOPIC_MATH, TOPIC_PRICES
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def drain(subscription) -> list:
+    """
+    Everything deliverable right now (without waiting for new writes).
+    """
+    out = []
+    while subscription.pending():
+        out.append(await subscription.get())
+    return out
+
+def test_all_delivers_every_snapshot_in_order_and_drops_oldest():
+    async def scenario():
+        bb = Blackboard()
+        everything = bb.subscribe(mode='all', maxsize=3)
+        for i in range(1, 6):
+            await bb.update_prices(100.0 + i, 50.0, float(i))
+        return everything, await drain(everything)
+
+    subscription, snapshots = run(scenario())
+    assert [s.timestamp for s in snapshots] == [3.0, 4.0, 5.0]
+    assert [s.version for s in snapshots] == [3, 4, 5]
+    assert (subscription.received, subscription.delivered, subscription.dropped) == (5, 3, 2)
+
+def test_latest_keeps_only_the_newest():
+    async def scenario():
+        bb = Blackboard()
+        latest = bb.subscribe(mode='latest')
+        for i in range(1, 4):
+            await bb.update_prices(100.0 + i, 50.0, float(i))
+        first = await drain(latest)
+        await bb.update_prices(200.0, 50.0, 10.0)
+        return first, await drain(latest)
+
+    first, second = run(scenario())
+    assert [s.price_a for s in first] == [103.0]
+    assert [s.price_a for s in second] == [200.0]
+
+def test_throttle_delivers_at_most_once_per_interval_of_the_clock():
+    async def scenario():
+        bb = Blackboard()
+        clock = VirtualClock(start=100.0)
+        throttled = bb.subscribe(mode='throttle', interval=1.0, clock=clock)
+        delivered = []
+
+        async def consume():
+            async for state in throttled:
+                delivered.append((clock.now(), state.timestamp))
+
+        task = asyncio.create_task(consume())
+        for ts in (100.0, 100.2, 100.5, 100.9, 101.0, 101.3, 103.0):
+            clock.advance_to(ts)
+            await bb.update_prices(1.0, 1.0, ts)
+            for _ in range(3):
+                await asyncio.sleep(0)
+        task.cancel()
+        return delivered
+
+    delivered = run(scenario())
+    # The first write goes out at once; later ones wait for the next slot and deliver the newest by then
+    assert delivered == [(100.0, 100.0), (101.0, 101.0), (103.0, 103.0)]
+
+def test_topics_filter_writes():
+    async def scenario():
+        bb = Blackboard()
+        math_only = bb.subscribe(mode='all', topics=(TOPIC_MATH,))
+        prices_only = bb.subscribe(mode='all', topics=(TOPIC_PRICES,))
+        everything = bb.subscribe(mode='all')
+
+        await bb.update_prices(1.0, 2.0, 1.0)
+        await bb.update_math(beta=0.5, theta=0.1, vol=1.0, spread=0.0, z_score=1.5)
+        await bb.update_cointegration(False, -1.0, 0.4, 60.0)
+        return await drain(math_only), await drain(prices_only), await drain(everything)
+
+    math_only, prices_only, everything = run(scenario())
+    assert [s.z_score for s in math_only] == [1.5]
+    assert [(s.price_a, s.z_score) for s in prices_only] == [(1.0, 0.0)]
+    assert [s.version for s in everything] == [1, 2, 3]
+    assert everything[-1].tradeable is False
+
+def test_closed_subscription_stops_receiving():
+    async def scenario():
+        bb = Blackboard()
+        subscription = bb.subscribe(mode='all')
+        await bb.update_prices(1.0, 1.0, 1.0)
+        subscription.close()
+        await bb.update_prices(2.0, 1.0, 2.0)
+        return subscription
+
+    assert run(scenario()).received == 1
+
+def test_recorder_writes_on_a_fixed_grid(tmp_path):
+    path = tmp_path / "session.csv"
+
+    async def scenario():
+        bb = Blackboard()
+        clock = VirtualClock(start=1000.0)
+        recorder = DataRecorder(bb, filename=str(path), clock=clock)
+        task = asyncio.create_task(recorder.run())
+        await asyncio.sleep(0)
+
+        # Math arrives for the first 2 seconds, then the market goes quiet for 3 seconds
+        for second in range(1, 6):
+            if second <= 2:
+                await bb.update_prices(100.0 + second, 50.0, 1000.0 + second)
+                await bb.update_math(beta=0.5, theta=0.1, vol=1.0, spread=float(second), z_score=0.0)
+            clock.advance_to(1000.0 + second)
+            for _ in range(3):
+                await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    run(scenario())
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    # One row per second; quiet seconds repeat the last result
+    assert [float(row['spread']) for row in rows] == [1.0, 2.0, 2.0, 2.0, 2.0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("stable_baselines3")
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from src.data_loader.synthetic import SyntheticMarket
+from src.rl.gym_env import TradingEnv, load_features
+from src.rl.vec_env import BatchedTradingEnv
+
+N_ENVS = 4
+
+@pytest.fixture(scope="module")
+def features(tmp_path_factory):
+    path = tmp_path_factory.mktemp("session") / "session.csv"
+    SyntheticMarket(seed=11).to_csv(path, 400)
+    return load_features(str(path), skip_rows=100, cache_dir=None)
+
+def test_batched_env_matches_dummy_vec_env(features):
+    reference = DummyVecEnv([lambda: TradingEnv(features=features)] * N_ENVS)
+    batched = BatchedTradingEnv(features=features, num_envs=N_ENVS, stagger=False)
+
+    np.testing.assert_array_equal(batched.reset(), reference.reset())
+
+    # Fixed actions, long enough to run through an auto-reset
+    actions = np.random.default_rng(0).integers(0, 3, size=(2 * batched.n_steps, N_ENVS))
+    terminations = 0
+    for step_actions in actions:
+        obs, rewards, dones, infos = batched.step(step_actions)
+        ref_obs, ref_rewards, ref_dones, ref_infos = reference.step(step_actions)
+
+        np.testing.assert_array_equal(obs, ref_obs)
+        np.testing.assert_allclose(rewards, ref_rewards, rtol=1e-6, atol=1e-6)
+        np.testing.assert_array_equal(dones, ref_dones)
+        for info, ref_info in zip(infos, ref_infos):
+            if 'terminal_observation' in ref_info:
+                np.testing.assert_array_equal(info['terminal_observation'], ref_info['terminal_observation'])
+                terminations += 1
+    assert terminations >= N_ENVS
+
+def test_staggered_restarts_are_redrawn(features):
+    env = BatchedTradingEnv(features=features, num_envs=N_ENVS, stagger=True, seed=3)
+    env.reset()
+    first_starts = env.start_steps.copy()
+
+    restarts = []
+    for _ in range(5 * env.n_steps):
+        _, _, dones, _ = env.step(np.zeros(N_ENVS, dtype=int))
+        restarts.extend(env.current_step[dones].tolist())
+
+    assert len(restarts) > N_ENVS
+    assert not set(restarts) <= set(first_starts.tolist())
+    assert max(restarts) < env.n_steps - 1
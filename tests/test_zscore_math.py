@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader.synthetic import SyntheticMarket
+from src.signals.zscore import ZScoreGenerator
+
+def ou_spread(n_ticks=20_000, theta=0.5, sigma=2.0, seed=7) -> pd.Series:
+    return SyntheticMarket(theta=theta, sigma=sigma, seed=seed).pair(n_ticks)['spread']
+
+def test_warmup_is_nan_then_matches_formula():
+    spread = ou_spread(500)
+    z = ZScoreGenerator(window=30).compute(spread)
+
+    assert z.iloc[:29].isna().all()
+    assert z.iloc[29:].notna().all()
+    last = spread.iloc[-30:]
+    assert z.iloc[-1] == pytest.approx((last.iloc[-1] - last.mean()) / last.std(ddof=1))
+
+def test_known_ou_spread_is_standardized():
+    # Window >> half-life (ln 2 / 0.5 ~ 1.4 ticks): the z-score is close to N(0, 1)
+    z = ZScoreGenerator(window=300).compute(ou_spread()).dropna()
+
+    assert abs(z.mean()) < 0.05
+    assert z.std() == pytest.approx(1.0, abs=0.05)
+    assert 0.03 < (z.abs() > 2.0).mean() < 0.07
+
+def test_invariant_to_price_level_and_scale():
+    spread = ou_spread(1000)
+    z = ZScoreGenerator(window=50).compute(spread)
+    shifted = ZScoreGenerator(window=50).compute(3.0 * spread + 1000.0)
+    np.testing.assert_allclose(shifted, z, rtol=1e-6, atol=1e-8)